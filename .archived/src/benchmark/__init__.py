@@ -0,0 +1 @@
+"""Offline benchmarking: mock OpenAI-compatible server and orchestration harness."""
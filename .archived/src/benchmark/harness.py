@@ -0,0 +1,201 @@
+"""End-to-end orchestration benchmark against the mock LLM server.
+
+run_benchmark() starts a MockLLMServer, writes a throwaway config that
+points N generator models and a combiner at it (via the local
+OpenAI-compatible google_antigravity provider), and drives
+Orchestrator.initialize()/run() over synthetic questions with a scratch
+database. Throughput is reported as questions per minute, so retry,
+concurrency and hedging changes can be measured without paid APIs.
+"""
+
+import logging
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import yaml
+
+import src.config.loader as config_loader
+import src.orchestrator as orchestrator_module
+from src.benchmark.mock_server import MockLLMServer, MockServerConfig
+from src.config.subjects import SubjectConfig
+from src.database import DatabaseManager
+from src.models import LeetCodeProblem
+from src.orchestrator import Orchestrator
+from src.providers.client_pool import close_client_pool
+
+logger = logging.getLogger(__name__)
+
+# Provider used to reach the mock server (keyless, multi-model, OpenAI-compatible)
+BENCHMARK_PROVIDER = "google_antigravity"
+
+
+@dataclass
+class BenchmarkResult:
+    """Outcome of a benchmark run."""
+
+    questions: int
+    successful: int
+    elapsed_seconds: float
+    server_stats: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def questions_per_minute(self) -> float:
+        return self.successful / self.elapsed_seconds * 60 if self.elapsed_seconds else 0.0
+
+    def format(self) -> str:
+        """Format the result for display."""
+        stats = self.server_stats
+        return "\n".join([
+            "Benchmark Result",
+            f"  Questions: {self.successful}/{self.questions} succeeded",
+            f"  Elapsed: {self.elapsed_seconds:.1f}s",
+            f"  Throughput: {self.questions_per_minute:.1f} questions/minute",
+            f"  Mock requests: {stats.get('requests', 0)} "
+            f"({stats.get('rate_limited', 0)} rate limited, {stats.get('timed_out', 0)} timed out)",
+        ])
+
+
+def build_benchmark_config(
+    base_url: str,
+    generators: int = 3,
+    concurrent_requests: int = 8,
+    request_timeout: float = 10.0,
+    max_retries: int = 3,
+    stream: bool = False,
+    generation_overrides: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Build a config.yaml dict routing all generation to the mock server.
+
+    Args:
+        base_url: Mock server base URL
+        generators: Number of generator models
+        concurrent_requests: generation.concurrent_requests
+        request_timeout: Client timeout in seconds (hanging requests fail after this)
+        max_retries: Retry attempts per request
+        stream: Whether providers stream responses
+        generation_overrides: Extra generation settings (e.g. hedge_requests, quorum)
+
+    Returns:
+        Config dict accepted by AppConfig.
+    """
+    generator_models = [f"mock-generator-{index}" for index in range(1, generators + 1)]
+    generation: Dict[str, Any] = {
+        "concurrent_requests": concurrent_requests,
+        "request_delay": 0,
+        "max_retries": max_retries,
+        "json_parse_retries": max_retries,
+        "combiner": {"provider": BENCHMARK_PROVIDER, "model": "mock-combiner", "also_generate": False},
+    }
+    generation.update(generation_overrides or {})
+    return {
+        "defaults": {"timeout": request_timeout, "retry_min_wait": 0.1, "retry_max_wait": 2.0},
+        "providers": {
+            BENCHMARK_PROVIDER: {
+                "enabled": True,
+                "base_url": base_url,
+                "models": generator_models + ["mock-combiner"],
+                "stream": stream,
+            },
+        },
+        "generation": generation,
+    }
+
+
+def benchmark_subject(question_count: int) -> SubjectConfig:
+    """Synthetic LeetCode-style subject with question_count questions."""
+    return SubjectConfig(
+        name="benchmark",
+        target_questions={"Benchmark": [f"Benchmark Question {index}" for index in range(1, question_count + 1)]},
+        initial_prompt=None,
+        combine_prompt=None,
+        target_model=LeetCodeProblem,
+        deck_prefix="Benchmark",
+        deck_prefix_mcq="Benchmark_MCQ",
+    )
+
+
+@contextmanager
+def _isolated_environment(config_path: Path, database_path: Path) -> Iterator[None]:
+    """Point config loading and the run database at scratch files."""
+    original_config = config_loader.CONFIG_FILE
+    original_database = orchestrator_module.DATABASE_PATH
+    original_manager = DatabaseManager.get_default()
+    config_loader.CONFIG_FILE = config_path
+    orchestrator_module.DATABASE_PATH = database_path
+    DatabaseManager.set_default(DatabaseManager())
+    try:
+        yield
+    finally:
+        config_loader.CONFIG_FILE = original_config
+        orchestrator_module.DATABASE_PATH = original_database
+        DatabaseManager.set_default(original_manager)
+
+
+async def run_benchmark(
+    question_count: int = 50,
+    generators: int = 3,
+    server_config: Optional[MockServerConfig] = None,
+    concurrent_requests: int = 8,
+    request_timeout: float = 10.0,
+    max_retries: int = 3,
+    stream: bool = False,
+    generation_overrides: Optional[Dict[str, Any]] = None,
+) -> BenchmarkResult:
+    """
+    Run Orchestrator end-to-end against a mock server and measure throughput.
+
+    Args:
+        question_count: Synthetic questions to generate
+        generators: Generator models (plus one combiner)
+        server_config: Mock server behaviour (latency, 429/timeout injection)
+        concurrent_requests: Questions processed concurrently
+        request_timeout: Client timeout in seconds
+        max_retries: Retry attempts per request
+        stream: Whether providers stream responses
+        generation_overrides: Extra generation settings
+
+    Returns:
+        BenchmarkResult with questions/minute and server counters.
+
+    Raises:
+        RuntimeError: If the orchestrator fails to initialize.
+    """
+    async with MockLLMServer(server_config) as server:
+        with tempfile.TemporaryDirectory(prefix="llm2deck-benchmark-") as scratch:
+            config_path = Path(scratch) / "config.yaml"
+            config_path.write_text(yaml.safe_dump(build_benchmark_config(
+                server.base_url,
+                generators=generators,
+                concurrent_requests=concurrent_requests,
+                request_timeout=request_timeout,
+                max_retries=max_retries,
+                stream=stream,
+                generation_overrides=generation_overrides,
+            )), encoding="utf-8")
+
+            with _isolated_environment(config_path, Path(scratch) / "benchmark.db"):
+                orchestrator = Orchestrator(
+                    subject_config=benchmark_subject(question_count),
+                    run_label="benchmark",
+                    bypass_cache_lookup=True,
+                )
+                try:
+                    if not await orchestrator.initialize():
+                        raise RuntimeError("Benchmark orchestrator failed to initialize")
+                    start = time.monotonic()
+                    problems = await orchestrator.run()
+                    elapsed = time.monotonic() - start
+                finally:
+                    await close_client_pool()
+
+        return BenchmarkResult(
+            questions=question_count,
+            successful=len(problems),
+            elapsed_seconds=elapsed,
+            server_stats=server.get_stats(),
+        )
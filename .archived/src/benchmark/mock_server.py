@@ -0,0 +1,400 @@
+"""Local OpenAI-compatible mock LLM server for load tests and offline benchmarks.
+
+MockLLMServer serves /v1/chat/completions (plain and streamed) and
+/v1/models over plain asyncio, so any OpenAICompatibleProvider can be
+pointed at it via base_url. Every completion is schema-valid card JSON
+generated from the request's response_format schema (or the configured
+model class), after a latency sampled from a configurable distribution.
+A configurable share of requests is answered with 429 + Retry-After or
+left hanging until the client times out, and usage is reported with
+local token estimates.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Type
+
+from pydantic import BaseModel
+
+from src.models import LeetCodeProblem
+from src.prompts import get_model_schema
+from src.services.tokens import count_message_tokens, count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Chunks a streamed completion is split into
+STREAM_CHUNKS = 20
+
+_REASONS = {200: "OK", 404: "Not Found", 429: "Too Many Requests", 504: "Gateway Timeout"}
+
+
+@dataclass
+class LatencyDistribution:
+    """
+    Response latency distribution in seconds.
+
+    kind is "fixed" (a), "uniform" (between a and b) or "lognormal"
+    (median a, sigma b).
+    """
+
+    kind: str = "lognormal"
+    a: float = 1.0
+    b: float = 0.5
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        """
+        Parse a distribution spec.
+
+        Args:
+            spec: "fixed:0.5", "uniform:0.5,2.0" or "lognormal:1.0,0.5"
+
+        Returns:
+            The parsed LatencyDistribution.
+
+        Raises:
+            ValueError: If the spec is malformed.
+        """
+        kind, _, params = spec.partition(":")
+        try:
+            values = [float(value) for value in params.split(",") if value.strip()]
+        except ValueError:
+            values = []
+        if kind not in ("fixed", "uniform", "lognormal") or not 1 <= len(values) <= 2:
+            raise ValueError(f"Invalid latency distribution: {spec!r}")
+        default_b = {"fixed": 0.0, "uniform": values[0], "lognormal": 0.5}[kind]
+        return cls(kind, values[0], values[1] if len(values) > 1 else default_b)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw a latency in seconds."""
+        if self.kind == "fixed":
+            return self.a
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        return self.a * math.exp(rng.gauss(0.0, self.b))
+
+
+@dataclass
+class MockServerConfig:
+    """Behaviour of the mock server."""
+
+    latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    rate_limit_rate: float = 0.0  # Share of requests answered with 429
+    retry_after_seconds: float = 1.0  # Retry-After sent with 429s
+    timeout_rate: float = 0.0  # Share of requests left hanging (client times out)
+    hang_seconds: float = 600.0  # How long a "timed out" request hangs
+    array_items: int = 5  # Items generated for array fields (e.g. cards)
+    model_class: Type[BaseModel] = LeetCodeProblem  # Schema when the request has no response_format
+    seed: Optional[int] = None
+
+
+def example_for_schema(
+    schema: Dict[str, Any],
+    root: Optional[Dict[str, Any]] = None,
+    name: str = "value",
+    array_items: int = 5,
+) -> Any:
+    """
+    Build an example value that validates against a JSON schema.
+
+    Supports the subset pydantic emits: $ref/$defs, anyOf/oneOf, enum,
+    const, objects, arrays and scalar types.
+
+    Args:
+        schema: Schema (or sub-schema) to satisfy
+        root: Root schema for resolving $ref (default: schema)
+        name: Field name, used to make strings readable
+        array_items: Number of items for arrays
+
+    Returns:
+        A JSON-compatible example value.
+    """
+    root = root or schema
+    if "$ref" in schema:
+        target: Any = root
+        for part in schema["$ref"].lstrip("#/").split("/"):
+            target = target[part]
+        return example_for_schema(target, root, name, array_items)
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            options = [option for option in schema[key] if option.get("type") != "null"]
+            return example_for_schema((options or schema[key])[0], root, name, array_items)
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+
+    schema_type = schema.get("type", "object")
+    if isinstance(schema_type, list):
+        schema_type = next((option for option in schema_type if option != "null"), "null")
+
+    if schema_type == "object":
+        return {
+            key: example_for_schema(value, root, key, array_items)
+            for key, value in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        count = max(schema.get("minItems", 0), min(array_items, schema.get("maxItems", array_items)))
+        item_schema = schema.get("items", {"type": "string"})
+        return [example_for_schema(item_schema, root, name, array_items) for _ in range(count)]
+    if schema_type == "string":
+        return f"Example {name}"
+    if schema_type == "integer":
+        return schema.get("minimum", 1)
+    if schema_type == "number":
+        return schema.get("minimum", 1.0)
+    if schema_type == "boolean":
+        return True
+    return None
+
+
+class MockLLMServer:
+    """
+    OpenAI-compatible mock server on a local port.
+
+    Usage:
+        async with MockLLMServer(MockServerConfig(rate_limit_rate=0.05)) as server:
+            provider = GoogleAntigravityProvider(model="mock", base_url=server.base_url)
+    """
+
+    def __init__(
+        self,
+        config: Optional[MockServerConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        Initialize the server (not started).
+
+        Args:
+            config: Server behaviour (default: MockServerConfig())
+            host: Interface to bind
+            port: Port to bind (0 = any free port)
+        """
+        self.config = config or MockServerConfig()
+        self.host = host
+        self.port = port
+        self._rng = random.Random(self.config.seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+        self._canned: Dict[str, str] = {}
+        self.requests = 0
+        self.completed = 0
+        self.rate_limited = 0
+        self.timed_out = 0
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to configure providers with."""
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def start(self) -> None:
+        """Start listening."""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"[MOCK] Serving OpenAI-compatible API at {self.base_url}")
+
+    async def stop(self) -> None:
+        """Stop listening and drop open connections (including hanging requests)."""
+        if self._server is None:
+            return
+        self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def __aenter__(self) -> "MockLLMServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get request counters.
+
+        Returns:
+            Dict with requests, completed, rate_limited and timed_out.
+        """
+        return {
+            "requests": self.requests,
+            "completed": self.completed,
+            "rate_limited": self.rate_limited,
+            "timed_out": self.timed_out,
+        }
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests on a keep-alive connection."""
+        task = asyncio.current_task()
+        if task is not None:
+            self._connections.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    header, _, value = line.decode("latin-1").partition(":")
+                    headers[header.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+
+                await self._dispatch(method, path.split("?", 1)[0], body, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            pass  # Server stopping; asyncio reports cancelled connection tasks as errors
+        finally:
+            if task is not None:
+                self._connections.discard(task)
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _dispatch(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter) -> None:
+        if method == "POST" and path.endswith("/chat/completions"):
+            await self._chat_completion(json.loads(body or b"{}"), writer)
+        elif method == "GET" and path.endswith("/models"):
+            await self._write_json(writer, 200, {"object": "list", "data": []})
+        else:
+            await self._write_json(writer, 404, {"error": {"message": f"Unknown path {path}"}})
+
+    async def _write_json(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Dict[str, Any],
+        extra_headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(body))}
+        headers.update(extra_headers or {})
+        head = f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        )
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+    def _canned_content(self, payload: Dict[str, Any]) -> str:
+        """Schema-valid card JSON for a request (cached per schema)."""
+        response_format = payload.get("response_format") or {}
+        schema = (response_format.get("json_schema") or {}).get("schema")
+        if schema is None:
+            schema = get_model_schema(self.config.model_class)
+        key = json.dumps(schema, sort_keys=True)
+        content = self._canned.get(key)
+        if content is None:
+            content = json.dumps(
+                example_for_schema(schema, array_items=self.config.array_items), indent=2
+            )
+            self._canned[key] = content
+        return content
+
+    async def _chat_completion(self, payload: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        self.requests += 1
+        roll = self._rng.random()
+        if roll < self.config.rate_limit_rate:
+            self.rate_limited += 1
+            await self._write_json(
+                writer,
+                429,
+                {"error": {"message": "Rate limit exceeded (mock)", "type": "rate_limit_exceeded"}},
+                {"Retry-After": f"{self.config.retry_after_seconds:g}"},
+            )
+            return
+        if roll < self.config.rate_limit_rate + self.config.timeout_rate:
+            self.timed_out += 1
+            await asyncio.sleep(self.config.hang_seconds)
+            await self._write_json(writer, 504, {"error": {"message": "Timed out (mock)"}})
+            return
+
+        model = payload.get("model", "mock")
+        content = self._canned_content(payload)
+        usage = {
+            "prompt_tokens": count_message_tokens(payload.get("messages") or [], model),
+            "completion_tokens": count_tokens(content, model),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        latency = self.config.latency.sample(self._rng)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+
+        if payload.get("stream"):
+            include_usage = bool((payload.get("stream_options") or {}).get("include_usage"))
+            await self._stream_completion(writer, completion_id, model, content, usage, latency, include_usage)
+        else:
+            await asyncio.sleep(latency)
+            await self._write_json(writer, 200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+        self.completed += 1
+
+    async def _stream_completion(
+        self,
+        writer: asyncio.StreamWriter,
+        completion_id: str,
+        model: str,
+        content: str,
+        usage: Dict[str, int],
+        latency: float,
+        include_usage: bool,
+    ) -> None:
+        """Stream content as SSE chunks: ~30% of latency to first token, the rest spread out."""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nTransfer-Encoding: chunked\r\n\r\n"
+        )
+
+        async def send(event: str) -> None:
+            data = f"data: {event}\n\n".encode("utf-8")
+            writer.write(f"{len(data):X}\r\n".encode("latin-1") + data + b"\r\n")
+            await writer.drain()
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+
+        await asyncio.sleep(latency * 0.3)
+        step = max(1, math.ceil(len(content) / STREAM_CHUNKS))
+        pieces: List[str] = [content[start:start + step] for start in range(0, len(content), step)]
+        for index, piece in enumerate(pieces):
+            delta: Dict[str, Any] = {"content": piece}
+            if index == 0:
+                delta["role"] = "assistant"
+            await send(json.dumps(chunk(delta)))
+            await asyncio.sleep(latency * 0.7 / len(pieces))
+        await send(json.dumps(chunk({}, "stop")))
+        if include_usage:
+            await send(json.dumps({**chunk({}), "choices": [], "usage": usage}))
+        await send("[DONE]")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
@@ -1,9 +1,11 @@
 """Cache utilities for LLM response caching."""
 
+import asyncio
 import hashlib
 import json
+from contextvars import ContextVar
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
 
 from sqlalchemy import func
 from sqlalchemy.dialects.sqlite import insert
@@ -11,6 +13,12 @@ from sqlalchemy.orm import Session
 
 from src.database import LLMCache
 
+T = TypeVar("T")
+
+# Set by callers that must not join an in-flight identical request (e.g. a
+# hedged duplicate of a slow call); scoped to the current task's context.
+coalescing_disabled: ContextVar[bool] = ContextVar("coalescing_disabled", default=False)
+
 
 def generate_cache_key(
     provider_name: str,
@@ -151,3 +159,85 @@ def get_cache_stats(session: Session) -> dict[str, int]:
     total = session.query(func.count(LLMCache.cache_key)).scalar() or 0
     total_hits = session.query(func.sum(LLMCache.hit_count)).scalar() or 0
     return {"total_entries": total, "total_hits": total_hits}
+
+
+class RequestCoalescer:
+    """In-process coalescing of concurrent identical requests ("singleflight").
+
+    The first caller for a cache key starts the upstream request; callers
+    arriving with the same key while it is in flight await the same result
+    instead of missing the cache and paying for a duplicate call.
+    """
+
+    _instance: Optional["RequestCoalescer"] = None
+
+    def __init__(self) -> None:
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self.upstream_requests = 0
+        self.coalesced_requests = 0
+
+    async def run(self, cache_key: str, request: Callable[[], Awaitable[T]]) -> T:
+        """Run request once per cache key among concurrent callers.
+
+        Args:
+            cache_key: Key identifying identical requests
+            request: No-argument coroutine function performing the request
+
+        Returns:
+            The (shared) request result
+        """
+        if coalescing_disabled.get():
+            self.upstream_requests += 1
+            return await request()
+
+        task = self._in_flight.get(cache_key)
+        if task is not None:
+            self.coalesced_requests += 1
+        else:
+            self.upstream_requests += 1
+            task = asyncio.ensure_future(request())
+            self._in_flight[cache_key] = task
+
+            def _forget(done: asyncio.Future, key: str = cache_key) -> None:
+                if self._in_flight.get(key) is done:
+                    del self._in_flight[key]
+
+            task.add_done_callback(_forget)
+
+        # Shield so one cancelled caller doesn't cancel the request for the
+        # others; the request itself is cancelled once nobody awaits it
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def get_stats(self) -> dict[str, int]:
+        """Get coalescing counters.
+
+        Returns:
+            Dict with upstream_requests and coalesced_requests
+        """
+        return {
+            "upstream_requests": self.upstream_requests,
+            "coalesced_requests": self.coalesced_requests,
+        }
+
+    @classmethod
+    def get_default(cls) -> "RequestCoalescer":
+        """Get or create the default singleton instance."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_default(cls) -> None:
+        """Reset the default singleton (useful for testing cleanup)."""
+        cls._instance = None
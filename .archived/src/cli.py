@@ -35,7 +35,7 @@ def normalize_legacy_args(argv: list[str]) -> list[str]:
     Returns:
         Normalized argument list compatible with new subcommand syntax.
     """
-    SUBCOMMANDS = {"generate", "ingest", "convert", "merge", "export-md", "cache", "query", "-h", "--help"}
+    SUBCOMMANDS = {"generate", "ingest", "convert", "merge", "export-md", "cache", "benchmark", "query", "-h", "--help"}
 
     if not argv or argv[0] in SUBCOMMANDS:
         return argv
@@ -55,6 +55,32 @@ def normalize_legacy_args(argv: list[str]) -> list[str]:
     return new_argv
 
 
+def add_traffic_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add provider traffic record/replay options to a generation subcommand."""
+    traffic_group = parser.add_mutually_exclusive_group()
+    traffic_group.add_argument(
+        "--record-traffic",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Record provider HTTP traffic (with timing) to an archive file",
+    )
+    traffic_group.add_argument(
+        "--replay-traffic",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Replay provider HTTP traffic from an archive instead of calling APIs (implies --no-cache)",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        metavar="FACTOR",
+        help="Divide recorded latencies by this factor when replaying (default: 1.0)",
+    )
+
+
 def create_parser() -> argparse.ArgumentParser:
     """Create the main argument parser with subcommands."""
     # Get available subjects from registry
@@ -149,6 +175,7 @@ def create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Show cost estimate without generating cards",
     )
+    add_traffic_arguments(generate_parser)
 
     # ====== convert command ======
     convert_parser = subparsers.add_parser(
@@ -231,6 +258,7 @@ def create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Show cost estimate without generating cards",
     )
+    add_traffic_arguments(ingest_parser)
 
     # ====== merge command ======
     merge_parser = subparsers.add_parser(
@@ -292,6 +320,66 @@ def create_parser() -> argparse.ArgumentParser:
         help="Show cache statistics",
     )
 
+    # ====== benchmark command ======
+    benchmark_parser = subparsers.add_parser(
+        "benchmark",
+        help="Benchmark the generation pipeline against a local mock LLM server",
+        description="Run generation end-to-end against a mock OpenAI-compatible server (no API costs).",
+    )
+    benchmark_parser.add_argument(
+        "--questions",
+        type=int,
+        default=50,
+        help="Number of synthetic questions (default: 50)",
+    )
+    benchmark_parser.add_argument(
+        "--generators",
+        type=int,
+        default=3,
+        help="Number of mock generator models (default: 3)",
+    )
+    benchmark_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Questions processed concurrently (default: 8)",
+    )
+    benchmark_parser.add_argument(
+        "--latency",
+        type=str,
+        default="lognormal:1.0,0.5",
+        help="Latency distribution: fixed:S, uniform:LO,HI or lognormal:MEDIAN,SIGMA (default: lognormal:1.0,0.5)",
+    )
+    benchmark_parser.add_argument(
+        "--rate-limit-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests answered with 429 (default: 0)",
+    )
+    benchmark_parser.add_argument(
+        "--timeout-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests that hang until the client times out (default: 0)",
+    )
+    benchmark_parser.add_argument(
+        "--request-timeout",
+        type=float,
+        default=10.0,
+        help="Client request timeout in seconds (default: 10)",
+    )
+    benchmark_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream responses from the mock server",
+    )
+    benchmark_parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for latency and fault injection",
+    )
+
     # ====== query command ======
     query_parser = subparsers.add_parser(
         "query",
@@ -468,6 +556,9 @@ def create_parser() -> argparse.ArgumentParser:
 async def handle_generate(args: argparse.Namespace) -> int:
     """Handle the generate subcommand."""
     from src.orchestrator import Orchestrator
+    from src.providers.client_pool import close_client_pool
+    from src.providers.traffic_archive import install_traffic_archive
+    from src.providers.key_scheduler import save_key_health
     from src.questions import QuestionFilter
 
     is_mcq = args.card_type == "mcq"
@@ -476,6 +567,10 @@ async def handle_generate(args: argparse.Namespace) -> int:
     resume_run_id = getattr(args, "resume", None)
     budget_limit = getattr(args, "budget", None)
     estimate_only = getattr(args, "estimate_only", False)
+    replay_traffic = getattr(args, "replay_traffic", None)
+    if replay_traffic:
+        # Cached answers would bypass the transport and never replay
+        no_cache = True
 
     # Build question filter from CLI args
     question_filter = QuestionFilter(
@@ -534,11 +629,27 @@ async def handle_generate(args: argparse.Namespace) -> int:
         estimate_only=estimate_only,
     )
 
-    if not await orchestrator.initialize():
+    try:
+        traffic_archive = install_traffic_archive(
+            record_path=getattr(args, "record_traffic", None),
+            replay_path=replay_traffic,
+            speed=getattr(args, "replay_speed", 1.0),
+        )
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to open traffic archive: {e}")
         return 1
 
-    problems = await orchestrator.run()
-    orchestrator.save_results(problems)
+    try:
+        if not await orchestrator.initialize():
+            return 1
+
+        problems = await orchestrator.run()
+        orchestrator.save_results(problems)
+    finally:
+        save_key_health()
+        await close_client_pool()
+        if traffic_archive is not None:
+            traffic_archive.close()
 
     return 0
 
@@ -595,6 +706,9 @@ def handle_convert(args: argparse.Namespace) -> int:
 async def handle_ingest(args: argparse.Namespace) -> int:
     """Handle the ingest subcommand."""
     from src.document_orchestrator import DocumentOrchestrator
+    from src.providers.client_pool import close_client_pool
+    from src.providers.traffic_archive import install_traffic_archive
+    from src.providers.key_scheduler import save_key_health
     from src.document import SUPPORTED_EXTENSIONS
 
     source_dir = Path(args.source_dir)
@@ -602,6 +716,10 @@ async def handle_ingest(args: argparse.Namespace) -> int:
     no_cache = getattr(args, "no_cache", False)
     budget_limit = getattr(args, "budget", None)
     estimate_only = getattr(args, "estimate_only", False)
+    replay_traffic = getattr(args, "replay_traffic", None)
+    if replay_traffic:
+        # Cached answers would bypass the transport and never replay
+        no_cache = True
     deck_name = getattr(args, "deck_name", None)
 
     # Parse extensions if provided
@@ -636,12 +754,57 @@ async def handle_ingest(args: argparse.Namespace) -> int:
         extensions=extensions,
     )
 
-    if not await orchestrator.initialize():
+    try:
+        traffic_archive = install_traffic_archive(
+            record_path=getattr(args, "record_traffic", None),
+            replay_path=replay_traffic,
+            speed=getattr(args, "replay_speed", 1.0),
+        )
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to open traffic archive: {e}")
         return 1
 
-    problems = await orchestrator.run()
-    orchestrator.save_results(problems)
+    try:
+        if not await orchestrator.initialize():
+            return 1
+
+        problems = await orchestrator.run()
+        orchestrator.save_results(problems)
+    finally:
+        save_key_health()
+        await close_client_pool()
+        if traffic_archive is not None:
+            traffic_archive.close()
+
+    return 0
+
+
+async def handle_benchmark(args: argparse.Namespace) -> int:
+    """Handle the benchmark subcommand."""
+    from src.benchmark.harness import run_benchmark
+    from src.benchmark.mock_server import LatencyDistribution, MockServerConfig
+
+    try:
+        latency = LatencyDistribution.parse(args.latency)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
 
+    server_config = MockServerConfig(
+        latency=latency,
+        rate_limit_rate=args.rate_limit_rate,
+        timeout_rate=args.timeout_rate,
+        seed=args.seed,
+    )
+    result = await run_benchmark(
+        question_count=args.questions,
+        generators=args.generators,
+        server_config=server_config,
+        concurrent_requests=args.concurrency,
+        request_timeout=args.request_timeout,
+        stream=args.stream,
+    )
+    print(result.format())
     return 0
 
 
@@ -841,6 +1004,8 @@ def main(argv: Optional[list] = None) -> int:
         return handle_cache(args)
     elif args.command == "query":
         return handle_query(args)
+    elif args.command == "benchmark":
+        return asyncio.run(handle_benchmark(args))
     else:
         parser.print_help()
         return 1
@@ -1,5 +1,6 @@
 """Unified API key loading for all providers."""
 
+import asyncio
 import json
 import logging
 import os
@@ -7,7 +8,7 @@ from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
 from random import shuffle
-from typing import Callable, List, Optional
+from typing import Any, Callable, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -149,6 +150,12 @@ KEY_CONFIGS: dict[str, KeyConfig] = {
 }
 
 
+def _read_json(path: Path) -> Any:
+    """Read and parse a JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
 async def load_keys(provider_name: str) -> List[str]:
     """
     Load and shuffle API keys for a provider.
@@ -170,8 +177,8 @@ async def load_keys(provider_name: str) -> List[str]:
         return []
 
     try:
-        with open(config.path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        # Read off the event loop so providers can initialize concurrently
+        data = await asyncio.to_thread(_read_json, config.path)
 
         keys = config.extractor(data)
 
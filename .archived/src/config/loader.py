@@ -24,6 +24,8 @@ class DefaultsConfig(BaseModel):
     retry_delay: float = 1.0
     retry_min_wait: float = 1.0
     retry_max_wait: float = 10.0
+    init_timeout: float = 30.0  # Seconds each provider may take to initialize before it is skipped
+    prewarm_connections: bool = False  # Open one keep-alive connection per API endpoint/key at startup
 
 
 class KeyPathsConfig(BaseModel):
@@ -63,6 +65,12 @@ class ProviderConfig(BaseModel):
     reasoning_effort: Optional[str] = None
     thinking_level: Optional[str] = None
     provider_name: Optional[str] = None  # For G4F
+    requests_per_minute: Optional[int] = None  # Client-side limit per API key (None = unlimited)
+    tokens_per_minute: Optional[int] = None  # Estimated tokens per minute per API key (None = unlimited)
+    stream: Optional[bool] = None  # Stream responses and abort early on invalid JSON (OpenAI-compatible only)
+    structured_output: Optional[bool] = None  # Native response_format json_schema (None = auto-detect)
+    cache_friendly_prompts: Optional[bool] = None  # Static instructions/schema first, question last (prefix caching)
+    init_timeout: Optional[float] = None  # None means use defaults
 
     def get_effective_timeout(self, defaults: "DefaultsConfig") -> float:
         """Get timeout, falling back to defaults if not set."""
@@ -98,6 +106,22 @@ class GenerationConfig(BaseModel):
 
     concurrent_requests: int = 8
     request_delay: float = 0.0  # Delay in seconds between starting each request within a batch
+    min_provider_concurrency: int = 1  # Floor for each provider/model's adaptive concurrency limit
+    max_provider_concurrency: Optional[int] = None  # Ceiling (None = 2x concurrent_requests)
+    hedge_requests: bool = False  # Duplicate initial generation calls slower than hedge_percentile
+    hedge_percentile: float = 0.95  # Rolling latency percentile that triggers a hedge
+    hedge_max_extra_fraction: float = 0.1  # Cap on hedged calls as a fraction of primary calls
+    quorum: Optional[int] = None  # Combine once this many generators answered (None = wait for all)
+    quorum_soft_deadline: Optional[float] = None  # Seconds after which to combine with the results so far
+    circuit_breaker: bool = False  # Skip a provider/model while its recent failure rate is too high
+    circuit_breaker_failure_threshold: float = 0.5  # Failure rate over recent attempts that opens the breaker
+    circuit_breaker_min_requests: int = 5  # Attempts required before the breaker may open
+    circuit_breaker_open_seconds: float = 30.0  # Seconds to skip the provider before probing again
+    routing_fan_out: Optional[int] = None  # Generators per question, chosen from history (None = all generators)
+    routing_latency_weight: float = 1.0  # How strongly routing penalizes slow generators
+    routing_cost_weight: float = 1.0  # How strongly routing penalizes expensive generators
+    routing_history_window: int = 200  # Recent provider results per generator used for routing
+    context_overflow: str = "chunk"  # Documents over a generator's context window: "chunk" into parts or "reject"
     max_retries: int = 5
     json_parse_retries: int = 3
     combiner: Optional[CombinerConfig] = None  # Explicit combiner configuration
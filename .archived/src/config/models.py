@@ -5,8 +5,19 @@ MODELS_WITH_REASONING_EFFORT = frozenset([
     "gpt-oss-120b",
 ])
 
+# OpenAI-compatible providers that accept response_format: {type: json_schema}
+PROVIDERS_WITH_STRUCTURED_OUTPUT = frozenset([
+    "llm2deck_openrouter",
+    "llm2deck_nvidia",
+    "llm2deck_baseten",
+])
 
 
 def supports_reasoning_effort(model: str) -> bool:
     """Check if a model supports the reasoning_effort parameter."""
     return model in MODELS_WITH_REASONING_EFFORT
+
+
+def supports_structured_output(provider_name: str) -> bool:
+    """Check if a provider supports native JSON-schema structured output."""
+    return provider_name in PROVIDERS_WITH_STRUCTURED_OUTPUT
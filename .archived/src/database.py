@@ -279,6 +279,26 @@ class LLMCache(Base):
     )
 
 
+class KeyHealth(Base):
+    """Per-API-key health, persisted across runs by the key scheduler."""
+
+    __tablename__ = "key_health"
+
+    key_id = Column(String(64), primary_key=True)  # SHA256 of provider + key (raw keys are never stored)
+    provider_name = Column(String(50), nullable=False)
+    successes = Column(Integer, default=0)
+    rate_limits = Column(Integer, default=0)
+    failures = Column(Integer, default=0)
+    consecutive_failures = Column(Integer, default=0)
+    avg_latency_seconds = Column(Float, nullable=True)  # Exponentially weighted
+    cooldown_until = Column(DateTime, nullable=True)  # Benched until this time (UTC)
+    updated_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("idx_key_health_provider", "provider_name"),
+    )
+
+
 def init_database(db_path: Path) -> None:
     """
     Initialize database engine and create tables.
@@ -475,3 +495,24 @@ def get_run(session: Session, run_id: str) -> Optional[Run]:
 def get_problem(session: Session, problem_id: int) -> Optional[Problem]:
     """Get a problem by ID"""
     return session.query(Problem).filter(Problem.id == problem_id).first()
+
+
+def get_key_health(session: Session, provider_name: str) -> List[KeyHealth]:
+    """Get persisted key health entries for a provider"""
+    return session.query(KeyHealth).filter(KeyHealth.provider_name == provider_name).all()
+
+
+def upsert_key_health(session: Session, key_id: str, provider_name: str, **kwargs) -> KeyHealth:
+    """Create or update a key health entry"""
+    entry = session.query(KeyHealth).filter(KeyHealth.key_id == key_id).first()
+    if entry is None:
+        entry = KeyHealth(key_id=key_id, provider_name=provider_name)
+        session.add(entry)
+
+    for key, value in kwargs.items():
+        if hasattr(entry, key):
+            setattr(entry, key, value)
+    entry.updated_at = datetime.now(timezone.utc)
+
+    session.flush()
+    return entry
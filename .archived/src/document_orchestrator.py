@@ -1,5 +1,6 @@
 """Document ingestion orchestrator for LLM2Deck."""
 
+import dataclasses
 import logging
 import uuid
 from pathlib import Path
@@ -16,9 +17,27 @@ from src.document import (
 from src.generator import CardGenerator
 from src.models import DocumentProblem
 from src.progress import ProgressTracker, ProviderStatus
-from src.prompts import PromptLoader
-from src.providers.base import TokenUsage
+from src.prompts import (
+    PromptLoader,
+    get_model_schema,
+    render_cache_friendly_prompt,
+    render_prompt,
+    schema_json,
+)
+from src.providers.backoff import BackoffGate
+from src.providers.base import LLMProvider, TokenUsage
+from src.providers.circuit_breaker import CircuitBreakers, CircuitState
+from src.providers.concurrency import AdaptiveConcurrency
+from src.providers.hedging import RequestHedger
+from src.providers.routing import GeneratorRouter
 from src.services.cost import CostEstimator, CostEstimate, RunCostData
+from src.services.tokens import (
+    DEFAULT_OUTPUT_RESERVE_TOKENS,
+    count_tokens,
+    get_context_window,
+    split_text,
+)
+from src.run_summary import log_run_metrics
 from src.setup import initialize_providers
 from src.task_runner import ConcurrentTaskRunner, Success, TaskInfo
 from src.utils import save_final_deck
@@ -82,12 +101,36 @@ class DocumentOrchestrator:
         self._current_cost_usd: float = 0.0
         self._total_input_tokens: int = 0
         self._total_output_tokens: int = 0
+        self._total_cached_input_tokens: int = 0
         self._budget_exceeded: bool = False
 
         # Load generation config
         config = load_config()
         self.concurrent_requests = config.generation.concurrent_requests
         self.request_delay = config.generation.request_delay
+        self.generation_config = config.generation
+
+        # Per provider/model adaptive concurrency, starting at the global limit
+        AdaptiveConcurrency.set_default(
+            AdaptiveConcurrency(
+                initial_limit=self.concurrent_requests,
+                min_limit=config.generation.min_provider_concurrency,
+                max_limit=config.generation.max_provider_concurrency,
+            )
+        )
+
+        # Provider-wide pauses after rate limits
+        BackoffGate.set_default(BackoffGate())
+
+        # Per provider/model circuit breakers
+        CircuitBreakers.set_default(
+            CircuitBreakers(
+                enabled=config.generation.circuit_breaker,
+                min_requests=config.generation.circuit_breaker_min_requests,
+                failure_threshold=config.generation.circuit_breaker_failure_threshold,
+                open_seconds=config.generation.circuit_breaker_open_seconds,
+            )
+        )
 
         # Database manager
         self.db_manager = DatabaseManager.get_default()
@@ -210,20 +253,53 @@ class DocumentOrchestrator:
             run_id=self._run_id,
             combine_prompt=self.combine_prompt,
             dry_run=self.dry_run or self.estimate_only,
+            hedger=self._create_hedger(),
+            quorum=self.generation_config.quorum,
+            quorum_soft_deadline=self.generation_config.quorum_soft_deadline,
+            router=self._create_router(llm_providers),
         )
 
         return True
 
-    def _get_all_provider_tuples(self) -> List[Tuple[str, str]]:
-        """Get list of (provider_name, model) tuples for all providers."""
-        all_providers: List[Tuple[str, str]] = []
-        for p in self._llm_providers:
-            all_providers.append((p.name, p.model))
+    def _create_hedger(self) -> Optional[RequestHedger]:
+        """Create the request hedger if hedging is enabled in the generation config."""
+        if not self.generation_config.hedge_requests or self.dry_run:
+            return None
+        return RequestHedger(
+            percentile=self.generation_config.hedge_percentile,
+            max_extra_fraction=self.generation_config.hedge_max_extra_fraction,
+        )
+
+    def _create_router(self, llm_providers: List[LLMProvider]) -> Optional[GeneratorRouter]:
+        """Create the generator router if a routing fan-out below the generator count is configured."""
+        fan_out = self.generation_config.routing_fan_out
+        if fan_out is None or fan_out >= len(llm_providers) or self.dry_run:
+            return None
+        router = GeneratorRouter.from_history(
+            llm_providers,
+            fan_out=fan_out,
+            cost_per_call={
+                (p.name, p.model): self.cost_estimator.estimate_cost_per_call(p.name) for p in llm_providers
+            },
+            latency_weight=self.generation_config.routing_latency_weight,
+            cost_weight=self.generation_config.routing_cost_weight,
+            window=self.generation_config.routing_history_window,
+        )
+        logger.info(f"[ROUTING] Sending each question to {fan_out} of {len(llm_providers)} generators")
+        return router
+
+    def _get_generator_tuples(self) -> List[Tuple[str, str]]:
+        """Get list of (provider_name, model) tuples for the generators."""
+        return [(p.name, p.model) for p in self._llm_providers]
+
+    def _get_combiner_tuples(self) -> List[Tuple[str, str]]:
+        """Get list of (provider_name, model) tuples for the combiner and formatter."""
+        combiners: List[Tuple[str, str]] = []
         if self._combiner:
-            all_providers.append((self._combiner.name, self._combiner.model))
+            combiners.append((self._combiner.name, self._combiner.model))
         if self._formatter and self._formatter != self._combiner:
-            all_providers.append((self._formatter.name, self._formatter.model))
-        return all_providers
+            combiners.append((self._formatter.name, self._formatter.model))
+        return combiners
 
     def _display_cost_estimate(self, estimate: CostEstimate) -> None:
         """Display cost estimate to the user."""
@@ -265,16 +341,82 @@ class DocumentOrchestrator:
         )
 
     def _build_document_prompt(self, doc: DocumentInfo) -> str:
-        """Build the initial prompt for a document."""
-        import json
-        json_schema = json.dumps(DocumentProblem.model_json_schema(), indent=2)
-        
-        prompt = self.initial_prompt
-        prompt = prompt.replace("{title}", doc.title)
-        prompt = prompt.replace("{topic_path}", doc.topic_path)
-        prompt = prompt.replace("{document_content}", doc.content)
-        prompt = prompt.replace("{schema}", json_schema)
-        return prompt
+        """
+        Build the initial prompt for a document.
+
+        The prompt is shared by all generators, so the document content goes
+        last (cache-friendly layout) if any generator has it enabled.
+        """
+        cache_friendly = any(
+            getattr(provider, "cache_friendly_prompts", False) for provider in self._llm_providers
+        )
+        render = render_cache_friendly_prompt if cache_friendly else render_prompt
+        return render(
+            self.initial_prompt,
+            title=doc.title,
+            topic_path=doc.topic_path,
+            document_content=doc.content,
+            schema=schema_json(get_model_schema(DocumentProblem)),
+        )
+
+    def _fit_documents_to_context(self, documents: List[DocumentInfo]) -> List[DocumentInfo]:
+        """
+        Chunk (or reject) documents whose prompt would overflow a generator's context window.
+
+        Token counts are local estimates per model family, so oversized
+        documents are handled before any request is spent on them. Chunks
+        become "<title> (Part i of n)" documents in sibling subdecks.
+
+        Args:
+            documents: Discovered documents
+
+        Returns:
+            Documents that fit, with oversized ones split into parts (or dropped
+            if generation.context_overflow is "reject").
+        """
+        models = [provider.model for provider in self._llm_providers]
+        if not models and self._combiner is not None:
+            models = [self._combiner.model]
+        if not models:
+            return documents
+
+        fitted: List[DocumentInfo] = []
+        for doc in documents:
+            # Content tokens each model can still take, given the rest of the prompt
+            overhead = self._build_document_prompt(dataclasses.replace(doc, content=""))
+            room, tightest_model = min(
+                (
+                    get_context_window(model)
+                    - DEFAULT_OUTPUT_RESERVE_TOKENS
+                    - count_tokens(overhead, model)
+                    - count_tokens(doc.content, model),
+                    model,
+                )
+                for model in models
+            )
+            if room >= 0:
+                fitted.append(doc)
+                continue
+
+            prompt_tokens = count_tokens(self._build_document_prompt(doc), tightest_model)
+            content_budget = count_tokens(doc.content, tightest_model) + room
+            if self.generation_config.context_overflow != "chunk" or content_budget <= 0:
+                logger.warning(
+                    f"Skipping {doc.relative_path}: prompt is ~{prompt_tokens:,} tokens, "
+                    f"over the context window of {tightest_model}"
+                )
+                continue
+
+            chunks = split_text(doc.content, content_budget, tightest_model)
+            logger.info(
+                f"Splitting {doc.relative_path} (~{prompt_tokens:,} prompt tokens) into "
+                f"{len(chunks)} parts to fit the context window of {tightest_model}"
+            )
+            for index, chunk in enumerate(chunks, 1):
+                fitted.append(dataclasses.replace(
+                    doc, title=f"{doc.title} (Part {index} of {len(chunks)})", content=chunk
+                ))
+        return fitted
 
     def _mark_run_completed(self, total_problems: int, successful_problems: int, failed_problems: int, cost_data: Optional[RunCostData] = None) -> None:
         """Mark the run as completed with statistics."""
@@ -326,13 +468,20 @@ class DocumentOrchestrator:
             logger.warning("No documents found to process")
             return []
 
+        documents = self._fit_documents_to_context(documents)
+
         # Get provider tuples for cost estimation
-        all_providers = self._get_all_provider_tuples()
+        generators = self._get_generator_tuples()
+        combiners = self._get_combiner_tuples()
+        all_providers = generators + combiners
 
         # Show cost estimate
         cost_estimate = self.cost_estimator.estimate_run_cost(
-            providers=all_providers,
+            providers=generators,
             question_count=len(documents),
+            prompts=[self._build_document_prompt(doc) for doc in documents],
+            combiners=combiners,
+            fan_out=self.generation_config.routing_fan_out,
         )
         self._display_cost_estimate(cost_estimate)
 
@@ -361,6 +510,7 @@ class DocumentOrchestrator:
         def on_token_usage(provider_name: str, model: str, usage: TokenUsage, success: bool):
             self._total_input_tokens += usage.input_tokens
             self._total_output_tokens += usage.output_tokens
+            self._total_cached_input_tokens += usage.cached_input_tokens
             cost = self.cost_estimator.calculate_cost(
                 provider_name, usage.input_tokens, usage.output_tokens
             )
@@ -377,6 +527,18 @@ class DocumentOrchestrator:
                     tokens_output=usage.output_tokens,
                 )
 
+        def on_concurrency_change(provider_name: str, model: str, limit: int, in_flight: int):
+            if self.progress_tracker:
+                self.progress_tracker.update_provider_concurrency(provider_name, model, limit, in_flight)
+
+        AdaptiveConcurrency.get_default().on_change = on_concurrency_change
+
+        def on_circuit_change(provider_name: str, model: str, state: CircuitState):
+            if self.progress_tracker:
+                self.progress_tracker.update_provider_circuit(provider_name, model, state.value)
+
+        CircuitBreakers.get_default().on_change = on_circuit_change
+
         # Wire up callbacks
         for provider in self._llm_providers:
             if hasattr(provider, "on_token_usage"):
@@ -437,6 +599,7 @@ class DocumentOrchestrator:
                 on_task_complete=on_task_complete,
             )
             results = await task_runner.run_all(tasks, task_names=task_names)
+            await card_generator.wait_for_stragglers()
         finally:
             self.progress_tracker.stop()
             self.progress_tracker.print_summary()
@@ -464,10 +627,17 @@ class DocumentOrchestrator:
             f"Total tokens: {self._total_input_tokens:,} in / "
             f"{self._total_output_tokens:,} out"
         )
+        if self._total_cached_input_tokens:
+            cached_share = self._total_cached_input_tokens / max(1, self._total_input_tokens)
+            logger.info(
+                f"Cached input tokens: {self._total_cached_input_tokens:,} "
+                f"({cached_share:.0%} of input)"
+            )
         logger.info(f"Total cost: ${self._current_cost_usd:.4f}")
         if self.budget_limit_usd is not None:
             remaining = self.budget_limit_usd - self._current_cost_usd
             logger.info(f"Budget remaining: ${remaining:.4f}")
+        log_run_metrics(self.card_generator)
         logger.info("=" * 60)
 
         return generated_problems
@@ -4,12 +4,17 @@ import asyncio
 import json
 import logging
 import time
-from typing import List, Dict, Optional, Any, Type
+from typing import List, Dict, Optional, Any, Set, Tuple, Type
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
+from src.json_repair import repair_json
 from src.models import LeetCodeProblem
+from src.prompts import get_model_schema, schema_json
 from src.providers.base import LLMProvider
+from src.providers.hedging import RequestHedger
+from src.providers.rate_limiter import estimate_prompt_tokens
+from src.providers.routing import GeneratorRouter
 from src.database import (
     DatabaseManager,
     create_problem,
@@ -34,6 +39,10 @@ class CardGenerator:
         run_id: Optional[str] = None,
         combine_prompt: Optional[str] = None,
         dry_run: bool = False,
+        hedger: Optional[RequestHedger] = None,
+        quorum: Optional[int] = None,
+        quorum_soft_deadline: Optional[float] = None,
+        router: Optional[GeneratorRouter] = None,
     ):
         """
         Initialize the card generator.
@@ -45,6 +54,13 @@ class CardGenerator:
             run_id: Run ID for database operations (None in dry run mode).
             combine_prompt: Optional prompt template for combining.
             dry_run: If True, skip API calls and database operations.
+            hedger: Optional request hedger for slow initial generation calls.
+            quorum: Combine once this many providers returned valid results
+                (None waits for all providers).
+            quorum_soft_deadline: Seconds after which to combine with whatever
+                valid results are in (requires at least one).
+            router: Optional router choosing a subset of providers per
+                question (None sends every question to every provider).
         """
         self.llm_providers = providers
         self.card_combiner = combiner
@@ -52,6 +68,18 @@ class CardGenerator:
         self.run_id = run_id
         self.combine_prompt = combine_prompt
         self.dry_run = dry_run
+        self.hedger = hedger
+        self.quorum = quorum
+        self.quorum_soft_deadline = quorum_soft_deadline
+        self.router = router
+
+        # Generation calls still running after their question reached quorum
+        self._stragglers: Set[asyncio.Task] = set()
+
+        # Combiner outputs parsed locally instead of via the LLM formatter
+        self.local_json_parses = 0
+        self.formatter_calls_saved = 0
+        self.formatter_tokens_saved = 0
 
         # Database manager
         self.db_manager = DatabaseManager.get_default()
@@ -59,14 +87,18 @@ class CardGenerator:
     def _save_provider_results(
         self,
         problem_id: int,
+        providers: List[LLMProvider],
         provider_results: List[str],
+        latencies: Dict[Tuple[str, str], float],
     ) -> List[str]:
         """
-        Save valid provider results to database.
+        Save provider results (including failed attempts) to database.
 
         Args:
             problem_id: ID of the problem.
+            providers: Providers the question was sent to.
             provider_results: List of raw results from providers.
+            latencies: Call time per finished (provider_name, model).
 
         Returns:
             List of valid (non-empty) results.
@@ -76,32 +108,58 @@ class CardGenerator:
         
         valid_results = []
 
-        for provider, result in zip(self.llm_providers, provider_results):
-            if not result:
+        for provider, result in zip(providers, provider_results):
+            latency = latencies.get((provider.name, provider.model))
+            if not result and latency is None:
+                # Still running after quorum: saved by its straggler task
                 continue
+            self._save_provider_result(problem_id, provider, result, latency)
+            if result:
+                valid_results.append(result)
+
+        return valid_results
+
+    def _save_provider_result(
+        self,
+        problem_id: int,
+        provider: LLMProvider,
+        result: str,
+        processing_time_seconds: Optional[float] = None,
+    ) -> None:
+        """
+        Save a single provider result to database and report it to the router.
 
-            # Count cards in result
-            card_count = None
+        Args:
+            problem_id: ID of the problem.
+            provider: Provider that produced the result.
+            result: Raw result from the provider ("" for a failed attempt).
+            processing_time_seconds: Time the provider call took.
+        """
+        # Count cards in result
+        card_count = None
+        if result:
             try:
                 result_json = json.loads(result)
                 card_count = len(result_json.get("cards", []))
-            except (json.JSONDecodeError, KeyError, TypeError):
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
                 pass
 
-            with self.db_manager.session_scope() as session:
-                create_provider_result(
-                    session=session,
-                    problem_id=problem_id,
-                    run_id=self.run_id,
-                    provider_name=provider.name,
-                    provider_model=provider.model,
-                    success=True,
-                    raw_output=result,
-                    card_count=card_count,
-                )
-            valid_results.append(result)
+        if self.router is not None:
+            self.router.record(provider, bool(result), processing_time_seconds, card_count)
 
-        return valid_results
+        with self.db_manager.session_scope() as session:
+            create_provider_result(
+                session=session,
+                problem_id=problem_id,
+                run_id=self.run_id,
+                provider_name=provider.name,
+                provider_model=provider.model,
+                success=bool(result),
+                raw_output=result or None,
+                card_count=card_count,
+                processing_time_seconds=processing_time_seconds,
+                error_message=None if result else "No valid response",
+            )
 
     def _post_process_cards(
         self,
@@ -139,45 +197,173 @@ class CardGenerator:
 
         return card_data
 
+    async def _generate_one(
+        self,
+        provider: LLMProvider,
+        question: str,
+        json_schema: Dict[str, Any],
+        prompt_template: Optional[str],
+        latencies: Optional[Dict[Tuple[str, str], float]] = None,
+    ) -> str:
+        """Generate initial cards with one provider, hedging if configured, recording its call time."""
+        start = time.monotonic()
+        try:
+            if self.hedger is None:
+                return await provider.generate_initial_cards(question, json_schema, prompt_template)
+
+            async def generate(target: LLMProvider) -> str:
+                return await target.generate_initial_cards(question, json_schema, prompt_template)
+
+            return await self.hedger.run(provider, generate)
+        finally:
+            if latencies is not None:
+                latencies[(provider.name, provider.model)] = time.monotonic() - start
+
     async def _generate_initial_cards(
         self,
         question: str,
         json_schema: Dict[str, Any],
         prompt_template: Optional[str],
+        problem_id: Optional[int] = None,
+        providers: Optional[List[LLMProvider]] = None,
+        latencies: Optional[Dict[Tuple[str, str], float]] = None,
     ) -> List[str]:
         """
-        Generate initial cards from all providers in parallel.
+        Generate initial cards from the providers in parallel.
+
+        Without a quorum, waits for every provider. With one, returns as
+        soon as `quorum` valid results are in, or once the soft deadline has
+        passed with at least one valid result. Providers still running are
+        reported as "" and detached; their results are saved to the
+        database under problem_id when they finish.
 
         Args:
             question: The question to generate cards for.
             json_schema: JSON schema for the card structure.
             prompt_template: Optional prompt template.
+            problem_id: Problem ID used to save straggler results.
+            providers: Providers to query (default: all generators).
+            latencies: Filled with the call time of each finished provider.
 
         Returns:
             List of raw results from each provider.
         """
-        generation_tasks = [
-            provider.generate_initial_cards(question, json_schema, prompt_template)
-            for provider in self.llm_providers
+        if providers is None:
+            providers = self.llm_providers
+        if latencies is None:
+            latencies = {}
+
+        if self.quorum is None and self.quorum_soft_deadline is None:
+            generation_tasks = [
+                self._generate_one(provider, question, json_schema, prompt_template, latencies)
+                for provider in providers
+            ]
+            return await asyncio.gather(*generation_tasks)
+
+        tasks = [
+            asyncio.ensure_future(
+                self._generate_one(provider, question, json_schema, prompt_template, latencies)
+            )
+            for provider in providers
         ]
-        return await asyncio.gather(*generation_tasks)
+        quorum = min(self.quorum or len(tasks), len(tasks))
+        deadline = (
+            time.monotonic() + self.quorum_soft_deadline
+            if self.quorum_soft_deadline is not None
+            else None
+        )
+
+        pending = set(tasks)
+        valid_count = 0
+        while pending and valid_count < quorum:
+            # The deadline is soft: without any valid result, keep waiting
+            timeout = None
+            if deadline is not None and valid_count > 0:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            valid_count += sum(
+                1 for task in done if task.exception() is None and task.result()
+            )
+
+        results = []
+        for provider, task in zip(providers, tasks):
+            if task in pending:
+                results.append("")
+                self._detach_straggler(provider, task, question, problem_id, latencies)
+            elif task.exception() is not None:
+                logger.error(
+                    f"{provider.name}/{provider.model} failed for '{question}': {task.exception()}"
+                )
+                results.append("")
+            else:
+                results.append(task.result())
+
+        if pending:
+            logger.info(
+                f"Quorum reached for '{question}' with {valid_count}/{len(tasks)} results; "
+                f"{len(pending)} provider(s) still running"
+            )
+        return results
+
+    def _detach_straggler(
+        self,
+        provider: LLMProvider,
+        task: "asyncio.Future[str]",
+        question: str,
+        problem_id: Optional[int],
+        latencies: Dict[Tuple[str, str], float],
+    ) -> None:
+        """Let a generation call finish in the background and save its result."""
+        if problem_id is None or self.run_id is None:
+            task.cancel()
+            return
+
+        async def store() -> None:
+            try:
+                result = await task
+            except Exception as e:
+                logger.debug(f"Straggler {provider.name}/{provider.model} failed for '{question}': {e}")
+                result = ""
+            self._save_provider_result(
+                problem_id, provider, result, latencies.get((provider.name, provider.model))
+            )
+            if result:
+                logger.debug(f"Saved straggler result from {provider.name}/{provider.model} for '{question}'")
+
+        straggler = asyncio.ensure_future(store())
+        self._stragglers.add(straggler)
+        straggler.add_done_callback(self._stragglers.discard)
+
+    async def wait_for_stragglers(self) -> None:
+        """Wait for detached generation calls to finish and be saved."""
+        if self._stragglers:
+            logger.info(f"Waiting for {len(self._stragglers)} straggler generation call(s)")
+            await asyncio.gather(*self._stragglers, return_exceptions=True)
 
     async def _combine_results(
         self,
         question: str,
         valid_results: List[str],
         json_schema: Dict[str, Any],
+        model_class: Optional[Type[BaseModel]] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         Combine multiple provider results into final card data.
 
-        If a formatter is configured, the combiner output is passed to the formatter
-        to produce valid JSON. Otherwise, the combiner must output valid JSON directly.
+        The combiner output is first parsed locally, repairing common JSON
+        defects, and validated against model_class. Only if that fails is it
+        passed to the formatter (if configured) to produce valid JSON.
+        Otherwise, the combiner must output valid JSON directly.
 
         Args:
             question: The question being processed.
             valid_results: List of valid provider results.
             json_schema: JSON schema for validation.
+            model_class: Pydantic model the combined data must validate against.
 
         Returns:
             Combined card data, or None if combining failed.
@@ -194,19 +380,49 @@ class CardGenerator:
         if not raw_combined:
             return None
 
+        use_formatter = self.formatter is not None and not self._is_same_provider(
+            self.card_combiner, self.formatter
+        )
+
+        # Try a deterministic local parse/repair before spending an LLM call
+        parsed = repair_json(raw_combined)
+        if isinstance(parsed, dict) and self._is_valid_card_data(parsed, model_class):
+            self.local_json_parses += 1
+            if use_formatter:
+                self.formatter_calls_saved += 1
+                self.formatter_tokens_saved += estimate_prompt_tokens(
+                    raw_combined + schema_json(json_schema)
+                ) + estimate_prompt_tokens(raw_combined)
+                logger.debug(f"Parsed combiner output locally for '{question}'; skipped formatter")
+            return parsed
+
         # If formatter is configured and different from combiner, use it to produce valid JSON
-        if self.formatter and not self._is_same_provider(self.card_combiner, self.formatter):
-            return await self.formatter.format_json(raw_combined, json_schema)
+        if use_formatter:
+            return await self.formatter.format_json(raw_combined, json_schema)  # type: ignore[union-attr]
+
+        # Otherwise accept the parsed output even if it doesn't validate (legacy behavior)
+        if isinstance(parsed, dict):
+            return parsed
+        logger.error(
+            f"Failed to parse combiner output as JSON for '{question}'. "
+            "Consider configuring a different formatter provider."
+        )
+        return None
 
-        # Otherwise try to parse directly (combiner must output valid JSON)
+    def _is_valid_card_data(
+        self,
+        card_data: Dict[str, Any],
+        model_class: Optional[Type[BaseModel]],
+    ) -> bool:
+        """Check that card data validates against the pydantic model (if given)."""
+        if model_class is None:
+            return True
         try:
-            return json.loads(raw_combined)
-        except json.JSONDecodeError:
-            logger.error(
-                f"Failed to parse combiner output as JSON for '{question}'. "
-                "Consider configuring a different formatter provider."
-            )
-            return None
+            model_class.model_validate(card_data)
+        except ValidationError as e:
+            logger.debug(f"Locally parsed JSON failed {model_class.__name__} validation: {e.error_count()} errors")
+            return False
+        return True
 
     def _is_same_provider(self, provider1: LLMProvider, provider2: LLMProvider) -> bool:
         """Check if two providers are the same (same name and model)."""
@@ -239,7 +455,7 @@ class CardGenerator:
             raise RuntimeError("CardGenerator requires a run_id for non-dry-run mode")
         
         start_time = time.time()
-        json_schema = model_class.model_json_schema()
+        json_schema = get_model_schema(model_class)
 
         with log_section(f"Processing: {question}"):
             # Create problem entry
@@ -254,14 +470,16 @@ class CardGenerator:
                 )
                 problem_id = int(problem.id)  # type: ignore[arg-type]
 
-            # Generate initial cards in parallel
+            # Choose generators for this question, then generate initial cards in parallel
+            providers = self.router.select(question) if self.router else self.llm_providers
+            latencies: Dict[Tuple[str, str], float] = {}
             with log_status(f"Generating initial ideas for '{question}'..."):
                 provider_results = await self._generate_initial_cards(
-                    question, json_schema, prompt_template
+                    question, json_schema, prompt_template, problem_id, providers, latencies
                 )
 
         # Save and filter valid results
-        valid_results = self._save_provider_results(problem_id, provider_results)
+        valid_results = self._save_provider_results(problem_id, providers, provider_results, latencies)
 
         if not valid_results:
             logger.error(f"All providers failed for '{question}'. Skipping.")
@@ -276,7 +494,7 @@ class CardGenerator:
 
         # Combine results
         final_card_data = await self._combine_results(
-            question, valid_results, json_schema
+            question, valid_results, json_schema, model_class
         )
 
         if not final_card_data:
@@ -0,0 +1,163 @@
+"""Deterministic local repair of almost-valid JSON from LLM output.
+
+Most combiner outputs that fail json.loads are broken in a few
+predictable ways: wrapped in code fences or prose, trailing commas,
+raw newlines or unescaped quotes inside strings, single-quoted strings,
+Python literals, or truncated before the closing brackets. repair_json()
+fixes these in a single pass so the LLM formatter is only needed when
+the content is genuinely malformed.
+"""
+
+import json
+import logging
+import re
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_FENCE_OPEN_RE = re.compile(r"```(?:json|JSON)?")
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _extract_json_text(text: str) -> str:
+    """
+    Strip code fences and surrounding prose, keeping the JSON value.
+
+    A fence is only stripped when it opens before the JSON value, so code
+    blocks inside string values (common in card content) are kept intact.
+    """
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    fence_start = text.find("```")
+    if fence_start != -1 and (not starts or fence_start < min(starts)):
+        body = text[_FENCE_OPEN_RE.match(text, fence_start).end():]
+        # The closing fence is the last one, unless JSON follows it (truncated output)
+        closing = body.rfind("```")
+        if closing != -1 and not any(char in body[closing + 3:] for char in '"}]'):
+            body = body[:closing]
+        if body.strip():
+            text = body
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if starts:
+        text = text[min(starts):]
+    return text.strip()
+
+
+def _closes_string(text: str, index: int) -> bool:
+    """Whether the quote at index ends a string (vs. an unescaped inner quote)."""
+    rest = text[index + 1:].lstrip()
+    return not rest or rest[0] in ",:}]"
+
+
+def _drop_dangling(out: List[str]) -> None:
+    """Remove trailing commas, or a key left without a value, from out."""
+    while True:
+        while out and out[-1].isspace():
+            out.pop()
+        if out and out[-1] == ",":
+            out.pop()
+        elif out and out[-1] == ":":
+            # Drop the orphaned key too (string pieces never contain a bare quote)
+            out.pop()
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == '"':
+                out.pop()
+                while out and out[-1] != '"':
+                    out.pop()
+                if out:
+                    out.pop()
+        else:
+            return
+
+
+def _repair_text(text: str) -> str:
+    """Rewrite text into (hopefully) valid JSON."""
+    out: List[str] = []
+    stack: List[str] = []
+    quote: Optional[str] = None  # Quote character of the string we're in
+    index = 0
+
+    while index < len(text):
+        char = text[index]
+
+        if quote is not None:
+            if char == "\\" and index + 1 < len(text):
+                escaped = text[index + 1]
+                # \' is valid in single-quoted strings but not in JSON
+                out.append("'" if escaped == "'" else text[index:index + 2])
+                index += 2
+                continue
+            if char == quote and _closes_string(text, index):
+                out.append('"')
+                quote = None
+            elif char == '"':
+                out.append('\\"')  # Unescaped quote inside a string
+            elif char in _STRING_ESCAPES:
+                out.append(_STRING_ESCAPES[char])
+            elif ord(char) < 0x20:
+                out.append(f"\\u{ord(char):04x}")
+            else:
+                out.append(char)
+            index += 1
+            continue
+
+        if char in "\"'":
+            quote = char
+            out.append('"')
+        elif char in _CLOSERS:
+            stack.append(char)
+            out.append(char)
+        elif char in "}]":
+            _drop_dangling(out)
+            if stack:
+                stack.pop()
+            out.append(char)
+            if not stack:
+                break  # Ignore anything after the top-level value
+        else:
+            literal = next(
+                (name for name in _PYTHON_LITERALS if text.startswith(name, index)), None
+            )
+            if literal is not None:
+                out.append(_PYTHON_LITERALS[literal])
+                index += len(literal)
+                continue
+            out.append(char)
+        index += 1
+
+    # Close whatever a truncated response left open
+    if quote is not None:
+        out.append('"')
+    _drop_dangling(out)
+    for opener in reversed(stack):
+        out.append(_CLOSERS[opener])
+    return "".join(out)
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """
+    Parse JSON from LLM output, repairing common defects if needed.
+
+    Args:
+        text: Raw model output that should contain a JSON value.
+
+    Returns:
+        The parsed value, or None if it could not be repaired.
+    """
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    candidate = _extract_json_text(text)
+    for attempt in (candidate, _repair_text(candidate)):
+        try:
+            return json.loads(attempt)
+        except json.JSONDecodeError:
+            continue
+    logger.debug("[JSON REPAIR] Could not repair content")
+    return None
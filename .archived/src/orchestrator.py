@@ -13,9 +13,16 @@ from src.task_runner import ConcurrentTaskRunner, Success, TaskInfo
 from src.utils import save_final_deck
 from src.questions import get_indexed_questions, filter_indexed_questions, QuestionFilter
 from src.progress import ProgressTracker, ProviderStatus
-from src.providers.base import TokenUsage
+from src.prompts import get_model_schema, prompts, render_prompt, schema_json
+from src.providers.backoff import BackoffGate
+from src.providers.base import LLMProvider, TokenUsage
+from src.providers.circuit_breaker import CircuitBreakers, CircuitState
+from src.providers.concurrency import AdaptiveConcurrency
+from src.providers.hedging import RequestHedger
+from src.providers.routing import GeneratorRouter
 from src.services.cost import CostEstimator, CostEstimate, RunCostData
 from src.database import DatabaseManager, create_run, update_run
+from src.run_summary import log_run_metrics
 from src.queries import (
     get_run_by_id,
     get_successful_questions_for_run,
@@ -76,12 +83,36 @@ class Orchestrator:
         self._current_cost_usd: float = 0.0
         self._total_input_tokens: int = 0
         self._total_output_tokens: int = 0
+        self._total_cached_input_tokens: int = 0
         self._budget_exceeded: bool = False
 
         # Load generation config
         config = load_config()
         self.concurrent_requests = config.generation.concurrent_requests
         self.request_delay = config.generation.request_delay
+        self.generation_config = config.generation
+
+        # Per provider/model adaptive concurrency, starting at the global limit
+        AdaptiveConcurrency.set_default(
+            AdaptiveConcurrency(
+                initial_limit=self.concurrent_requests,
+                min_limit=config.generation.min_provider_concurrency,
+                max_limit=config.generation.max_provider_concurrency,
+            )
+        )
+
+        # Provider-wide pauses after rate limits
+        BackoffGate.set_default(BackoffGate())
+
+        # Per provider/model circuit breakers
+        CircuitBreakers.set_default(
+            CircuitBreakers(
+                enabled=config.generation.circuit_breaker,
+                min_requests=config.generation.circuit_breaker_min_requests,
+                failure_threshold=config.generation.circuit_breaker_failure_threshold,
+                open_seconds=config.generation.circuit_breaker_open_seconds,
+            )
+        )
 
         # Database manager
         self.db_manager = DatabaseManager.get_default()
@@ -249,20 +280,62 @@ class Orchestrator:
             run_id=self._run_id,  # Pass run_id instead of repository
             combine_prompt=self.subject_config.combine_prompt,
             dry_run=self.dry_run,
+            hedger=self._create_hedger(),
+            quorum=self.generation_config.quorum,
+            quorum_soft_deadline=self.generation_config.quorum_soft_deadline,
+            router=self._create_router(llm_providers),
         )
 
         return True
 
-    def _get_all_provider_tuples(self) -> List[Tuple[str, str]]:
-        """Get list of (provider_name, model) tuples for all providers."""
-        all_providers: List[Tuple[str, str]] = []
-        for p in self._llm_providers:
-            all_providers.append((p.name, p.model))
+    def _create_hedger(self) -> Optional[RequestHedger]:
+        """Create the request hedger if hedging is enabled in the generation config."""
+        if not self.generation_config.hedge_requests or self.dry_run:
+            return None
+        return RequestHedger(
+            percentile=self.generation_config.hedge_percentile,
+            max_extra_fraction=self.generation_config.hedge_max_extra_fraction,
+        )
+
+    def _create_router(self, llm_providers: List[LLMProvider]) -> Optional[GeneratorRouter]:
+        """Create the generator router if a routing fan-out below the generator count is configured."""
+        fan_out = self.generation_config.routing_fan_out
+        if fan_out is None or fan_out >= len(llm_providers) or self.dry_run:
+            return None
+        router = GeneratorRouter.from_history(
+            llm_providers,
+            fan_out=fan_out,
+            cost_per_call={
+                (p.name, p.model): self.cost_estimator.estimate_cost_per_call(p.name) for p in llm_providers
+            },
+            latency_weight=self.generation_config.routing_latency_weight,
+            cost_weight=self.generation_config.routing_cost_weight,
+            window=self.generation_config.routing_history_window,
+        )
+        logger.info(f"[ROUTING] Sending each question to {fan_out} of {len(llm_providers)} generators")
+        return router
+
+    def _get_generator_tuples(self) -> List[Tuple[str, str]]:
+        """Get list of (provider_name, model) tuples for the generators."""
+        return [(p.name, p.model) for p in self._llm_providers]
+
+    def _get_combiner_tuples(self) -> List[Tuple[str, str]]:
+        """Get list of (provider_name, model) tuples for the combiner and formatter."""
+        combiners: List[Tuple[str, str]] = []
         if self._combiner:
-            all_providers.append((self._combiner.name, self._combiner.model))
+            combiners.append((self._combiner.name, self._combiner.model))
         if self._formatter and self._formatter != self._combiner:
-            all_providers.append((self._formatter.name, self._formatter.model))
-        return all_providers
+            combiners.append((self._formatter.name, self._formatter.model))
+        return combiners
+
+    def _render_initial_prompts(self, questions_with_metadata: List[Tuple]) -> List[str]:
+        """Render the initial prompt of each question (for token counting)."""
+        template = self.subject_config.initial_prompt or prompts.initial
+        schema = schema_json(get_model_schema(self.subject_config.target_model))
+        return [
+            render_prompt(template, question=question, schema=schema)
+            for _, _, _, question in questions_with_metadata
+        ]
 
     def _display_cost_estimate(self, estimate: CostEstimate) -> None:
         """Display cost estimate to the user."""
@@ -366,12 +439,17 @@ class Orchestrator:
             questions_with_metadata = all_questions_with_metadata
 
         # Get all provider tuples for cost estimation
-        all_providers = self._get_all_provider_tuples()
+        generators = self._get_generator_tuples()
+        combiners = self._get_combiner_tuples()
+        all_providers = generators + combiners
 
         # Show cost estimate
         cost_estimate = self.cost_estimator.estimate_run_cost(
-            providers=all_providers,
+            providers=generators,
             question_count=len(questions_with_metadata),
+            prompts=self._render_initial_prompts(questions_with_metadata),
+            combiners=combiners,
+            fan_out=self.generation_config.routing_fan_out,
         )
         self._display_cost_estimate(cost_estimate)
 
@@ -414,6 +492,7 @@ class Orchestrator:
             # Update cost tracking
             self._total_input_tokens += usage.input_tokens
             self._total_output_tokens += usage.output_tokens
+            self._total_cached_input_tokens += usage.cached_input_tokens
             cost = self.cost_estimator.calculate_cost(
                 provider_name, usage.input_tokens, usage.output_tokens
             )
@@ -430,6 +509,18 @@ class Orchestrator:
                     tokens_output=usage.output_tokens,
                 )
 
+        def on_concurrency_change(provider_name: str, model: str, limit: int, in_flight: int):
+            if self.progress_tracker:
+                self.progress_tracker.update_provider_concurrency(provider_name, model, limit, in_flight)
+
+        AdaptiveConcurrency.get_default().on_change = on_concurrency_change
+
+        def on_circuit_change(provider_name: str, model: str, state: CircuitState):
+            if self.progress_tracker:
+                self.progress_tracker.update_provider_circuit(provider_name, model, state.value)
+
+        CircuitBreakers.get_default().on_change = on_circuit_change
+
         # Wire up the callback to all providers
         for provider in self._llm_providers:
             if hasattr(provider, 'on_token_usage'):
@@ -487,6 +578,7 @@ class Orchestrator:
                 on_task_complete=on_task_complete,
             )
             results = await task_runner.run_all(tasks, task_names=task_names)
+            await card_generator.wait_for_stragglers()
         finally:
             # Stop progress display
             self.progress_tracker.stop()
@@ -526,10 +618,17 @@ class Orchestrator:
         logger.info("ACTUAL COST SUMMARY")
         logger.info("=" * 60)
         logger.info(f"Total tokens: {self._total_input_tokens:,} in / {self._total_output_tokens:,} out")
+        if self._total_cached_input_tokens:
+            cached_share = self._total_cached_input_tokens / max(1, self._total_input_tokens)
+            logger.info(
+                f"Cached input tokens: {self._total_cached_input_tokens:,} "
+                f"({cached_share:.0%} of input)"
+            )
         logger.info(f"Total cost: ${self._current_cost_usd:.4f}")
         if self.budget_limit_usd is not None:
             remaining = self.budget_limit_usd - self._current_cost_usd
             logger.info(f"Budget remaining: ${remaining:.4f}")
+        log_run_metrics(self.card_generator)
         logger.info("=" * 60)
 
         return all_generated_problems
@@ -43,6 +43,9 @@ class ProviderStats:
     tokens_input: int = 0
     tokens_output: int = 0
     estimated_cost: float = 0.0
+    concurrency_limit: Optional[int] = None
+    in_flight: int = 0
+    circuit_state: str = "closed"
     
     @property
     def status_icon(self) -> str:
@@ -168,6 +171,8 @@ class ProgressTracker:
         table.add_column("Status", justify="center")
         table.add_column("Success", justify="right", style="green")
         table.add_column("Failed", justify="right", style="red")
+        table.add_column("Conc.", justify="right", style="magenta")
+        table.add_column("Circuit", justify="center")
         table.add_column("Tokens", justify="right")
         table.add_column("Cost", justify="right", style="yellow")
         
@@ -175,6 +180,9 @@ class ProgressTracker:
             status_text = Text(f"{stats.status_icon} {stats.status.value}", style=stats.status_style)
             tokens = f"{stats.tokens_input + stats.tokens_output:,}" if stats.tokens_input + stats.tokens_output > 0 else "-"
             cost = f"${stats.estimated_cost:.4f}" if stats.estimated_cost > 0 else "-"
+            concurrency = f"{stats.in_flight}/{stats.concurrency_limit}" if stats.concurrency_limit else "-"
+            circuit_styles = {"open": "bold red", "half-open": "yellow"}
+            circuit = Text(stats.circuit_state, style=circuit_styles.get(stats.circuit_state, "dim"))
             
             table.add_row(
                 stats.name,
@@ -182,6 +190,8 @@ class ProgressTracker:
                 status_text,
                 str(stats.requests_success) if stats.requests_success > 0 else "-",
                 str(stats.requests_failed) if stats.requests_failed > 0 else "-",
+                concurrency,
+                circuit,
                 tokens,
                 cost,
             )
@@ -326,6 +336,52 @@ class ProgressTracker:
         
         self._refresh()
 
+    def update_provider_concurrency(
+        self,
+        provider_name: str,
+        model: str,
+        limit: int,
+        in_flight: int,
+    ) -> None:
+        """Update adaptive concurrency state for a provider.
+        
+        Args:
+            provider_name: Name of the provider
+            model: Model name
+            limit: Current concurrency limit
+            in_flight: Requests currently in flight
+        """
+        key = f"{provider_name}/{model}"
+        if key not in self.providers:
+            self.providers[key] = ProviderStats(name=provider_name, model=model)
+        
+        stats = self.providers[key]
+        stats.concurrency_limit = limit
+        stats.in_flight = in_flight
+        
+        self._refresh()
+
+    def update_provider_circuit(
+        self,
+        provider_name: str,
+        model: str,
+        state: str,
+    ) -> None:
+        """Update circuit breaker state for a provider.
+        
+        Args:
+            provider_name: Name of the provider
+            model: Model name
+            state: Breaker state ("closed", "open" or "half-open")
+        """
+        key = f"{provider_name}/{model}"
+        if key not in self.providers:
+            self.providers[key] = ProviderStats(name=provider_name, model=model)
+        
+        self.providers[key].circuit_state = state
+        
+        self._refresh()
+
     def get_summary(self) -> Dict:
         """Get final summary statistics.
         
@@ -1,10 +1,23 @@
-"""Prompt loading utilities for LLM2Deck."""
+"""Prompt loading and rendering utilities for LLM2Deck."""
 
+import json
 import os
+import re
+import time
 import warnings
+from collections import OrderedDict
 from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+# Placeholders look like {question}; other braces (e.g. JSON examples) are literal text
+_PLACEHOLDER_RE = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+# Serialized schema strings kept for recently used schema dicts
+_SCHEMA_TEXT_CACHE_SIZE = 32
+# Placeholders filled with per-request content; everything else in a template is static
+VARIABLE_PLACEHOLDERS = frozenset({"question", "inputs", "title", "topic_path", "document_content"})
 
 
 class PromptLoader:
@@ -165,6 +178,204 @@ class PromptLoader:
 prompts = PromptLoader()
 
 
+class CompiledTemplate:
+    """
+    A prompt template parsed once into literal and placeholder segments.
+
+    Rendering fills all placeholders in a single pass and join, instead of
+    one str.replace() scan of the whole template per placeholder. Values
+    are inserted verbatim, so placeholder-like text inside a value (e.g. a
+    question mentioning "{schema}") is never substituted. Placeholders
+    without a value are kept as-is.
+    """
+
+    def __init__(self, template: str):
+        """
+        Parse a template.
+
+        Args:
+            template: Template text with {name} placeholders
+        """
+        self.template = template
+        # Even indices are literal text, odd indices are placeholder names
+        self._segments: List[str] = _PLACEHOLDER_RE.split(template)
+        self.placeholders = frozenset(self._segments[1::2])
+
+    def render(self, **values: str) -> str:
+        """
+        Render the template.
+
+        Args:
+            **values: Placeholder values by name
+
+        Returns:
+            The rendered prompt.
+        """
+        if not self.placeholders:
+            return self.template
+        segments = self._segments
+        parts = [
+            segment if index % 2 == 0 else values.get(segment, "{" + segment + "}")
+            for index, segment in enumerate(segments)
+        ]
+        return "".join(parts)
+
+    def render_cache_friendly(
+        self, variable: frozenset = VARIABLE_PLACEHOLDERS, **values: str
+    ) -> str:
+        """
+        Render with all per-request content moved after the static text.
+
+        Variable placeholders are replaced in place by a <name> reference and
+        their values are appended at the end in <name>...</name> blocks, so
+        the instructions and schema form an identical prefix on every
+        request that providers with prefix caching can reuse.
+
+        Args:
+            variable: Names of placeholders holding per-request content
+            **values: Placeholder values by name
+
+        Returns:
+            The rendered prompt.
+        """
+        parts: List[str] = []
+        trailing: Dict[str, str] = {}
+        for index, segment in enumerate(self._segments):
+            if index % 2 == 0:
+                parts.append(segment)
+            elif segment not in values:
+                parts.append("{" + segment + "}")
+            elif segment in variable:
+                parts.append(f"<{segment}>")
+                trailing.setdefault(segment, f"<{segment}>\n{values[segment]}\n</{segment}>")
+            else:
+                parts.append(values[segment])
+        if not trailing:
+            return "".join(parts)
+        return "".join(parts).rstrip() + "\n\n" + "\n\n".join(trailing.values()) + "\n"
+
+
+@lru_cache(maxsize=64)
+def compile_template(template: str) -> CompiledTemplate:
+    """
+    Get the compiled form of a template (parsed once per distinct template).
+
+    Args:
+        template: Template text
+
+    Returns:
+        The cached CompiledTemplate.
+    """
+    return CompiledTemplate(template)
+
+
+def render_prompt(template: str, **values: str) -> str:
+    """
+    Render a template through the compiled-template cache.
+
+    Args:
+        template: Template text with {name} placeholders
+        **values: Placeholder values by name
+
+    Returns:
+        The rendered prompt.
+    """
+    return compile_template(template).render(**values)
+
+
+def render_cache_friendly_prompt(template: str, **values: str) -> str:
+    """
+    Render a template with static content first and per-request content last.
+
+    Args:
+        template: Template text with {name} placeholders
+        **values: Placeholder values by name
+
+    Returns:
+        The rendered prompt (see CompiledTemplate.render_cache_friendly).
+    """
+    return compile_template(template).render_cache_friendly(**values)
+
+
+@lru_cache(maxsize=None)
+def get_model_schema(model_class: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Get a model's JSON schema, generated once per model class.
+
+    The returned dict is shared; callers must not modify it.
+
+    Args:
+        model_class: Pydantic model class
+
+    Returns:
+        The model's JSON schema.
+    """
+    return model_class.model_json_schema()
+
+
+_schema_text_cache: "OrderedDict[int, Tuple[Dict[str, Any], str]]" = OrderedDict()
+
+
+def schema_json(json_schema: Dict[str, Any]) -> str:
+    """
+    Serialize a JSON schema for embedding in a prompt, cached per schema dict.
+
+    Schemas from get_model_schema() are the same dict object on every call,
+    so each is serialized once. The cache holds a reference to the dict so
+    its id cannot be reused while cached.
+
+    Args:
+        json_schema: JSON schema dict
+
+    Returns:
+        The schema as indented JSON.
+    """
+    key = id(json_schema)
+    cached = _schema_text_cache.get(key)
+    if cached is not None and cached[0] is json_schema:
+        _schema_text_cache.move_to_end(key)
+        return cached[1]
+    text = json.dumps(json_schema, indent=2, ensure_ascii=False)
+    _schema_text_cache[key] = (json_schema, text)
+    if len(_schema_text_cache) > _SCHEMA_TEXT_CACHE_SIZE:
+        _schema_text_cache.popitem(last=False)
+    return text
+
+
+def benchmark_prompt_rendering(
+    template: str,
+    json_schema: Dict[str, Any],
+    question: str = "Two Sum",
+    iterations: int = 1000,
+) -> Dict[str, float]:
+    """
+    Micro-benchmark compiled rendering against per-call replace/json.dumps.
+
+    Args:
+        template: Template with {question} and {schema} placeholders
+        json_schema: Schema to embed
+        question: Question text to embed
+        iterations: Renders per variant
+
+    Returns:
+        Dict with average microseconds per render for "legacy" and
+        "compiled", and the resulting "speedup".
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        template.replace("{question}", question).replace(
+            "{schema}", json.dumps(json_schema, indent=2, ensure_ascii=False)
+        )
+    legacy = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render_prompt(template, question=question, schema=schema_json(json_schema))
+    compiled = (time.perf_counter() - start) / iterations * 1e6
+
+    return {"legacy": legacy, "compiled": compiled, "speedup": legacy / compiled if compiled else 0.0}
+
+
 # Deprecated module-level constants - use prompts singleton instead
 def __getattr__(name: str):
     """Lazy access to deprecated module-level constants with deprecation warnings."""
@@ -216,3 +427,13 @@ def load_prompt(prompt_filename: str) -> str:
         stacklevel=2,
     )
     return prompts._load(prompt_filename)
+
+
+if __name__ == "__main__":
+    from src.models import LeetCodeProblem
+
+    results = benchmark_prompt_rendering(prompts.initial, get_model_schema(LeetCodeProblem))
+    print(
+        f"legacy: {results['legacy']:.1f}us  compiled: {results['compiled']:.1f}us  "
+        f"speedup: {results['speedup']:.1f}x"
+    )
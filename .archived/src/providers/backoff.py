@@ -0,0 +1,175 @@
+"""Retry backoff: full jitter, Retry-After and provider-wide pauses.
+
+Plain exponential backoff makes every task that hit the same 429 sleep
+for the same time, so they retry in lockstep and collide again. Retries
+here wait a uniformly random time up to the exponential cap ("full
+jitter"), plus the server's Retry-After when the RateLimitError carries
+one.
+
+A 429 also pauses its provider in the shared BackoffGate: every request
+to that provider (new ones as well as retries) waits until the pause
+ends, and waiters are released over a short random spread rather than
+all at once. One rate-limited task therefore throttles the provider's
+whole pool instead of each task rediscovering the limit.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from tenacity import RetryCallState
+from tenacity.wait import wait_base
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on a server-provided Retry-After (guards against absurd values)
+MAX_RETRY_AFTER_SECONDS = 120.0
+# Waiters leave a pause spread uniformly over this many seconds
+DEFAULT_RELEASE_SPREAD_SECONDS = 1.0
+
+
+def full_jitter_delay(attempt: int, min_wait: float, max_wait: float) -> float:
+    """
+    Compute a full-jitter backoff delay.
+
+    Args:
+        attempt: 1-based number of the attempt that failed
+        min_wait: Base delay (cap for the first retry)
+        max_wait: Maximum cap
+
+    Returns:
+        A delay drawn uniformly from [0, min(max_wait, min_wait * 2^(attempt-1))].
+    """
+    cap = min(max_wait, min_wait * 2 ** max(0, attempt - 1))
+    return random.uniform(0, cap)
+
+
+def clamp_retry_after(retry_after: Optional[float]) -> Optional[float]:
+    """Clamp a Retry-After delay to [0, MAX_RETRY_AFTER_SECONDS] (None stays None)."""
+    if retry_after is None:
+        return None
+    return min(max(0.0, retry_after), MAX_RETRY_AFTER_SECONDS)
+
+
+class RetryAfterWait(wait_base):
+    """
+    Tenacity wait strategy: full jitter plus the error's Retry-After.
+
+    The Retry-After is read from a `retry_after` attribute on the raised
+    exception (set on RateLimitError by the providers).
+    """
+
+    def __init__(self, min_wait: float = 1.0, max_wait: float = 10.0):
+        """
+        Initialize the wait strategy.
+
+        Args:
+            min_wait: Base delay for the first retry
+            max_wait: Maximum jittered delay (Retry-After is added on top)
+        """
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        delay = full_jitter_delay(retry_state.attempt_number, self.min_wait, self.max_wait)
+        error = retry_state.outcome.exception() if retry_state.outcome else None
+        retry_after = clamp_retry_after(getattr(error, "retry_after", None))
+        return delay + retry_after if retry_after else delay
+
+
+class BackoffGate:
+    """
+    Provider-wide pauses after rate limits.
+
+    Supports both singleton access (via get_default()) and dependency
+    injection. Providers call wait() before each attempt and pause()
+    when an attempt is rate limited.
+    """
+
+    _instance: Optional["BackoffGate"] = None
+
+    def __init__(self, release_spread: float = DEFAULT_RELEASE_SPREAD_SECONDS):
+        """
+        Initialize the gate with no paused providers.
+
+        Args:
+            release_spread: Seconds over which waiters are released when a pause ends
+        """
+        self.release_spread = release_spread
+        self._paused_until: Dict[str, float] = {}
+        self._pauses: Counter[str] = Counter()
+        self._wait_seconds: Counter[str] = Counter()
+
+    def remaining(self, provider_name: str) -> float:
+        """Seconds left in the provider's current pause (0 if not paused)."""
+        return max(0.0, self._paused_until.get(provider_name, 0.0) - time.monotonic())
+
+    def pause(self, provider_name: str, seconds: float) -> None:
+        """
+        Pause a provider for at least the given time.
+
+        A shorter pause never cuts an existing longer one short.
+
+        Args:
+            provider_name: Provider to pause
+            seconds: Pause length in seconds
+        """
+        seconds = min(max(0.0, seconds), MAX_RETRY_AFTER_SECONDS)
+        until = time.monotonic() + seconds
+        if until <= self._paused_until.get(provider_name, 0.0):
+            return
+        self._paused_until[provider_name] = until
+        self._pauses[provider_name] += 1
+        logger.info(f"[BACKOFF] {provider_name} rate limited; pausing requests for {seconds:.1f}s")
+
+    async def wait(self, provider_name: str) -> None:
+        """Wait until the provider is no longer paused (returns at once if it is not)."""
+        waited = 0.0
+        # Loop: the pause may be extended by another 429 while waiting
+        while (remaining := self.remaining(provider_name)) > 0:
+            delay = remaining + random.uniform(0, self.release_spread)
+            await asyncio.sleep(delay)
+            waited += delay
+        if waited:
+            self._wait_seconds[provider_name] += waited
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get pause statistics.
+
+        Returns:
+            Dict mapping provider name to its pause count and total
+            seconds requests spent waiting.
+        """
+        return {
+            provider_name: {
+                "pauses": self._pauses[provider_name],
+                "wait_seconds": self._wait_seconds[provider_name],
+            }
+            for provider_name in self._pauses
+        }
+
+    @classmethod
+    def get_default(cls) -> "BackoffGate":
+        """Get or create the default singleton instance."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def set_default(cls, gate: "BackoffGate") -> None:
+        """
+        Set the default singleton instance.
+
+        Args:
+            gate: The BackoffGate instance to use as default.
+        """
+        cls._instance = gate
+
+    @classmethod
+    def reset_default(cls) -> None:
+        """Reset the default singleton (useful for testing cleanup)."""
+        cls._instance = None
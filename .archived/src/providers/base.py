@@ -1,19 +1,24 @@
 """Base class and utilities for LLM providers."""
 
+import functools
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable
 
 from tenacity import (
     retry,
     stop_after_attempt,
-    wait_exponential,
     retry_if_exception_type,
     before_sleep_log,
     RetryError,
 )
 
+from src.providers.backoff import BackoffGate, RetryAfterWait
+from src.providers.circuit_breaker import CircuitBreakers
+from src.providers.key_scheduler import KeyScheduler
+from src.prompts import render_cache_friendly_prompt, render_prompt
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,7 +27,8 @@ class TokenUsage:
     """Token usage statistics from an API call."""
     input_tokens: int = 0
     output_tokens: int = 0
-    
+    cached_input_tokens: int = 0  # Part of input_tokens served from the provider's prompt cache
+
     @property
     def total_tokens(self) -> int:
         return self.input_tokens + self.output_tokens
@@ -40,7 +46,17 @@ class RetryableError(Exception):
 
 class RateLimitError(RetryableError):
     """Raised when rate limit is hit."""
-    pass
+
+    def __init__(self, message: str = "", retry_after: Optional[float] = None):
+        """
+        Initialize the error.
+
+        Args:
+            message: Error message
+            retry_after: Server-provided Retry-After delay in seconds, if any
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 class TimeoutError(RetryableError):
@@ -53,31 +69,90 @@ class EmptyResponseError(RetryableError):
     pass
 
 
+class MalformedResponseError(RetryableError):
+    """Raised when a streamed response is aborted early as invalid JSON."""
+    pass
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """
+    Extract a Retry-After delay (seconds) from an SDK error's HTTP response.
+
+    Args:
+        error: Exception raised by an SDK, possibly carrying a `response`.
+
+    Returns:
+        Delay in seconds, or None if the header is absent or not numeric.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
 def create_retry_decorator(
     max_retries: int = 5,
     min_wait: float = 1,
     max_wait: float = 10,
     retry_logger: Optional[logging.Logger] = None,
+    provider_name: Optional[str] = None,
+    model: Optional[str] = None,
 ):
     """
-    Create a tenacity retry decorator with exponential backoff.
+    Create a tenacity retry decorator with full-jitter exponential backoff.
+
+    Retries wait a random time up to the exponential cap, plus the
+    Retry-After carried by a RateLimitError. If provider_name and model
+    are given, each attempt first waits out any provider-wide pause in
+    the BackoffGate (a RateLimitError pauses the provider for its
+    Retry-After, or min_wait), and is guarded by the provider/model's
+    circuit breaker: attempts other than rate-limited ones count towards
+    its failure rate, and once it is open the CircuitOpenError it raises
+    stops the retries immediately.
 
     Args:
         max_retries: Maximum number of retry attempts.
-        min_wait: Minimum wait time between retries in seconds.
-        max_wait: Maximum wait time between retries in seconds.
+        min_wait: Base wait time (cap for the first retry) in seconds.
+        max_wait: Maximum jittered wait time between retries in seconds.
         retry_logger: Logger for retry events.
+        provider_name: Provider name for backoff pauses and circuit breaking (optional).
+        model: Model name for circuit breaking (optional).
 
     Returns:
         A tenacity retry decorator.
     """
-    return retry(
+    retrying = retry(
         stop=stop_after_attempt(max_retries),
-        wait=wait_exponential(multiplier=1, min=min_wait, max=max_wait),
+        wait=RetryAfterWait(min_wait=min_wait, max_wait=max_wait),
         retry=retry_if_exception_type(RetryableError),
         before_sleep=before_sleep_log(retry_logger or logger, logging.WARNING),
         reraise=True,
     )
+    if provider_name is None or model is None:
+        return retrying
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def guarded(*args, **kwargs):
+            gate = BackoffGate.get_default()
+            await gate.wait(provider_name)
+            try:
+                async with CircuitBreakers.get_default().guard(
+                    provider_name, model, (RateLimitError,)
+                ):
+                    return await func(*args, **kwargs)
+            except RateLimitError as e:
+                gate.pause(provider_name, e.retry_after if e.retry_after is not None else min_wait)
+                raise
+
+        return retrying(guarded)
+
+    return decorator
 
 
 class LLMProvider(ABC):
@@ -92,6 +167,51 @@ class LLMProvider(ABC):
     DEFAULT_JSON_PARSE_RETRIES = 5
     DEFAULT_RETRY_DELAY = 1.0  # seconds
 
+    # Backoff bounds between retries (set from config defaults)
+    retry_min_wait: float = 1.0
+    retry_max_wait: float = 10.0
+
+    # Put static instructions/schema first and per-request content last (set from config)
+    cache_friendly_prompts: bool = False
+
+    def _render_prompt(self, template: str, **values: str) -> str:
+        """Render a prompt template, in cache-friendly layout if enabled."""
+        if self.cache_friendly_prompts:
+            return render_cache_friendly_prompt(template, **values)
+        return render_prompt(template, **values)
+
+    def _scheduled_keys(self) -> List[str]:
+        """All API keys of the provider's key scheduler (empty if keys are not scheduled)."""
+        scheduler = getattr(self, "api_key_iterator", None)
+        return scheduler.keys if isinstance(scheduler, KeyScheduler) else []
+
+    async def prewarm(self) -> None:
+        """Open connections ahead of the first request (no-op unless overridden)."""
+        return None
+
+    def _report_key_success(self, api_key: str, latency_seconds: Optional[float] = None) -> None:
+        """Report a successful request to the key scheduler, if keys are scheduled."""
+        scheduler = getattr(self, "api_key_iterator", None)
+        if isinstance(scheduler, KeyScheduler):
+            scheduler.report_success(api_key, latency_seconds)
+
+    def _has_available_key(self) -> bool:
+        """Whether the key scheduler has a key that is not cooling down (False if keys are not scheduled)."""
+        scheduler = getattr(self, "api_key_iterator", None)
+        return isinstance(scheduler, KeyScheduler) and scheduler.has_available_key()
+
+    def _report_key_failure(
+        self,
+        api_key: str,
+        rate_limited: bool = False,
+        retry_after: Optional[float] = None,
+        auth_failed: bool = False,
+    ) -> None:
+        """Report a key-attributable failure to the key scheduler, if keys are scheduled."""
+        scheduler = getattr(self, "api_key_iterator", None)
+        if isinstance(scheduler, KeyScheduler):
+            scheduler.report_failure(api_key, rate_limited, retry_after, auth_failed)
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -1,10 +1,17 @@
 """Cerebras LLM Provider using native Cerebras SDK."""
 
-import json
 import asyncio
+import json
+import time
 from typing import Any, Dict, Iterator, List, Optional
 
-from cerebras.cloud.sdk import Cerebras
+from cerebras.cloud.sdk import AsyncCerebras
+from cerebras.cloud.sdk import APIConnectionError as CerebrasConnectionError
+from cerebras.cloud.sdk import APITimeoutError as CerebrasTimeoutError
+from cerebras.cloud.sdk import AuthenticationError as CerebrasAuthenticationError
+from cerebras.cloud.sdk import InternalServerError as CerebrasInternalServerError
+from cerebras.cloud.sdk import PermissionDeniedError as CerebrasPermissionDeniedError
+from cerebras.cloud.sdk import RateLimitError as CerebrasRateLimitError
 from tenacity import RetryError
 
 from src.providers.base import (
@@ -12,8 +19,16 @@ from src.providers.base import (
     create_retry_decorator,
     RetryableError,
     EmptyResponseError,
+    RateLimitError,
+    TimeoutError,
+    get_retry_after,
 )
-from src.prompts import prompts
+from src.providers.circuit_breaker import CircuitOpenError
+from src.providers.client_pool import ClientPool
+from src.providers.concurrency import AdaptiveConcurrency
+from src.providers.parse_metrics import JsonParseMetrics
+from src.providers.rate_limiter import RateLimiter, estimate_prompt_tokens
+from src.prompts import prompts, schema_json
 from src.config.models import supports_reasoning_effort
 import logging
 
@@ -50,8 +65,20 @@ class CerebrasProvider(LLMProvider):
     def model(self) -> str:
         return self.model_name
 
-    def _get_client(self) -> Cerebras:
-        return Cerebras(api_key=next(self.api_key_iterator))
+    def _get_client(self, api_key: Optional[str] = None) -> AsyncCerebras:
+        """Get the pooled async client for an API key (next in rotation by default)."""
+        if api_key is None:
+            api_key = next(self.api_key_iterator)
+        return ClientPool.get_default().get_cerebras_client(api_key)
+
+    async def prewarm(self) -> None:
+        """Open a keep-alive connection for each API key's pooled client."""
+        pool = ClientPool.get_default()
+        warmups = [
+            pool.prewarm(self._get_client(key), lambda client: client.models.list())
+            for key in self._scheduled_keys()
+        ]
+        await asyncio.gather(*warmups)
 
     async def _make_request(
         self,
@@ -61,12 +88,20 @@ class CerebrasProvider(LLMProvider):
         """Make a request with retry logic."""
         retry_decorator = create_retry_decorator(
             max_retries=self.max_retries,
+            min_wait=self.retry_min_wait,
+            max_wait=self.retry_max_wait,
             retry_logger=logger,
+            provider_name=self.name,
+            model=self.model_name,
         )
+        rate_limiter = RateLimiter.get_default()
+        estimated_tokens = estimate_prompt_tokens(messages)
 
         @retry_decorator
         async def _do_request() -> str:
-            client = self._get_client()
+            api_key = next(self.api_key_iterator)
+            await rate_limiter.acquire(self.name, api_key, estimated_tokens)
+            client = self._get_client(api_key)
 
             # Build request parameters
             params = {
@@ -87,11 +122,33 @@ class CerebrasProvider(LLMProvider):
             if supports_reasoning_effort(self.model_name):
                 params["reasoning_effort"] = self.reasoning_effort
 
-            # Cerebras SDK is sync, so run in thread
-            # Use lambda to handle kwargs properly for type checker
-            completion = await asyncio.to_thread(
-                lambda: client.chat.completions.create(**params)  # type: ignore[arg-type]
-            )
+            try:
+                async with AdaptiveConcurrency.get_default().slot(
+                    self.name, self.model_name, (CerebrasRateLimitError, CerebrasTimeoutError)
+                ):
+                    with ClientPool.get_default().track_request("cerebras"):
+                        request_start = time.monotonic()
+                        completion = await client.chat.completions.create(**params)  # type: ignore[arg-type]
+                        self._report_key_success(api_key, time.monotonic() - request_start)
+            except CerebrasRateLimitError as e:
+                retry_after = get_retry_after(e)
+                self._report_key_failure(api_key, rate_limited=True, retry_after=retry_after)
+                raise RateLimitError(f"[{self.model_name}] Rate limit hit", retry_after=retry_after) from e
+            except (CerebrasAuthenticationError, CerebrasPermissionDeniedError) as e:
+                # Bench the key and retry with another one, if a healthy one is left
+                self._report_key_failure(api_key, auth_failed=True)
+                if not self._has_available_key():
+                    raise
+                raise RetryableError(f"[{self.model_name}] API key rejected ({e.status_code})") from e
+            except CerebrasTimeoutError as e:
+                raise TimeoutError(f"[{self.model_name}] Request timed out") from e
+            except (CerebrasConnectionError, CerebrasInternalServerError) as e:
+                raise RetryableError(f"[{self.model_name}] Request failed: {e}") from e
+
+            if getattr(completion, "usage", None):
+                rate_limiter.reconcile(
+                    self.name, api_key, estimated_tokens, completion.usage.total_tokens or 0
+                )
 
             content = completion.choices[0].message.content
             if not content:
@@ -99,10 +156,14 @@ class CerebrasProvider(LLMProvider):
                     f"[{self.model_name}] Received empty response"
                 )
 
+            JsonParseMetrics.get_default().record(self.name, self.model_name, content)
             return content
 
         try:
             return await _do_request()
+        except CircuitOpenError:
+            logger.debug(f"[{self.model_name}] Skipped: circuit breaker is open")
+            return None
         except RetryError:
             logger.error(f"[{self.model_name}] All retry attempts failed")
             return None
@@ -126,9 +187,7 @@ class CerebrasProvider(LLMProvider):
             },
             {
                 "role": "user",
-                "content": template.replace("{question}", question).replace(
-                    "{schema}", json.dumps(json_schema, indent=2, ensure_ascii=False)
-                ),
+                "content": self._render_prompt(template, question=question, schema=schema_json(json_schema)),
             },
         ]
 
@@ -155,9 +214,7 @@ class CerebrasProvider(LLMProvider):
             },
             {
                 "role": "user",
-                "content": template.replace("{question}", question).replace(
-                    "{inputs}", combined_inputs
-                ),
+                "content": self._render_prompt(template, question=question, inputs=combined_inputs),
             },
         ]
 
@@ -185,7 +242,7 @@ class CerebrasProvider(LLMProvider):
                 "role": "user",
                 "content": (
                     f"Format the following content into valid JSON matching this schema:\n\n"
-                    f"Schema:\n{json.dumps(json_schema, indent=2, ensure_ascii=False)}\n\n"
+                    f"Schema:\n{schema_json(json_schema)}\n\n"
                     f"Content to format:\n{raw_content}"
                 ),
             },
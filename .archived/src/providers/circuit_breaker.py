@@ -0,0 +1,287 @@
+"""Circuit breakers per provider/model.
+
+When a provider goes down, every question would otherwise still attempt
+it with the full retry budget. A breaker watches the outcome of recent
+request attempts; once the failure rate crosses a threshold it opens and
+requests fail instantly with CircuitOpenError (which is not retried).
+After a cooldown it lets a single probe through (half-open): success
+closes the breaker, failure opens it again.
+"""
+
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import AsyncIterator, Callable, Deque, Dict, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# Callback for state changes: (provider, model, state) -> None
+CircuitBreakerCallback = Callable[[str, str, "CircuitState"], None]
+
+
+class CircuitState(Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected because the circuit is open."""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker for a single provider/model.
+
+    Outcomes of the last `window_size` attempts are kept; once at least
+    `min_requests` are recorded and the failure rate reaches
+    `failure_threshold`, the breaker opens for `open_seconds`.
+    """
+
+    def __init__(
+        self,
+        window_size: int = 20,
+        min_requests: int = 5,
+        failure_threshold: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        """
+        Initialize the breaker (closed).
+
+        Args:
+            window_size: Number of recent attempts considered
+            min_requests: Attempts required before the breaker may open
+            failure_threshold: Failure rate (0.0 - 1.0) that opens the breaker
+            open_seconds: Seconds to stay open before probing
+            half_open_probes: Concurrent probe requests allowed while half-open
+        """
+        self.min_requests = min_requests
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)  # True = failure
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.rejected = 0
+        self.on_change: Optional[Callable[[CircuitState], None]] = None
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state (an open breaker turns half-open once its cooldown ends)."""
+        if self._state is CircuitState.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._set_state(CircuitState.HALF_OPEN)
+        return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def _set_state(self, state: CircuitState) -> None:
+        if state is self._state:
+            return
+        self._state = state
+        if state is CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        elif state is CircuitState.CLOSED:
+            self._outcomes.clear()
+        if self.on_change:
+            self.on_change(state)
+
+    def allow_request(self) -> bool:
+        """
+        Check whether an attempt may be made, reserving a probe if half-open.
+
+        Returns:
+            True if the attempt may proceed (call record_success/record_failure
+            afterwards), False if it should be rejected.
+        """
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return True
+        if state is CircuitState.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+            self._probes_in_flight += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful attempt."""
+        if self._state is CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._set_state(CircuitState.CLOSED)
+            return
+        self._outcomes.append(False)
+
+    def record_failure(self) -> None:
+        """Record a failed attempt, opening the breaker if needed."""
+        if self._state is CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._set_state(CircuitState.OPEN)
+            return
+        self._outcomes.append(True)
+        if (
+            self._state is CircuitState.CLOSED
+            and len(self._outcomes) >= self.min_requests
+            and self.failure_rate >= self.failure_threshold
+        ):
+            self._set_state(CircuitState.OPEN)
+
+    def release_probe(self) -> None:
+        """Release a probe reservation without recording an outcome."""
+        if self._state is CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    @asynccontextmanager
+    async def guard(self, neutral_errors: Tuple[Type[BaseException], ...] = ()) -> AsyncIterator[None]:
+        """
+        Guard one request attempt.
+
+        Raises CircuitOpenError if the breaker rejects the attempt. Any
+        other exception raised inside the block counts as a failure, except
+        `neutral_errors` (throttling such as RateLimitError, which the
+        backoff already absorbs) and cancellation, which record nothing.
+
+        Args:
+            neutral_errors: Exception types that count as neither success nor failure
+        """
+        if not self.allow_request():
+            raise CircuitOpenError("circuit open")
+        try:
+            yield
+        except CircuitOpenError:
+            raise
+        except neutral_errors:
+            self.release_probe()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            self.release_probe()
+            raise
+        self.record_success()
+
+
+class CircuitBreakers:
+    """
+    Registry of circuit breakers keyed by (provider, model).
+
+    Supports both singleton access (via get_default()) and dependency
+    injection. Breakers are created lazily with the configured settings.
+    """
+
+    _instance: Optional["CircuitBreakers"] = None
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        window_size: int = 20,
+        min_requests: int = 5,
+        failure_threshold: float = 0.5,
+        open_seconds: float = 30.0,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            enabled: If False, guard() never rejects or records anything
+            window_size: Recent attempts considered by each breaker
+            min_requests: Attempts required before a breaker may open
+            failure_threshold: Failure rate that opens a breaker
+            open_seconds: Seconds a breaker stays open before probing
+        """
+        self.enabled = enabled
+        self.window_size = window_size
+        self.min_requests = min_requests
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.on_change: Optional[CircuitBreakerCallback] = None
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, provider_name: str, model: str) -> CircuitBreaker:
+        """Get (or create) the breaker for a provider/model."""
+        key = (provider_name, model)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                window_size=self.window_size,
+                min_requests=self.min_requests,
+                failure_threshold=self.failure_threshold,
+                open_seconds=self.open_seconds,
+            )
+
+            def notify(state: CircuitState) -> None:
+                if state is CircuitState.OPEN:
+                    logger.warning(
+                        f"[CIRCUIT] {provider_name}/{model} opened; "
+                        f"skipping it for {self.open_seconds:.0f}s"
+                    )
+                else:
+                    logger.info(f"[CIRCUIT] {provider_name}/{model} is {state.value}")
+                if self.on_change:
+                    self.on_change(provider_name, model, state)
+
+            breaker.on_change = notify
+            self._breakers[key] = breaker
+        return breaker
+
+    @asynccontextmanager
+    async def guard(
+        self,
+        provider_name: str,
+        model: str,
+        neutral_errors: Tuple[Type[BaseException], ...] = (),
+    ) -> AsyncIterator[None]:
+        """Shortcut for get(provider_name, model).guard(neutral_errors) (no-op when disabled)."""
+        if not self.enabled:
+            yield
+            return
+        async with self.get(provider_name, model).guard(neutral_errors):
+            yield
+
+    def get_stats(self) -> Dict[str, Dict[str, object]]:
+        """
+        Get breaker states.
+
+        Returns:
+            Dict mapping "provider/model" to its state, failure rate and
+            number of rejected attempts.
+        """
+        return {
+            f"{name}/{model}": {
+                "state": breaker.state.value,
+                "failure_rate": breaker.failure_rate,
+                "rejected": breaker.rejected,
+            }
+            for (name, model), breaker in self._breakers.items()
+        }
+
+    @classmethod
+    def get_default(cls) -> "CircuitBreakers":
+        """Get or create the default singleton instance."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def set_default(cls, registry: "CircuitBreakers") -> None:
+        """
+        Set the default singleton instance.
+
+        Args:
+            registry: The CircuitBreakers instance to use as default.
+        """
+        cls._instance = registry
+
+    @classmethod
+    def reset_default(cls) -> None:
+        """Reset the default singleton (useful for testing cleanup)."""
+        cls._instance = None
@@ -0,0 +1,256 @@
+"""Shared pool of long-lived SDK clients for LLM providers.
+
+Creating a fresh SDK client per request opens a new HTTP connection pool
+(and TLS handshake) every time. The pool keeps one client per
+(base_url, api_key) so connections are kept alive and reused across
+requests, while providers still pick a key per request for rotation.
+An optional transport factory lets every pooled client route through a
+custom httpx transport (e.g. traffic recording or replay).
+
+All pooled clients are native async clients, so requests never occupy a
+worker thread; in-flight requests per client kind are tracked as a metric.
+SDK-level retries are disabled on the OpenAI and Cerebras clients: the
+providers' own retry loop handles them, so backoff (and provider-wide
+Retry-After pauses) happen in one place.
+"""
+
+import inspect
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Set, Tuple
+
+import httpx
+from cerebras.cloud.sdk import AsyncCerebras
+from google import genai
+from google.genai import types
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+logger = logging.getLogger(__name__)
+
+# Connection tuning shared by all pooled HTTP clients
+DEFAULT_MAX_CONNECTIONS = 64
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 32
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+
+
+class ClientPool:
+    """
+    Keeps one long-lived client per (kind, base_url, api_key).
+
+    Supports both singleton access (via get_default()) and dependency
+    injection, mirroring DatabaseManager. Call aclose() at shutdown to
+    close every pooled client and its connections.
+    """
+
+    _instance: Optional["ClientPool"] = None
+
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        transport_factory: Optional[Callable[[httpx.Limits], httpx.AsyncBaseTransport]] = None,
+    ):
+        """
+        Initialize the client pool.
+
+        Args:
+            max_connections: Maximum open connections per pooled client
+            max_keepalive_connections: Maximum idle connections kept alive per client
+            keepalive_expiry: Seconds an idle connection is kept before closing
+            transport_factory: Optional callable building the httpx transport for
+                each pooled client from the pool limits
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.transport_factory = transport_factory
+        self._clients: Dict[Tuple[str, str, str], Any] = {}
+        self._warmed: Set[int] = set()
+        self._in_flight: Counter[str] = Counter()
+        self._peak_in_flight: Counter[str] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def _get_or_create(self, pool_key: Tuple[str, str, str], factory: Callable[[], Any]) -> Any:
+        """Return the pooled client for pool_key, creating it on first use."""
+        client = self._clients.get(pool_key)
+        if client is None:
+            client = factory()
+            self._clients[pool_key] = client
+            logger.debug(
+                f"[POOL] Created {pool_key[0]} client for {pool_key[1] or 'default endpoint'} "
+                f"({len(self._clients)} pooled)"
+            )
+        return client
+
+    def _create_transport(self) -> Optional[httpx.AsyncBaseTransport]:
+        """Build a custom transport for a new client, or None for the httpx default."""
+        return self.transport_factory(self.limits) if self.transport_factory else None
+
+    def get_openai_client(self, base_url: str, api_key: str, timeout: float) -> AsyncOpenAI:
+        """
+        Get the pooled AsyncOpenAI client for a base URL and API key.
+
+        Args:
+            base_url: API base URL
+            api_key: API key the client authenticates with
+            timeout: Default request timeout for a newly created client
+
+        Returns:
+            A shared AsyncOpenAI client, created on first use.
+        """
+        return self._get_or_create(
+            ("openai", base_url, api_key),
+            lambda: AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=timeout,
+                max_retries=0,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=self.limits, timeout=timeout, transport=self._create_transport()
+                ),
+            ),
+        )
+
+    def get_cerebras_client(self, api_key: str) -> AsyncCerebras:
+        """
+        Get the pooled AsyncCerebras client for an API key.
+
+        Args:
+            api_key: Cerebras API key
+
+        Returns:
+            A shared AsyncCerebras client, created on first use.
+        """
+        return self._get_or_create(
+            ("cerebras", "", api_key),
+            lambda: AsyncCerebras(
+                api_key=api_key,
+                max_retries=0,
+                http_client=httpx.AsyncClient(limits=self.limits, transport=self._create_transport()),
+            ),
+        )
+
+    def get_genai_client(self, api_key: str) -> genai.Client:
+        """
+        Get the pooled google-genai client for an API key.
+
+        Requests should go through the client's async surface (client.aio).
+
+        Args:
+            api_key: Google AI Studio API key
+
+        Returns:
+            A shared genai.Client, created on first use.
+        """
+        def factory() -> genai.Client:
+            transport = self._create_transport()
+            if transport is None:
+                return genai.Client(api_key=api_key)
+            return genai.Client(
+                api_key=api_key,
+                http_options=types.HttpOptions(httpx_async_client=httpx.AsyncClient(transport=transport)),
+            )
+
+        return self._get_or_create(("google_genai", "", api_key), factory)
+
+    async def prewarm(self, client: Any, request: Callable[[Any], Awaitable[Any]]) -> bool:
+        """
+        Open a keep-alive connection on a pooled client with a cheap request.
+
+        Each client is warmed at most once. Errors are ignored: even an
+        error response leaves the (TLS) connection open for reuse.
+
+        Args:
+            client: Pooled client to warm
+            request: Coroutine function issuing a cheap request on the client
+
+        Returns:
+            True if a warm-up request was sent, False if already warmed.
+        """
+        if id(client) in self._warmed:
+            return False
+        self._warmed.add(id(client))
+        try:
+            await request(client)
+        except Exception as e:
+            logger.debug(f"[POOL] Pre-warm request failed (connection may still be open): {e}")
+        return True
+
+    @contextmanager
+    def track_request(self, kind: str) -> Iterator[None]:
+        """
+        Count a request as in flight for the given client kind.
+
+        Args:
+            kind: Client kind label (e.g., "cerebras", "google_genai")
+        """
+        self._in_flight[kind] += 1
+        self._peak_in_flight[kind] = max(self._peak_in_flight[kind], self._in_flight[kind])
+        try:
+            yield
+        finally:
+            self._in_flight[kind] -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool metrics.
+
+        Returns:
+            Dict with pooled client count plus current and peak in-flight
+            requests per client kind.
+        """
+        return {
+            "clients": len(self._clients),
+            "in_flight": dict(self._in_flight),
+            "peak_in_flight": dict(self._peak_in_flight),
+        }
+
+    async def aclose(self) -> None:
+        """Close all pooled clients and release their connections."""
+        clients = list(self._clients.items())
+        self._clients.clear()
+        self._warmed.clear()
+        for (kind, _, _), client in clients:
+            try:
+                # genai.Client keeps a separate connection pool for its async surface
+                closer = client.aio.aclose if kind == "google_genai" else client.close
+                result = closer()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.debug(f"[POOL] Failed to close {kind} client: {e}")
+
+    @classmethod
+    def get_default(cls) -> "ClientPool":
+        """Get or create the default singleton instance."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def set_default(cls, pool: "ClientPool") -> None:
+        """
+        Set the default singleton instance.
+
+        Args:
+            pool: The ClientPool instance to use as default.
+        """
+        cls._instance = pool
+
+    @classmethod
+    def reset_default(cls) -> None:
+        """Reset the default singleton (useful for testing cleanup)."""
+        cls._instance = None
+
+
+async def close_client_pool() -> None:
+    """Close the default client pool, if one was created."""
+    if ClientPool._instance is not None:
+        logger.debug(f"[POOL] Closing clients: {ClientPool._instance.get_stats()}")
+        await ClientPool._instance.aclose()
@@ -0,0 +1,223 @@
+"""Adaptive (AIMD) concurrency limits per provider/model.
+
+Each provider/model gets its own limit on in-flight requests. The limit
+grows additively while requests succeed and is halved when the provider
+signals overload (RateLimitError or TimeoutError), so every provider
+settles at its own sustainable throughput instead of sharing one global
+concurrent_requests value.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, Optional, Tuple, Type
+
+from src.providers.base import RateLimitError, TimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Without an explicit ceiling a limit may grow to this multiple of its initial value
+DEFAULT_MAX_LIMIT_FACTOR = 2
+
+# Callback for limit changes: (provider, model, limit, in_flight) -> None
+ConcurrencyCallback = Callable[[str, str, int, int], None]
+
+
+@dataclass
+class ConcurrencyState:
+    """Snapshot of an adaptive limiter."""
+
+    limit: int
+    in_flight: int
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Additive-increase / multiplicative-decrease limit on in-flight requests.
+
+    The limit grows by `increase` per full window of successes (i.e. by
+    increase / limit per success) and is multiplied by `decrease_factor`
+    on overload, at most once per `decrease_cooldown` seconds so a burst
+    of 429s from the same window only backs off once.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 2.0,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial_limit: Starting concurrency limit
+            min_limit: Lowest the limit may drop to
+            max_limit: Highest the limit may grow to (default: 2x initial_limit)
+            increase: Additive increase per window of successful requests
+            decrease_factor: Multiplier applied to the limit on overload
+            decrease_cooldown: Minimum seconds between two decreases
+        """
+        self.min_limit = max(1, min_limit)
+        if max_limit is None:
+            max_limit = initial_limit * DEFAULT_MAX_LIMIT_FACTOR
+        self.max_limit = max(self.min_limit, max_limit)
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+        self.on_change: Optional[Callable[[ConcurrencyState], None]] = None
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def state(self) -> ConcurrencyState:
+        return ConcurrencyState(limit=self.limit, in_flight=self._in_flight)
+
+    def _notify(self) -> None:
+        if self.on_change:
+            self.on_change(self.state)
+
+    async def acquire(self) -> None:
+        """Wait for a free slot under the current limit."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        self._notify()
+
+    async def release(self, succeeded: bool = False, overloaded: bool = False) -> None:
+        """
+        Free a slot and adapt the limit.
+
+        Args:
+            succeeded: The request completed successfully (additive increase)
+            overloaded: The provider signalled overload (multiplicative decrease)
+        """
+        async with self._condition:
+            self._in_flight -= 1
+            if overloaded:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+                    self._last_decrease = now
+            elif succeeded:
+                self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+            self._condition.notify_all()
+        self._notify()
+
+    @asynccontextmanager
+    async def slot(self, overload_errors: Tuple[Type[BaseException], ...] = ()) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of one request attempt.
+
+        RateLimitError, TimeoutError and any of `overload_errors` (e.g. SDK
+        specific 429/timeout exceptions) raised inside the block count as
+        overload; other exceptions release the slot without adapting.
+
+        Args:
+            overload_errors: Additional exception types that signal overload
+        """
+        await self.acquire()
+        try:
+            yield
+        except (RateLimitError, TimeoutError, *overload_errors):
+            await self.release(overloaded=True)
+            raise
+        except BaseException:
+            await self.release()
+            raise
+        await self.release(succeeded=True)
+
+
+class AdaptiveConcurrency:
+    """
+    Registry of adaptive limiters keyed by (provider, model).
+
+    Supports both singleton access (via get_default()) and dependency
+    injection. Limiters are created lazily with the configured defaults.
+    """
+
+    _instance: Optional["AdaptiveConcurrency"] = None
+
+    def __init__(self, initial_limit: int = 8, min_limit: int = 1, max_limit: Optional[int] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            initial_limit: Starting limit for each provider/model
+            min_limit: Lowest limit any provider/model may drop to
+            max_limit: Highest limit any provider/model may grow to (default: 2x initial_limit)
+        """
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.on_change: Optional[ConcurrencyCallback] = None
+        self._limiters: Dict[Tuple[str, str], AdaptiveConcurrencyLimiter] = {}
+
+    def get(self, provider_name: str, model: str) -> AdaptiveConcurrencyLimiter:
+        """Get (or create) the limiter for a provider/model."""
+        key = (provider_name, model)
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=self.initial_limit,
+                min_limit=self.min_limit,
+                max_limit=self.max_limit,
+            )
+
+            def notify(state: ConcurrencyState) -> None:
+                if self.on_change:
+                    self.on_change(provider_name, model, state.limit, state.in_flight)
+
+            limiter.on_change = notify
+            self._limiters[key] = limiter
+        return limiter
+
+    def slot(self, provider_name: str, model: str, overload_errors: Tuple[Type[BaseException], ...] = ()):
+        """Shortcut for get(provider_name, model).slot(overload_errors)."""
+        return self.get(provider_name, model).slot(overload_errors)
+
+    def get_stats(self) -> Dict[str, ConcurrencyState]:
+        """
+        Get current limiter states.
+
+        Returns:
+            Dict mapping "provider/model" to its ConcurrencyState.
+        """
+        return {f"{name}/{model}": limiter.state for (name, model), limiter in self._limiters.items()}
+
+    @classmethod
+    def get_default(cls) -> "AdaptiveConcurrency":
+        """Get or create the default singleton instance."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def set_default(cls, registry: "AdaptiveConcurrency") -> None:
+        """
+        Set the default singleton instance.
+
+        Args:
+            registry: The AdaptiveConcurrency instance to use as default.
+        """
+        cls._instance = registry
+
+    @classmethod
+    def reset_default(cls) -> None:
+        """Reset the default singleton (useful for testing cleanup)."""
+        cls._instance = None
@@ -4,7 +4,10 @@ import asyncio
 from typing import Dict, Any, Optional, List, TYPE_CHECKING
 from g4f.client import AsyncClient
 from src.providers.base import LLMProvider
-from src.prompts import prompts
+from src.providers.circuit_breaker import CircuitBreakers, CircuitOpenError
+from src.providers.concurrency import AdaptiveConcurrency
+from src.providers.rate_limiter import RateLimiter, estimate_prompt_tokens
+from src.prompts import prompts, schema_json
 import logging
 
 if TYPE_CHECKING:
@@ -41,12 +44,19 @@ class G4FProvider(LLMProvider):
         chat_messages: List[Dict[str, Any]],
         json_schema: Dict[str, Any],
     ) -> Optional[str]:
+        rate_limiter = RateLimiter.get_default()
+        estimated_tokens = estimate_prompt_tokens(chat_messages)
+
         for attempt_number in range(self.max_retries):
             try:
-                api_response = await self.async_client.chat.completions.create(
-                    model=self.model_name,
-                    messages=chat_messages,  # type: ignore[arg-type]
-                )
+                await rate_limiter.acquire(self.name, "", estimated_tokens)
+                async with CircuitBreakers.get_default().guard(
+                    self.name, self.model_name
+                ), AdaptiveConcurrency.get_default().slot(self.name, self.model_name):
+                    api_response = await self.async_client.chat.completions.create(
+                        model=self.model_name,
+                        messages=chat_messages,  # type: ignore[arg-type]
+                    )
 
                 response_content = api_response.choices[0].message.content
                 if not response_content:
@@ -71,6 +81,9 @@ class G4FProvider(LLMProvider):
 
                 return response_content
 
+            except CircuitOpenError:
+                logger.debug(f"[G4F:{self.model_name}] Skipped: circuit breaker is open")
+                return None
             except Exception as error:
                 logger.error(
                     f"[G4F:{self.model_name}] Attempt {attempt_number + 1}/{self.max_retries} Error: {error}"
@@ -99,9 +112,7 @@ class G4FProvider(LLMProvider):
             },
             {
                 "role": "user",
-                "content": active_template.replace("{question}", question).replace(
-                    "{schema}", json.dumps(json_schema, indent=2, ensure_ascii=False)
-                ),
+                "content": self._render_prompt(active_template, question=question, schema=schema_json(json_schema)),
             },
         ]
 
@@ -128,9 +139,7 @@ class G4FProvider(LLMProvider):
             },
             {
                 "role": "user",
-                "content": active_template.replace("{question}", question).replace(
-                    "{inputs}", combined_inputs
-                ),
+                "content": self._render_prompt(active_template, question=question, inputs=combined_inputs),
             },
         ]
 
@@ -155,7 +164,7 @@ class G4FProvider(LLMProvider):
                 "role": "user",
                 "content": (
                     f"Format the following content into valid JSON matching this schema:\n\n"
-                    f"Schema:\n{json.dumps(json_schema, indent=2, ensure_ascii=False)}\n\n"
+                    f"Schema:\n{schema_json(json_schema)}\n\n"
                     f"Content to format:\n{raw_content}"
                 ),
             },
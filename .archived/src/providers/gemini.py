@@ -1,9 +1,8 @@
-import json
 from typing import Dict, Any, Optional
 from gemini_webapi import GeminiClient
 from gemini_webapi.constants import Model
 from src.providers.base import LLMProvider
-from src.prompts import prompts
+from src.prompts import prompts, schema_json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,9 +31,7 @@ class GeminiProvider(LLMProvider):
             active_template = (
                 prompt_template if prompt_template else prompts.initial
             )
-            formatted_prompt = active_template.replace("{question}", question).replace(
-                "{schema}", json.dumps(json_schema, indent=2, ensure_ascii=False)
-            )
+            formatted_prompt = self._render_prompt(active_template, question=question, schema=schema_json(json_schema))
             api_response = await self.gemini_client.generate_content(
                 formatted_prompt, model=Model.G_3_0_PRO
             )
@@ -1,8 +1,9 @@
 """Factory for Gemini WebAPI provider initialization."""
 
+import asyncio
 import json
 import logging
-from typing import List
+from typing import Dict, List, Optional
 
 from src.config.keys import get_key_path
 from src.config.loader import DefaultsConfig, ProviderConfig
@@ -45,8 +46,7 @@ async def create_gemini_providers(
         logger.error(f"Failed to load Gemini credentials: {e}")
         return []
 
-    providers: List[LLMProvider] = []
-    for credentials in credentials_list:
+    async def init_client(credentials: Dict[str, str]) -> Optional[LLMProvider]:
         try:
             client = GeminiClient(
                 credentials["Secure_1PSID"],
@@ -54,9 +54,14 @@ async def create_gemini_providers(
                 proxy=None,
             )
             await client.init(auto_refresh=True)
-            providers.append(GeminiProvider(client))
+            return GeminiProvider(client)
         except Exception as error:
             logger.error(f"Failed to initialize Gemini client: {error}")
+            return None
+
+    # Cookie refresh is a network round-trip per credential set: run them concurrently
+    initialized = await asyncio.gather(*(init_client(credentials) for credentials in credentials_list))
+    providers: List[LLMProvider] = [provider for provider in initialized if provider is not None]
 
     if not providers:
         logger.warning("No Gemini clients could be initialized")
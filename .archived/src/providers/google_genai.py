@@ -1,11 +1,24 @@
 import json
 import asyncio
+import time
 import itertools
 from typing import Dict, Any, Optional, List, Iterator
 from google import genai
+from google.genai import errors as genai_errors
 from google.genai import types
-from src.providers.base import LLMProvider
-from src.prompts import prompts
+from src.providers.base import (
+    LLMProvider,
+    RateLimitError,
+    TokenUsage,
+    TokenUsageCallback,
+    get_retry_after,
+)
+from src.providers.backoff import BackoffGate, clamp_retry_after, full_jitter_delay
+from src.providers.circuit_breaker import CircuitBreakers, CircuitOpenError
+from src.providers.client_pool import ClientPool
+from src.providers.concurrency import AdaptiveConcurrency
+from src.providers.rate_limiter import RateLimiter, estimate_prompt_tokens
+from src.prompts import prompts, schema_json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,7 +42,7 @@ class GoogleGenAIProvider(LLMProvider):
         Initialize the GoogleGenAIProvider.
 
         Args:
-            api_keys: An iterator (e.g., itertools.cycle) of API keys for rotation.
+            api_keys: An iterator (e.g., KeyScheduler) of API keys for rotation.
             model: The model ID to use (e.g., "gemini-3-pro-preview", "gemini-3-flash-preview").
             thinking_level: The thinking level for Gemini 3 models ("low", "medium", "high", "minimal").
                            Note: "medium" and "minimal" are only supported by Gemini 3 Flash.
@@ -41,6 +54,7 @@ class GoogleGenAIProvider(LLMProvider):
         self.thinking_level = thinking_level
         self.max_retries = max_retries
         self.json_parse_retries = json_parse_retries
+        self.on_token_usage: Optional[TokenUsageCallback] = None
 
     @property
     def name(self) -> str:
@@ -50,10 +64,31 @@ class GoogleGenAIProvider(LLMProvider):
     def model(self) -> str:
         return self.model_name
 
-    def _get_client(self) -> genai.Client:
-        """Get a new client with the next API key in rotation."""
-        current_api_key = next(self.api_key_iterator)
-        return genai.Client(api_key=current_api_key)
+    def _get_client(self, api_key: Optional[str] = None) -> genai.Client:
+        """Get the pooled client for an API key (next in rotation by default)."""
+        current_api_key = api_key if api_key is not None else next(self.api_key_iterator)
+        return ClientPool.get_default().get_genai_client(current_api_key)
+
+    def _report_token_usage(self, response: Any) -> None:
+        """Report token usage (including implicitly cached prompt tokens) via callback."""
+        metadata = getattr(response, "usage_metadata", None)
+        if not self.on_token_usage or metadata is None:
+            return
+        usage = TokenUsage(
+            input_tokens=metadata.prompt_token_count or 0,
+            output_tokens=metadata.candidates_token_count or 0,
+            cached_input_tokens=metadata.cached_content_token_count or 0,
+        )
+        self.on_token_usage(self.name, self.model_name, usage, True)
+
+    async def prewarm(self) -> None:
+        """Open a keep-alive connection for each API key's pooled client."""
+        pool = ClientPool.get_default()
+        warmups = [
+            pool.prewarm(self._get_client(key), lambda client: client.aio.models.get(model=self.model_name))
+            for key in self._scheduled_keys()
+        ]
+        await asyncio.gather(*warmups)
 
     async def _make_request(
         self,
@@ -70,9 +105,17 @@ class GoogleGenAIProvider(LLMProvider):
         Returns:
             The response text or None if all retries failed.
         """
+        rate_limiter = RateLimiter.get_default()
+        backoff_gate = BackoffGate.get_default()
+        estimated_tokens = estimate_prompt_tokens(contents)
+
         for attempt_number in range(self.max_retries):
+            retry_after: Optional[float] = None
             try:
-                client = self._get_client()
+                await backoff_gate.wait(self.name)
+                api_key = next(self.api_key_iterator)
+                await rate_limiter.acquire(self.name, api_key, estimated_tokens)
+                client = self._get_client(api_key)
 
                 # Build the config
                 config_dict: Dict[str, Any] = {
@@ -93,14 +136,34 @@ class GoogleGenAIProvider(LLMProvider):
 
                 config = types.GenerateContentConfig(**config_dict)
 
-                # Make the API call in a thread to avoid blocking
-                response = await asyncio.to_thread(
-                    client.models.generate_content,
-                    model=self.model_name,
-                    contents=contents,
-                    config=config,
-                )
-
+                async with CircuitBreakers.get_default().guard(
+                    self.name, self.model_name, (RateLimitError,)
+                ), AdaptiveConcurrency.get_default().slot(
+                    self.name, self.model_name, (asyncio.TimeoutError,)
+                ):
+                    with ClientPool.get_default().track_request("google_genai"):
+                        try:
+                            request_start = time.monotonic()
+                            response = await client.aio.models.generate_content(
+                                model=self.model_name,
+                                contents=contents,
+                                config=config,
+                            )
+                            self._report_key_success(api_key, time.monotonic() - request_start)
+                        except genai_errors.ClientError as error:
+                            if error.code == 429:
+                                server_retry_after = get_retry_after(error)
+                                self._report_key_failure(
+                                    api_key, rate_limited=True, retry_after=server_retry_after
+                                )
+                                raise RateLimitError(
+                                    f"[{self.model_name}] Rate limit hit", retry_after=server_retry_after
+                                ) from error
+                            if error.code in (401, 403):
+                                self._report_key_failure(api_key, auth_failed=True)
+                            raise
+
+                self._report_token_usage(response)
                 if response.text:
                     return response.text
 
@@ -109,14 +172,24 @@ class GoogleGenAIProvider(LLMProvider):
                     "Received empty response. Retrying..."
                 )
 
+            except CircuitOpenError:
+                logger.debug(f"[{self.model_name}] Skipped: circuit breaker is open")
+                return None
+            except RateLimitError as error:
+                retry_after = clamp_retry_after(error.retry_after)
+                backoff_gate.pause(self.name, retry_after if retry_after is not None else self.retry_min_wait)
+                logger.warning(f"[{self.model_name}] Attempt {attempt_number + 1}/{self.max_retries}: {error}")
             except Exception as error:
                 logger.error(
                     f"[{self.model_name}] Attempt {attempt_number + 1}/{self.max_retries} "
                     f"Error: {error}"
                 )
 
-            # Small delay between retries
-            await asyncio.sleep(1)
+            # Full-jitter backoff between retries, on top of any Retry-After
+            await asyncio.sleep(
+                full_jitter_delay(attempt_number + 1, self.retry_min_wait, self.retry_max_wait)
+                + (retry_after or 0.0)
+            )
 
         return None
 
@@ -141,9 +214,7 @@ class GoogleGenAIProvider(LLMProvider):
             prompt_template if prompt_template else prompts.initial
         )
 
-        formatted_prompt = active_template.replace("{question}", question).replace(
-            "{schema}", json.dumps(json_schema, indent=2, ensure_ascii=False)
-        )
+        formatted_prompt = self._render_prompt(active_template, question=question, schema=schema_json(json_schema))
 
         response_content = await self._make_request(formatted_prompt, json_schema)
         return response_content if response_content else ""
@@ -173,9 +244,7 @@ class GoogleGenAIProvider(LLMProvider):
             else prompts.combine
         )
 
-        formatted_prompt = active_template.replace("{question}", question).replace(
-            "{inputs}", combined_inputs
-        )
+        formatted_prompt = self._render_prompt(active_template, question=question, inputs=combined_inputs)
 
         return await self._make_request(formatted_prompt, json_schema)
 
@@ -189,7 +258,7 @@ class GoogleGenAIProvider(LLMProvider):
             "You are a JSON formatting assistant. Your task is to extract and format "
             "the content into valid JSON matching the provided schema. "
             "Output ONLY valid JSON, nothing else. No markdown, no explanations.\n\n"
-            f"Schema:\n{json.dumps(json_schema, indent=2, ensure_ascii=False)}\n\n"
+            f"Schema:\n{schema_json(json_schema)}\n\n"
             f"Content to format:\n{raw_content}"
         )
 
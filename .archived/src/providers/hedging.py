@@ -0,0 +1,178 @@
+"""Request hedging to cut tail latency of initial card generation.
+
+A question can only move on to combining once every generator has
+answered, so a few stuck calls dominate the run's tail latency. When a
+call runs past its provider's rolling p95 latency, RequestHedger fires a
+duplicate on the same provider/model with another API key and takes
+whichever answers first, cancelling the loser. Only providers with
+several keys are hedged: another generator is usually already answering
+the same question, and its output would reach the combiner twice and be
+attributed to the slow provider. Hedges are capped to a fraction of
+primary calls so the extra spend stays bounded.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from src.cache import coalescing_disabled
+from src.providers.base import LLMProvider
+from src.providers.key_scheduler import KeyScheduler
+
+logger = logging.getLogger(__name__)
+
+# Latency samples kept per provider/model
+LATENCY_WINDOW = 100
+# Samples required before a provider's percentile is trusted for hedging
+MIN_LATENCY_SAMPLES = 10
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per provider/model."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+
+    def record(self, provider: LLMProvider, latency_seconds: float) -> None:
+        """Record the latency of a successful call."""
+        key = (provider.name, provider.model)
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = deque(maxlen=self.window)
+            self._samples[key] = samples
+        samples.append(latency_seconds)
+
+    def percentile(self, provider: LLMProvider, q: float) -> Optional[float]:
+        """
+        Get a latency percentile for a provider.
+
+        Args:
+            provider: Provider to look up
+            q: Percentile as a fraction (e.g. 0.95)
+
+        Returns:
+            Latency in seconds, or None until MIN_LATENCY_SAMPLES were recorded.
+        """
+        samples = self._samples.get((provider.name, provider.model))
+        if not samples or len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        return ordered[index]
+
+
+class RequestHedger:
+    """
+    Runs provider calls, hedging those that exceed the rolling percentile.
+
+    The hedge goes to the same provider, whose key scheduler hands out a
+    different key; providers with a single API key are never hedged.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        max_extra_fraction: float = 0.1,
+        latency_tracker: Optional[LatencyTracker] = None,
+    ):
+        """
+        Initialize the hedger.
+
+        Args:
+            percentile: Latency percentile after which a call is hedged
+            max_extra_fraction: Cap on hedged calls as a fraction of primary calls
+            latency_tracker: Latency history (default: a new tracker)
+        """
+        self.percentile = percentile
+        self.max_extra_fraction = max_extra_fraction
+        self.latency_tracker = latency_tracker or LatencyTracker()
+        self.primary_calls = 0
+        self.hedged_calls = 0
+        self.hedge_wins = 0
+
+    def _has_hedge_budget(self) -> bool:
+        return self.hedged_calls + 1 <= self.primary_calls * self.max_extra_fraction
+
+    @staticmethod
+    def _can_hedge(provider: LLMProvider) -> bool:
+        """Whether a duplicate call can go to another API key of the provider."""
+        api_keys = getattr(provider, "api_key_iterator", None)
+        return isinstance(api_keys, KeyScheduler) and len(api_keys) > 1
+
+    async def _timed_call(
+        self, provider: LLMProvider, call: Callable[[LLMProvider], Awaitable[str]], hedge: bool
+    ) -> str:
+        if hedge:
+            # Must not join the in-flight primary request for the same cache key
+            coalescing_disabled.set(True)
+        start = time.monotonic()
+        result = await call(provider)
+        if result:
+            self.latency_tracker.record(provider, time.monotonic() - start)
+        return result
+
+    async def run(self, provider: LLMProvider, call: Callable[[LLMProvider], Awaitable[str]]) -> str:
+        """
+        Run call(provider), hedging it if it exceeds the latency percentile.
+
+        Args:
+            provider: Provider for the primary call
+            call: Coroutine function performing the call for a given provider
+
+        Returns:
+            The first non-empty result ("" if every attempt failed).
+        """
+        self.primary_calls += 1
+        primary = asyncio.ensure_future(self._timed_call(provider, call, hedge=False))
+        tasks = [primary]
+        try:
+            threshold = self.latency_tracker.percentile(provider, self.percentile)
+            if threshold is None:
+                return await primary
+
+            done, _ = await asyncio.wait({primary}, timeout=threshold)
+            if done:
+                return primary.result()
+
+            if not self._can_hedge(provider) or not self._has_hedge_budget():
+                return await primary
+
+            self.hedged_calls += 1
+            logger.info(
+                f"[HEDGE] {provider.name}/{provider.model} exceeded p{self.percentile * 100:.0f} "
+                f"({threshold:.1f}s); hedging with another key"
+            )
+            hedge = asyncio.ensure_future(self._timed_call(provider, call, hedge=True))
+            tasks.append(hedge)
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result():
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+            return ""
+        finally:
+            # Cancel the loser (or everything, if we were cancelled ourselves)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get hedging counters.
+
+        Returns:
+            Dict with primary_calls, hedged_calls and hedge_wins.
+        """
+        return {
+            "primary_calls": self.primary_calls,
+            "hedged_calls": self.hedged_calls,
+            "hedge_wins": self.hedge_wins,
+        }
@@ -0,0 +1,300 @@
+"""Health-aware API key scheduling.
+
+KeyScheduler replaces a plain itertools.cycle over a provider's keys. It
+is still an iterator (providers keep calling next()), but it tracks each
+key's successes, rate limits, failures and latency, benches failing keys
+with an exponential cooldown (or the server's Retry-After), prefers keys
+with spare rate-limit quota, and persists key health in the database so
+a key that ran out of quota stays benched on the next run.
+"""
+
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from src.database import DatabaseManager, get_key_health, upsert_key_health
+from src.providers.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Cooldown after the first failure, doubled for each consecutive failure
+BASE_COOLDOWN_SECONDS = 5.0
+MAX_COOLDOWN_SECONDS = 3600.0
+# Keys rejected as invalid/revoked are benched much longer
+AUTH_FAILURE_COOLDOWN_SECONDS = 24 * 3600.0
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.2
+# Keys scoring at least this fraction of the best key share the load
+HEALTHY_SCORE_RATIO = 0.5
+
+
+def _key_id(provider_name: str, api_key: str) -> str:
+    """Stable identifier for a key that never exposes the key itself."""
+    return hashlib.sha256(f"{provider_name}:{api_key}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class KeyState:
+    """Health statistics for a single API key."""
+
+    api_key: str
+    successes: int = 0
+    rate_limits: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    avg_latency_seconds: Optional[float] = None
+    cooldown_until: float = 0.0  # time.time() timestamp
+    last_used: float = 0.0  # time.monotonic() timestamp
+
+    @property
+    def success_ratio(self) -> float:
+        """Smoothed success ratio (0.5 for a key with no history)."""
+        return (self.successes + 1) / (self.successes + self.rate_limits + self.failures + 2)
+
+    def is_available(self, now: float) -> bool:
+        return self.cooldown_until <= now
+
+
+class KeyScheduler:
+    """
+    Iterator over API keys that picks the healthiest key on each next().
+
+    Among keys that are not cooling down, every key scoring within
+    HEALTHY_SCORE_RATIO of the best one is eligible, and the least recently
+    used eligible key is returned, so load is spread across good keys.
+    Score combines success ratio, spare rate-limit quota and relative latency.
+    """
+
+    def __init__(self, keys: List[str], provider_name: Optional[str] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            keys: API keys to schedule (must be non-empty)
+            provider_name: Provider name used for quota lookup and persistence.
+                           Can be set later via bind().
+        """
+        if not keys:
+            raise ValueError("KeyScheduler requires at least one key")
+        self._states: Dict[str, KeyState] = {key: KeyState(api_key=key) for key in keys}
+        # End of the all-keys-benched period already warned about
+        self._all_benched_warned_until = 0.0
+        self.provider_name: Optional[str] = None
+        if provider_name:
+            self.bind(provider_name)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    @property
+    def keys(self) -> List[str]:
+        """All scheduled keys (without affecting rotation)."""
+        return list(self._states)
+
+    def has_available_key(self) -> bool:
+        """Whether any key is not cooling down."""
+        now = time.time()
+        return any(state.is_available(now) for state in self._states.values())
+
+    def __iter__(self) -> "KeyScheduler":
+        return self
+
+    def __next__(self) -> str:
+        now = time.time()
+        states = list(self._states.values())
+        available = [state for state in states if state.is_available(now)]
+
+        if not available:
+            # Everything is benched: use the key that recovers first
+            chosen = min(states, key=lambda state: state.cooldown_until)
+            message = (
+                f"[KEYS] All {len(states)} keys for {self.provider_name} are cooling down; "
+                f"using the one available soonest (in {chosen.cooldown_until - now:.0f}s)"
+            )
+            # Warn once per cooldown rather than on every request during it
+            if now >= self._all_benched_warned_until:
+                self._all_benched_warned_until = chosen.cooldown_until
+                logger.warning(message)
+            else:
+                logger.debug(message)
+        else:
+            scores = self._score(available)
+            best = max(scores.values())
+            eligible = [state for state in available if scores[state.api_key] >= best * HEALTHY_SCORE_RATIO]
+            chosen = min(eligible, key=lambda state: state.last_used)
+
+        chosen.last_used = time.monotonic()
+        return chosen.api_key
+
+    def _score(self, states: List[KeyState]) -> Dict[str, float]:
+        """Score keys by success ratio, spare quota and relative latency."""
+        rate_limiter = RateLimiter.get_default()
+        latencies = [s.avg_latency_seconds for s in states if s.avg_latency_seconds]
+        fastest = min(latencies) if latencies else None
+
+        scores: Dict[str, float] = {}
+        for state in states:
+            score = state.success_ratio
+            if self.provider_name:
+                score *= rate_limiter.headroom(self.provider_name, state.api_key)
+            if fastest and state.avg_latency_seconds:
+                score *= fastest / state.avg_latency_seconds
+            scores[state.api_key] = score
+        return scores
+
+    def report_success(self, api_key: str, latency_seconds: Optional[float] = None) -> None:
+        """
+        Record a successful request.
+
+        Args:
+            api_key: Key the request used
+            latency_seconds: Request latency, if measured
+        """
+        state = self._states.get(api_key)
+        if state is None:
+            return
+        state.successes += 1
+        state.consecutive_failures = 0
+        state.cooldown_until = 0.0
+        if latency_seconds is not None:
+            if state.avg_latency_seconds is None:
+                state.avg_latency_seconds = latency_seconds
+            else:
+                state.avg_latency_seconds += LATENCY_EWMA_ALPHA * (latency_seconds - state.avg_latency_seconds)
+
+    def report_failure(
+        self,
+        api_key: str,
+        rate_limited: bool = False,
+        retry_after: Optional[float] = None,
+        auth_failed: bool = False,
+    ) -> None:
+        """
+        Record a failed request and bench the key.
+
+        Args:
+            api_key: Key the request used
+            rate_limited: The failure was a 429 / quota error
+            retry_after: Server-provided Retry-After in seconds, if any
+            auth_failed: The key was rejected as invalid or revoked
+        """
+        state = self._states.get(api_key)
+        if state is None:
+            return
+        if rate_limited:
+            state.rate_limits += 1
+        else:
+            state.failures += 1
+        state.consecutive_failures += 1
+
+        if auth_failed:
+            cooldown = AUTH_FAILURE_COOLDOWN_SECONDS
+        else:
+            cooldown = min(
+                MAX_COOLDOWN_SECONDS,
+                BASE_COOLDOWN_SECONDS * 2 ** (state.consecutive_failures - 1),
+            )
+            if retry_after is not None:
+                cooldown = max(cooldown, retry_after)
+        state.cooldown_until = max(state.cooldown_until, time.time() + cooldown)
+
+        logger.debug(
+            f"[KEYS] Benched a {self.provider_name} key for {cooldown:.0f}s "
+            f"({state.consecutive_failures} consecutive failures)"
+        )
+        # Persist long benches immediately so a crash doesn't forget them
+        if auth_failed or cooldown >= MAX_COOLDOWN_SECONDS:
+            self.save()
+
+    def bind(self, provider_name: str) -> None:
+        """
+        Attach the scheduler to a provider name and load persisted key health.
+
+        Args:
+            provider_name: Provider name (e.g., "llm2deck_cerebras")
+        """
+        self.provider_name = provider_name
+        if self not in _schedulers:
+            _schedulers.append(self)
+
+        db_manager = DatabaseManager.get_default()
+        if not db_manager.is_initialized:
+            return
+        try:
+            states_by_id = {_key_id(provider_name, key): state for key, state in self._states.items()}
+            with db_manager.session_scope() as session:
+                for entry in get_key_health(session, provider_name):
+                    state = states_by_id.get(entry.key_id)
+                    if state is None:
+                        continue
+                    state.successes = entry.successes or 0
+                    state.rate_limits = entry.rate_limits or 0
+                    state.failures = entry.failures or 0
+                    state.consecutive_failures = entry.consecutive_failures or 0
+                    state.avg_latency_seconds = entry.avg_latency_seconds
+                    if entry.cooldown_until is not None:
+                        cooldown_until = entry.cooldown_until
+                        if cooldown_until.tzinfo is None:
+                            cooldown_until = cooldown_until.replace(tzinfo=timezone.utc)
+                        state.cooldown_until = cooldown_until.timestamp()
+        except Exception as e:
+            logger.debug(f"[KEYS] Failed to load key health for {provider_name}: {e}")
+
+    def save(self) -> None:
+        """Persist key health to the database (no-op if it isn't initialized)."""
+        db_manager = DatabaseManager.get_default()
+        if not self.provider_name or not db_manager.is_initialized:
+            return
+        try:
+            with db_manager.session_scope() as session:
+                for key, state in self._states.items():
+                    upsert_key_health(
+                        session,
+                        key_id=_key_id(self.provider_name, key),
+                        provider_name=self.provider_name,
+                        successes=state.successes,
+                        rate_limits=state.rate_limits,
+                        failures=state.failures,
+                        consecutive_failures=state.consecutive_failures,
+                        avg_latency_seconds=state.avg_latency_seconds,
+                        cooldown_until=(
+                            datetime.fromtimestamp(state.cooldown_until, tz=timezone.utc)
+                            if state.cooldown_until > time.time()
+                            else None
+                        ),
+                    )
+        except Exception as e:
+            logger.debug(f"[KEYS] Failed to save key health for {self.provider_name}: {e}")
+
+    def get_stats(self) -> List[Dict[str, object]]:
+        """
+        Get per-key health (keys are identified by a short hash).
+
+        Returns:
+            List of dicts with key id, counters, latency and remaining cooldown.
+        """
+        now = time.time()
+        return [
+            {
+                "key": _key_id(self.provider_name or "", state.api_key)[:8],
+                "successes": state.successes,
+                "rate_limits": state.rate_limits,
+                "failures": state.failures,
+                "avg_latency_seconds": state.avg_latency_seconds,
+                "cooldown_seconds": max(0.0, state.cooldown_until - now),
+            }
+            for state in self._states.values()
+        ]
+
+
+# Schedulers bound in this process, saved together at shutdown
+_schedulers: List[KeyScheduler] = []
+
+
+def save_key_health() -> None:
+    """Persist health for every bound key scheduler."""
+    for scheduler in _schedulers:
+        scheduler.save()
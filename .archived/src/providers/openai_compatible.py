@@ -1,14 +1,27 @@
 """Base class for LLM providers using OpenAI-compatible APIs."""
 
+import asyncio
 import json
+import time
 from abc import abstractmethod
 from typing import Any, Dict, List, Optional, Iterator, Callable
 
 from openai import AsyncOpenAI
 from openai import RateLimitError as OpenAIRateLimitError
 from openai import APITimeoutError as OpenAITimeoutError
+from openai import APIConnectionError as OpenAIConnectionError
+from openai import InternalServerError as OpenAIInternalServerError
+from openai import AuthenticationError as OpenAIAuthenticationError
+from openai import PermissionDeniedError as OpenAIPermissionDeniedError
+from openai import BadRequestError as OpenAIBadRequestError
 from tenacity import RetryError, retry, stop_after_attempt, wait_fixed, retry_if_exception_type
 
+from src.providers.circuit_breaker import CircuitOpenError
+from src.providers.client_pool import ClientPool
+from src.providers.concurrency import AdaptiveConcurrency
+from src.providers.parse_metrics import JsonParseMetrics
+from src.providers.rate_limiter import RateLimiter, estimate_prompt_tokens
+from src.providers.streaming import JsonPrefixValidator, StreamMetrics
 from src.providers.base import (
     LLMProvider,
     TokenUsage,
@@ -18,16 +31,29 @@ from src.providers.base import (
     RateLimitError,
     TimeoutError,
     EmptyResponseError,
+    MalformedResponseError,
+    get_retry_after,
 )
-from src.prompts import prompts
+from src.config.models import supports_structured_output
+from src.prompts import prompts, schema_json
 from src.utils import strip_json_block
-from src.cache import generate_cache_key, get_cached_response, put_cached_response
+from src.cache import RequestCoalescer, generate_cache_key, get_cached_response, put_cached_response
 from src.database import DatabaseManager
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _cached_prompt_tokens(usage: Any) -> int:
+    """Get the prompt tokens a response reports as served from the provider's cache."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details else None
+    if cached is None:
+        # DeepSeek-style usage reports cache hits at the top level
+        cached = getattr(usage, "prompt_cache_hit_tokens", None)
+    return cached or 0
+
+
 class OpenAICompatibleProvider(LLMProvider):
     """
     Base class for providers using OpenAI-compatible APIs.
@@ -54,6 +80,8 @@ class OpenAICompatibleProvider(LLMProvider):
         use_cache: bool = True,
         bypass_cache_lookup: bool = False,
         on_token_usage: Optional[TokenUsageCallback] = None,
+        stream: bool = False,
+        structured_output: Optional[bool] = None,
     ):
         """
         Initialize an OpenAI-compatible provider.
@@ -73,6 +101,9 @@ class OpenAICompatibleProvider(LLMProvider):
             use_cache: Whether to use response caching (default: True)
             bypass_cache_lookup: If True, skip cache lookup but still store results (default: False)
             on_token_usage: Callback for token usage updates (provider, model, usage, success)
+            stream: Stream completions, validating JSON as it arrives (default: False)
+            structured_output: Send the JSON schema as a native response_format
+                (None = auto-detect from the provider)
         """
         self.model_name = model
         self.base_url = base_url
@@ -88,6 +119,10 @@ class OpenAICompatibleProvider(LLMProvider):
         self.use_cache = use_cache
         self.bypass_cache_lookup = bypass_cache_lookup
         self.on_token_usage = on_token_usage
+        self.stream = stream
+        self.structured_output = structured_output
+        # Request a final usage chunk when streaming (cleared if the server rejects stream_options)
+        self.stream_usage = True
 
     @property
     def model(self) -> str:
@@ -105,14 +140,49 @@ class OpenAICompatibleProvider(LLMProvider):
             return ""
         return next(self.api_key_iterator)
 
-    def _get_client(self) -> AsyncOpenAI:
-        """Create an AsyncOpenAI client instance."""
-        return AsyncOpenAI(
-            api_key=self._get_api_key(),
+    def _get_client(self, api_key: Optional[str] = None) -> AsyncOpenAI:
+        """Get a pooled AsyncOpenAI client for an API key.
+
+        Uses the next key in rotation unless one is given; clients (and their
+        keep-alive connections) are shared per (base_url, api_key) via ClientPool.
+        """
+        return ClientPool.get_default().get_openai_client(
             base_url=self.base_url,
+            api_key=api_key if api_key is not None else self._get_api_key(),
             timeout=self.timeout,
         )
 
+    async def prewarm(self) -> None:
+        """Open a keep-alive connection for each API key's pooled client."""
+        pool = ClientPool.get_default()
+        warmups = [
+            pool.prewarm(self._get_client(key), lambda client: client.models.list())
+            for key in self._scheduled_keys() or [self._get_api_key()]
+        ]
+        await asyncio.gather(*warmups)
+
+    def _uses_structured_output(self) -> bool:
+        """Whether to send JSON schemas as a native response_format."""
+        if self.structured_output is None:
+            return supports_structured_output(self.name)
+        return self.structured_output
+
+    def _get_response_format(self, json_schema: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the response_format parameter for a JSON schema.
+
+        Not strict: pydantic schemas leave fields with defaults optional and
+        allow additional properties, which strict-mode servers reject.
+        """
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "card_schema",
+                "strict": False,
+                "schema": json_schema,
+            },
+        }
+
     def _get_extra_request_params(self) -> Dict[str, Any]:
         """
         Get provider-specific request parameters.
@@ -133,6 +203,7 @@ class OpenAICompatibleProvider(LLMProvider):
         self,
         chat_messages: List[Dict[str, Any]],
         json_schema: Optional[Dict[str, Any]] = None,
+        validate_json: bool = False,
     ) -> Optional[str]:
         """
         Make a request to the API with retry logic and optional caching.
@@ -140,6 +211,8 @@ class OpenAICompatibleProvider(LLMProvider):
         Args:
             chat_messages: List of chat messages
             json_schema: Optional JSON schema (used for response formatting)
+            validate_json: In streaming mode, abort early if the response
+                           stops looking like JSON matching json_schema
 
         Returns:
             Response content string, or None if all retries failed
@@ -171,20 +244,59 @@ class OpenAICompatibleProvider(LLMProvider):
                 # Log but don't fail if cache lookup fails
                 logger.debug(f"[CACHE] Lookup failed, proceeding without cache: {e}")
 
+        if cache_key is None:
+            return await self._request_and_store(chat_messages, json_schema, None, validate_json)
+
+        # Concurrent identical requests share one upstream call and cache write
+        return await RequestCoalescer.get_default().run(
+            cache_key,
+            lambda: self._request_and_store(chat_messages, json_schema, cache_key, validate_json),
+        )
+
+    async def _request_and_store(
+        self,
+        chat_messages: List[Dict[str, Any]],
+        json_schema: Optional[Dict[str, Any]],
+        cache_key: Optional[str],
+        validate_json: bool = False,
+    ) -> Optional[str]:
+        """
+        Call the API with retries, report token usage and store the response in the cache.
+
+        Args:
+            chat_messages: List of chat messages
+            json_schema: Optional JSON schema (used for response formatting)
+            cache_key: Cache key to store the response under, or None to skip storage
+            validate_json: In streaming mode, validate the JSON prefix as it arrives
+
+        Returns:
+            Response content string, or None if all retries failed
+        """
         retry_decorator = create_retry_decorator(
             max_retries=self.max_retries,
+            min_wait=self.retry_min_wait,
+            max_wait=self.retry_max_wait,
             retry_logger=logger,
+            provider_name=self.name,
+            model=self.model_name,
         )
+        rate_limiter = RateLimiter.get_default()
+        estimated_tokens = estimate_prompt_tokens(chat_messages)
 
         @retry_decorator
         async def _do_request() -> tuple[str, TokenUsage]:
+            api_key = self._get_api_key()
+            structured = bool(json_schema) and self._uses_structured_output()
+            stream_usage = self.stream and self.stream_usage
             try:
-                client = self._get_client()
+                await rate_limiter.acquire(self.name, api_key, estimated_tokens)
+                client = self._get_client(api_key)
 
                 request_params = {
                     "model": self.model_name,
                     "messages": chat_messages,
                     "temperature": self.temperature,
+                    "timeout": self.timeout,
                 }
 
                 if self.max_tokens is not None:
@@ -193,22 +305,29 @@ class OpenAICompatibleProvider(LLMProvider):
                 # Add provider-specific parameters
                 request_params.update(self._get_extra_request_params())
 
-                completion = await client.chat.completions.create(**request_params)
-                
-                if not completion or not hasattr(completion, "choices") or not completion.choices:
-                    raise EmptyResponseError(
-                        f"[{self.model_name}] Received invalid or empty response: {completion}"
-                    )
-                    
-                response_content = completion.choices[0].message.content
-
-                # Extract token usage if available
-                usage = TokenUsage()
-                if completion.usage:
-                    usage = TokenUsage(
-                        input_tokens=completion.usage.prompt_tokens or 0,
-                        output_tokens=completion.usage.completion_tokens or 0,
-                    )
+                if structured:
+                    request_params["response_format"] = self._get_response_format(json_schema)  # type: ignore[arg-type]
+
+                async with AdaptiveConcurrency.get_default().slot(
+                    self.name, self.model_name, (OpenAIRateLimitError, OpenAITimeoutError)
+                ):
+                    request_start = time.monotonic()
+                    if self.stream:
+                        response_content, usage = await self._stream_completion(
+                            client,
+                            request_params,
+                            json_schema if validate_json else None,
+                            validate_json,
+                            estimated_tokens,
+                            include_usage=stream_usage,
+                        )
+                    else:
+                        completion = await client.chat.completions.create(**request_params)
+                        response_content, usage = self._parse_completion(completion)
+                    self._report_key_success(api_key, time.monotonic() - request_start)
+
+                if usage.total_tokens:
+                    rate_limiter.reconcile(self.name, api_key, estimated_tokens, usage.total_tokens)
 
                 if not response_content:
                     raise EmptyResponseError(
@@ -218,12 +337,43 @@ class OpenAICompatibleProvider(LLMProvider):
                 if self.strip_json_markers and json_schema:
                     response_content = strip_json_block(response_content)
 
+                if json_schema:
+                    JsonParseMetrics.get_default().record(self.name, self.model_name, response_content)
+
                 return response_content, usage
 
             except OpenAIRateLimitError as e:
-                raise RateLimitError(f"[{self.model_name}] Rate limit hit") from e
+                retry_after = get_retry_after(e)
+                self._report_key_failure(api_key, rate_limited=True, retry_after=retry_after)
+                raise RateLimitError(f"[{self.model_name}] Rate limit hit", retry_after=retry_after) from e
+            except (OpenAIAuthenticationError, OpenAIPermissionDeniedError) as e:
+                # Bench the key and retry with another one, if a healthy one is left
+                self._report_key_failure(api_key, auth_failed=True)
+                if not self._has_available_key():
+                    raise
+                raise RetryableError(f"[{self.model_name}] API key rejected ({e.status_code})") from e
             except OpenAITimeoutError as e:
                 raise TimeoutError(f"[{self.model_name}] Request timed out") from e
+            except (OpenAIConnectionError, OpenAIInternalServerError) as e:
+                raise RetryableError(f"[{self.model_name}] Request failed: {e}") from e
+            except OpenAIBadRequestError as e:
+                if structured and ("response_format" in str(e) or "json_schema" in str(e)):
+                    # Server doesn't support native structured output: fall back to prompt-only
+                    logger.warning(
+                        f"[{self.model_name}] {self.name} rejected response_format; "
+                        "disabling structured output for this provider"
+                    )
+                    self.structured_output = False
+                    raise RetryableError(f"[{self.model_name}] Structured output not supported") from e
+                if stream_usage and "stream_options" in str(e):
+                    # Server doesn't report usage on streams: fall back to estimated token counts
+                    logger.warning(
+                        f"[{self.model_name}] {self.name} rejected stream_options; "
+                        "estimating token usage of streamed responses"
+                    )
+                    self.stream_usage = False
+                    raise RetryableError(f"[{self.model_name}] Stream usage not supported") from e
+                raise
 
         try:
             response, token_usage = await _do_request()
@@ -260,6 +410,11 @@ class OpenAICompatibleProvider(LLMProvider):
                     logger.debug(f"[CACHE] Storage failed: {e}")
 
             return response
+        except CircuitOpenError:
+            logger.debug(f"[{self.model_name}] Skipped: circuit breaker is open")
+            if self.on_token_usage:
+                self.on_token_usage(self.name, self.model_name, TokenUsage(), False)
+            return None
         except RetryError:
             logger.error(f"[{self.model_name}] All retry attempts failed")
             # Report failure via callback
@@ -273,6 +428,118 @@ class OpenAICompatibleProvider(LLMProvider):
                 self.on_token_usage(self.name, self.model_name, TokenUsage(), False)
             return None
 
+    def _parse_completion(self, completion: Any) -> tuple[Optional[str], TokenUsage]:
+        """Extract content and token usage from a non-streamed completion."""
+        if not completion or not hasattr(completion, "choices") or not completion.choices:
+            raise EmptyResponseError(
+                f"[{self.model_name}] Received invalid or empty response: {completion}"
+            )
+
+        usage = TokenUsage()
+        if completion.usage:
+            usage = TokenUsage(
+                input_tokens=completion.usage.prompt_tokens or 0,
+                output_tokens=completion.usage.completion_tokens or 0,
+                cached_input_tokens=_cached_prompt_tokens(completion.usage),
+            )
+        return completion.choices[0].message.content, usage
+
+    async def _stream_completion(
+        self,
+        client: AsyncOpenAI,
+        request_params: Dict[str, Any],
+        json_schema: Optional[Dict[str, Any]],
+        validate_json: bool,
+        estimated_input_tokens: int,
+        include_usage: bool = True,
+    ) -> tuple[str, TokenUsage]:
+        """
+        Stream a completion, optionally validating the JSON prefix as it arrives.
+
+        The stream is closed as soon as the response is known to be invalid
+        (raising MalformedResponseError) or, when validating, as soon as text
+        follows the complete top-level JSON value; whitespace and a closing
+        fence are read through so the server's final usage chunk still
+        arrives. Time-to-first-token and tokens/sec are recorded in
+        StreamMetrics.
+
+        Args:
+            client: Client to stream from
+            request_params: Parameters for chat.completions.create()
+            json_schema: Schema whose root type / top-level keys are enforced
+            validate_json: Whether to validate the JSON prefix
+            estimated_input_tokens: Input token estimate used if the server
+                                    reports no usage
+            include_usage: Ask the server for a final usage chunk
+                           (stream_options.include_usage)
+
+        Returns:
+            Tuple of (content, token usage).
+        """
+        validator = (
+            JsonPrefixValidator(json_schema, allow_fence=self.strip_json_markers)
+            if validate_json
+            else None
+        )
+        parts: List[str] = []
+        usage = TokenUsage()
+        start = time.monotonic()
+        first_token_at: Optional[float] = None
+        aborted = False
+
+        if include_usage:
+            request_params = {**request_params, "stream_options": {"include_usage": True}}
+        stream = await client.chat.completions.create(**request_params, stream=True)
+        try:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = TokenUsage(
+                        input_tokens=chunk.usage.prompt_tokens or 0,
+                        output_tokens=chunk.usage.completion_tokens or 0,
+                        cached_input_tokens=_cached_prompt_tokens(chunk.usage),
+                    )
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if validator is not None and validator.complete:
+                    if delta.strip().strip("`"):
+                        # Trailing text after the JSON value: stop reading
+                        break
+                    parts.append(delta)
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
+                parts.append(delta)
+
+                if validator is not None:
+                    if not validator.feed(delta):
+                        aborted = True
+                        raise MalformedResponseError(
+                            f"[{self.model_name}] Aborted stream: {validator.error}"
+                        )
+        finally:
+            await stream.close()
+            content = "".join(parts)
+            if not usage.total_tokens:
+                # Stream ended early or the server doesn't report usage
+                usage = TokenUsage(
+                    input_tokens=estimated_input_tokens,
+                    output_tokens=estimate_prompt_tokens(content) if content else 0,
+                )
+            end = time.monotonic()
+            StreamMetrics.get_default().record(
+                self.name,
+                self.model_name,
+                ttft_seconds=first_token_at - start if first_token_at is not None else None,
+                output_tokens=usage.output_tokens,
+                generation_seconds=end - first_token_at if first_token_at is not None else 0.0,
+                aborted=aborted,
+            )
+
+        return content, usage
+
     async def generate_initial_cards(
         self,
         question: str,
@@ -282,12 +549,8 @@ class OpenAICompatibleProvider(LLMProvider):
         """Generate initial cards for a given question."""
         active_template = prompt_template or prompts.initial
 
-        # If it's a custom pre-formatted prompt (from ingest), it might already contain content
-        # We should only format if placeholders exist and we haven't already replaced them
-        content = active_template
-        if "{question}" in content or "{schema}" in content:
-            content = content.replace("{question}", question)
-            content = content.replace("{schema}", json.dumps(json_schema, indent=2, ensure_ascii=False))
+        # Custom pre-formatted prompts (from ingest) have no placeholders left and render unchanged
+        content = self._render_prompt(active_template, question=question, schema=schema_json(json_schema))
 
         chat_messages = [
             {
@@ -300,7 +563,7 @@ class OpenAICompatibleProvider(LLMProvider):
             },
         ]
 
-        response_content = await self._make_request(chat_messages, json_schema)
+        response_content = await self._make_request(chat_messages, json_schema, validate_json=True)
         return response_content if response_content else ""
 
     async def combine_cards(
@@ -316,10 +579,7 @@ class OpenAICompatibleProvider(LLMProvider):
         """
         active_template = combine_prompt_template or prompts.combine
 
-        content = active_template
-        if "{question}" in content or "{inputs}" in content:
-            content = content.replace("{question}", question)
-            content = content.replace("{inputs}", combined_inputs)
+        content = self._render_prompt(active_template, question=question, inputs=combined_inputs)
 
         chat_messages = [
             {
@@ -353,7 +613,7 @@ class OpenAICompatibleProvider(LLMProvider):
                 "role": "user",
                 "content": (
                     f"Format the following content into valid JSON matching this schema:\n\n"
-                    f"Schema:\n{json.dumps(json_schema, indent=2, ensure_ascii=False)}\n\n"
+                    f"Schema:\n{schema_json(json_schema)}\n\n"
                     f"Content to format:\n{raw_content}"
                 ),
             },
@@ -375,7 +635,7 @@ class OpenAICompatibleProvider(LLMProvider):
             reraise=True,
         )
         async def _parse_with_retry() -> Dict[str, Any]:
-            response_content = await self._make_request(chat_messages, json_schema)
+            response_content = await self._make_request(chat_messages, json_schema, validate_json=True)
             if not response_content:
                 raise RetryableError("Empty response from format request")
             return json.loads(response_content)
@@ -0,0 +1,80 @@
+"""JSON parse success tracking per provider/model.
+
+Every response to a request that carried a JSON schema is checked with
+json.loads, so the run summary can show how often each provider returns
+output that needs repair or a formatter round-trip.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ParseStats:
+    """JSON parse counters for a provider/model."""
+
+    responses: int = 0
+    parse_failures: int = 0
+
+    @property
+    def failure_rate(self) -> float:
+        return self.parse_failures / self.responses if self.responses else 0.0
+
+
+class JsonParseMetrics:
+    """
+    Collects JSON parse failure rates per provider/model.
+
+    Supports both singleton access (via get_default()) and dependency injection.
+    """
+
+    _instance: Optional["JsonParseMetrics"] = None
+
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str], ParseStats] = {}
+
+    def record(self, provider_name: str, model: str, content: str) -> bool:
+        """
+        Record whether a schema-constrained response parses as JSON.
+
+        Args:
+            provider_name: Provider name
+            model: Model name
+            content: Response content (after stripping code fences)
+
+        Returns:
+            True if the content parsed.
+        """
+        stats = self._stats.setdefault((provider_name, model), ParseStats())
+        stats.responses += 1
+        try:
+            json.loads(content)
+        except (json.JSONDecodeError, TypeError):
+            stats.parse_failures += 1
+            return False
+        return True
+
+    def get_stats(self) -> Dict[str, ParseStats]:
+        """
+        Get parse statistics.
+
+        Returns:
+            Dict mapping "provider/model" to its ParseStats.
+        """
+        return {f"{name}/{model}": stats for (name, model), stats in self._stats.items()}
+
+    @classmethod
+    def get_default(cls) -> "JsonParseMetrics":
+        """Get or create the default singleton instance."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_default(cls) -> None:
+        """Reset the default singleton (useful for testing cleanup)."""
+        cls._instance = None
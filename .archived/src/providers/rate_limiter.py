@@ -0,0 +1,276 @@
+"""Client-side rate limiting for LLM providers.
+
+Each (provider, api_key) pair gets a requests-per-minute and a
+tokens-per-minute token bucket. Providers call RateLimiter.acquire()
+before dispatching a request, which waits until both buckets have
+capacity, so requests are paced to the configured limits instead of
+bursting into 429s. Time spent waiting is recorded per provider.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used to estimate prompt size before dispatch
+CHARS_PER_TOKEN = 4
+
+
+def estimate_prompt_tokens(prompt: Union[str, List[Dict[str, Any]]]) -> int:
+    """
+    Estimate the number of prompt tokens for a request.
+
+    Args:
+        prompt: Either a raw prompt string or a list of chat messages
+
+    Returns:
+        Approximate token count (at least 1).
+    """
+    if isinstance(prompt, str):
+        chars = len(prompt)
+    else:
+        chars = sum(len(str(message.get("content") or "")) for message in prompt)
+    return max(1, chars // CHARS_PER_TOKEN)
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at a fixed rate.
+
+    Waiters are served in arrival order, so a large request cannot be
+    starved by a stream of small ones.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        """
+        Initialize the bucket full.
+
+        Args:
+            capacity: Maximum tokens the bucket can hold (burst size)
+            refill_per_second: Tokens added per second
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.refill_per_second
+        )
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, waiting until enough are available.
+
+        Requests larger than the capacity are clamped to the capacity so
+        they wait for a full bucket instead of blocking forever.
+
+        Args:
+            amount: Number of tokens to take
+
+        Returns:
+            Seconds spent waiting.
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            if self._tokens < amount:
+                delay = (amount - self._tokens) / self.refill_per_second
+                await asyncio.sleep(delay)
+                waited = delay
+                self._refill()
+            self._tokens -= amount
+        return waited
+
+    @property
+    def headroom(self) -> float:
+        """Fraction of capacity currently available (0.0 - 1.0)."""
+        self._refill()
+        return max(0.0, self._tokens) / self.capacity
+
+    def adjust(self, delta: float) -> None:
+        """
+        Return (positive) or charge (negative) tokens after the fact.
+
+        Used to reconcile an estimate with actual usage. The balance may go
+        negative, which delays subsequent requests accordingly.
+        """
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + delta)
+
+
+@dataclass
+class RateLimit:
+    """Configured limits for a provider (None means unlimited)."""
+
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+
+    @property
+    def is_unlimited(self) -> bool:
+        return not self.requests_per_minute and not self.tokens_per_minute
+
+
+class RateLimiter:
+    """
+    Registry of per-(provider, api_key) rate limit buckets.
+
+    Supports both singleton access (via get_default()) and dependency
+    injection. Providers without configured limits pass straight through.
+    """
+
+    _instance: Optional["RateLimiter"] = None
+
+    def __init__(self):
+        self._limits: Dict[str, RateLimit] = {}
+        self._buckets: Dict[Tuple[str, str], Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._wait_seconds: Dict[str, float] = defaultdict(float)
+        self._waits: Dict[str, int] = defaultdict(int)
+
+    def configure(
+        self,
+        provider_name: str,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ) -> None:
+        """
+        Set limits for a provider. Applies to each of its API keys separately.
+
+        Args:
+            provider_name: Provider name (e.g., "llm2deck_cerebras")
+            requests_per_minute: Max requests per minute per key (None = unlimited)
+            tokens_per_minute: Max estimated tokens per minute per key (None = unlimited)
+        """
+        limit = RateLimit(requests_per_minute, tokens_per_minute)
+        if limit.is_unlimited:
+            self._limits.pop(provider_name, None)
+        else:
+            self._limits[provider_name] = limit
+        # Drop existing buckets so new limits take effect
+        for bucket_key in [k for k in self._buckets if k[0] == provider_name]:
+            del self._buckets[bucket_key]
+
+    def _get_buckets(
+        self, provider_name: str, api_key: str
+    ) -> Tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        bucket_key = (provider_name, api_key)
+        buckets = self._buckets.get(bucket_key)
+        if buckets is None:
+            limit = self._limits[provider_name]
+            request_bucket = (
+                TokenBucket(limit.requests_per_minute, limit.requests_per_minute / 60.0)
+                if limit.requests_per_minute
+                else None
+            )
+            token_bucket = (
+                TokenBucket(limit.tokens_per_minute, limit.tokens_per_minute / 60.0)
+                if limit.tokens_per_minute
+                else None
+            )
+            buckets = (request_bucket, token_bucket)
+            self._buckets[bucket_key] = buckets
+        return buckets
+
+    async def acquire(self, provider_name: str, api_key: str = "", estimated_tokens: int = 0) -> float:
+        """
+        Wait until a request may be dispatched for this provider and key.
+
+        Args:
+            provider_name: Provider name
+            api_key: API key the request will use ("" for keyless providers)
+            estimated_tokens: Estimated prompt tokens for the request
+
+        Returns:
+            Seconds spent waiting.
+        """
+        if provider_name not in self._limits:
+            return 0.0
+
+        request_bucket, token_bucket = self._get_buckets(provider_name, api_key)
+        waited = 0.0
+        if request_bucket is not None:
+            waited += await request_bucket.acquire(1)
+        if token_bucket is not None and estimated_tokens > 0:
+            waited += await token_bucket.acquire(estimated_tokens)
+
+        if waited > 0:
+            self._wait_seconds[provider_name] += waited
+            self._waits[provider_name] += 1
+            logger.debug(f"[RATE LIMIT] {provider_name} waited {waited:.2f}s before dispatch")
+        return waited
+
+    def reconcile(self, provider_name: str, api_key: str, estimated_tokens: int, actual_tokens: int) -> None:
+        """
+        Correct the tokens-per-minute bucket once actual usage is known.
+
+        Args:
+            provider_name: Provider name
+            api_key: API key the request used
+            estimated_tokens: Tokens charged at acquire() time
+            actual_tokens: Tokens actually consumed (input + output)
+        """
+        if provider_name not in self._limits or actual_tokens <= 0:
+            return
+        _, token_bucket = self._get_buckets(provider_name, api_key)
+        if token_bucket is not None:
+            token_bucket.adjust(estimated_tokens - actual_tokens)
+
+    def headroom(self, provider_name: str, api_key: str = "") -> float:
+        """
+        Get the spare quota for a provider and key.
+
+        Args:
+            provider_name: Provider name
+            api_key: API key
+
+        Returns:
+            Fraction (0.0 - 1.0) of the tighter bucket still available;
+            1.0 for providers without configured limits.
+        """
+        if provider_name not in self._limits:
+            return 1.0
+        buckets = [b for b in self._get_buckets(provider_name, api_key) if b is not None]
+        return min((bucket.headroom for bucket in buckets), default=1.0)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get wait-time metrics per provider.
+
+        Returns:
+            Dict mapping provider name to {"waits": count, "wait_seconds": total}.
+        """
+        return {
+            name: {"waits": self._waits[name], "wait_seconds": self._wait_seconds[name]}
+            for name in self._wait_seconds
+        }
+
+    @classmethod
+    def get_default(cls) -> "RateLimiter":
+        """Get or create the default singleton instance."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def set_default(cls, limiter: "RateLimiter") -> None:
+        """
+        Set the default singleton instance.
+
+        Args:
+            limiter: The RateLimiter instance to use as default.
+        """
+        cls._instance = limiter
+
+    @classmethod
+    def reset_default(cls) -> None:
+        """Reset the default singleton (useful for testing cleanup)."""
+        cls._instance = None
@@ -1,6 +1,5 @@
 """Provider registry for dynamic provider initialization."""
 
-import itertools
 import logging
 from dataclasses import dataclass, field
 from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Type, cast
@@ -17,8 +16,11 @@ from src.providers.gemini import GeminiProvider
 from src.providers.gemini_factory import create_gemini_providers
 from src.providers.google_antigravity import GoogleAntigravityProvider
 from src.providers.google_genai import GoogleGenAIProvider
+from src.providers.key_scheduler import KeyScheduler
 from src.providers.nvidia import NvidiaProvider
+from src.providers.openai_compatible import OpenAICompatibleProvider
 from src.providers.openrouter import OpenRouterProvider
+from src.providers.rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -115,6 +117,64 @@ async def create_provider_instances(
     spec: ProviderSpec,
     cfg: ProviderConfig,
     defaults: DefaultsConfig,
+) -> List[LLMProvider]:
+    """
+    Create provider instance(s), bind their key schedulers and register rate limits.
+
+    Args:
+        name: Provider name from config
+        spec: Provider specification from registry
+        cfg: Provider configuration from config.yaml
+        defaults: Default configuration for fallback values
+
+    Returns:
+        List of provider instances (usually 1, but can be multiple for multi_model)
+    """
+    instances = await _build_provider_instances(name, spec, cfg, defaults)
+
+    # Attach key schedulers to the provider name so key health can be loaded/persisted
+    for instance in instances:
+        scheduler = getattr(instance, "api_key_iterator", None)
+        if isinstance(scheduler, KeyScheduler) and scheduler.provider_name is None:
+            scheduler.bind(instance.name)
+
+    if cfg.stream:
+        for instance in instances:
+            if isinstance(instance, OpenAICompatibleProvider):
+                instance.stream = True
+            else:
+                logger.warning(f"Streaming is not supported by {instance.name}; ignoring stream: true")
+
+    if cfg.structured_output is not None:
+        for instance in instances:
+            if isinstance(instance, OpenAICompatibleProvider):
+                instance.structured_output = cfg.structured_output
+
+    for instance in instances:
+        instance.retry_min_wait = defaults.retry_min_wait
+        instance.retry_max_wait = defaults.retry_max_wait
+
+    if cfg.cache_friendly_prompts:
+        for instance in instances:
+            instance.cache_friendly_prompts = True
+
+    if cfg.requests_per_minute or cfg.tokens_per_minute:
+        rate_limiter = RateLimiter.get_default()
+        for provider_name in {instance.name for instance in instances}:
+            rate_limiter.configure(
+                provider_name,
+                requests_per_minute=cfg.requests_per_minute,
+                tokens_per_minute=cfg.tokens_per_minute,
+            )
+
+    return instances
+
+
+async def _build_provider_instances(
+    name: str,
+    spec: ProviderSpec,
+    cfg: ProviderConfig,
+    defaults: DefaultsConfig,
 ) -> List[LLMProvider]:
     """
     Create provider instance(s) based on the spec and config.
@@ -144,13 +204,13 @@ async def create_provider_instances(
         base_url = cfg.base_url or DEFAULT_BASE_URLS.get(name, "")
 
         # Load API keys if needed
-        api_keys_cycle = None
+        api_key_scheduler = None
         if not spec.no_keys and spec.key_name:
             keys = await load_keys(spec.key_name)
             if not keys:
                 logger.warning(f"No API keys found for {name}")
                 return []
-            api_keys_cycle = itertools.cycle(keys)
+            api_key_scheduler = KeyScheduler(keys)
 
         # Cast provider_class to Any to allow dynamic kwargs
         provider_cls = cast(Any, spec.provider_class)
@@ -166,8 +226,8 @@ async def create_provider_instances(
                 "max_retries": max_retries,
                 "json_parse_retries": json_parse_retries,
             }
-            if api_keys_cycle is not None:
-                kwargs["api_keys"] = api_keys_cycle
+            if api_key_scheduler is not None:
+                kwargs["api_keys"] = api_key_scheduler
             instances.append(provider_cls(**kwargs))
         return instances
 
@@ -184,7 +244,7 @@ async def create_provider_instances(
         if not keys:
             logger.warning(f"No API keys found for {name}")
             return []
-        kwargs["api_keys"] = itertools.cycle(keys)
+        kwargs["api_keys"] = KeyScheduler(keys)
 
     # Add model if provider uses single model
     if cfg.model:
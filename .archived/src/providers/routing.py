@@ -0,0 +1,272 @@
+"""Latency- and cost-aware routing of generator providers per question.
+
+By default every question goes to every generator. With a target
+fan-out, GeneratorRouter picks that many generators per question from
+each generator's recent record in provider_results:
+
+- yield: success rate x average card count (expected cards per call)
+- latency: average call time, relative to the generators' median
+- cost: estimated price per call, relative to the most expensive one
+
+score = yield / (1 + latency_weight * latency + cost_weight * cost)
+
+Generators are then sampled without replacement in proportion to their
+scores, preferring models from different providers, so cheap fast
+models carry most questions while every generator keeps some traffic
+(and fresh history). Generators with too little history are treated as
+the best known one until they have enough samples. Outcomes during the
+run update the profiles as they arrive.
+"""
+
+import logging
+import random
+import statistics
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.providers.base import LLMProvider
+
+logger = logging.getLogger(__name__)
+
+# Results required before a generator's history is trusted for scoring
+MIN_ROUTING_SAMPLES = 5
+# Weight multiplier for each already-selected model of the same provider
+SAME_PROVIDER_PENALTY = 0.5
+
+
+@dataclass
+class GeneratorProfile:
+    """Running generation record of a provider/model."""
+
+    results: int = 0
+    successful: int = 0
+    total_time: float = 0.0
+    timed_results: int = 0
+    total_cards: float = 0.0
+    counted_results: int = 0
+    cost_per_call: float = 0.0
+
+    @property
+    def success_rate(self) -> float:
+        return self.successful / self.results if self.results else 0.0
+
+    @property
+    def avg_time(self) -> Optional[float]:
+        return self.total_time / self.timed_results if self.timed_results else None
+
+    @property
+    def avg_cards(self) -> Optional[float]:
+        return self.total_cards / self.counted_results if self.counted_results else None
+
+    @property
+    def expected_cards(self) -> float:
+        """Expected cards per call (success rate x average card count)."""
+        return self.success_rate * (self.avg_cards if self.avg_cards is not None else 1.0)
+
+    def record(self, success: bool, latency_seconds: Optional[float], card_count: Optional[int]) -> None:
+        """Add one generation outcome."""
+        self.results += 1
+        if success:
+            self.successful += 1
+            if card_count is not None:
+                self.total_cards += card_count
+                self.counted_results += 1
+        if latency_seconds is not None:
+            self.total_time += latency_seconds
+            self.timed_results += 1
+
+
+class GeneratorRouter:
+    """
+    Chooses the subset of generators for each question.
+
+    Build with from_history() to seed profiles from the database, or pass
+    profiles directly.
+    """
+
+    def __init__(
+        self,
+        providers: List[LLMProvider],
+        fan_out: int,
+        latency_weight: float = 1.0,
+        cost_weight: float = 1.0,
+        profiles: Optional[Dict[Tuple[str, str], GeneratorProfile]] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            providers: All generator providers
+            fan_out: Generators to select per question (at least 1)
+            latency_weight: How strongly slow generators are penalized
+            cost_weight: How strongly expensive generators are penalized
+            profiles: Initial profiles keyed by (provider_name, model)
+            rng: Random source for weighted sampling
+        """
+        self.providers = providers
+        self.fan_out = max(1, fan_out)
+        self.latency_weight = latency_weight
+        self.cost_weight = cost_weight
+        self._profiles: Dict[Tuple[str, str], GeneratorProfile] = {
+            (provider.name, provider.model): GeneratorProfile() for provider in providers
+        }
+        self._profiles.update(profiles or {})
+        self._rng = rng or random.Random()
+        self.questions_routed = 0
+        self.calls_routed = 0
+        self.selections: Dict[Tuple[str, str], int] = {key: 0 for key in self._profiles}
+
+    @classmethod
+    def from_history(
+        cls,
+        providers: List[LLMProvider],
+        fan_out: int,
+        cost_per_call: Dict[Tuple[str, str], float],
+        latency_weight: float = 1.0,
+        cost_weight: float = 1.0,
+        window: int = 200,
+    ) -> "GeneratorRouter":
+        """
+        Create a router seeded from recent provider_results.
+
+        Args:
+            providers: All generator providers
+            fan_out: Generators to select per question
+            cost_per_call: Estimated USD per call keyed by (provider_name, model)
+            latency_weight: How strongly slow generators are penalized
+            cost_weight: How strongly expensive generators are penalized
+            window: Recent results considered per generator
+
+        Returns:
+            A GeneratorRouter with seeded profiles.
+        """
+        from src.queries import get_recent_provider_performance
+
+        keys = [(provider.name, provider.model) for provider in providers]
+        try:
+            history = get_recent_provider_performance(keys, window=window)
+        except Exception as e:
+            logger.warning(f"[ROUTING] Could not load provider history: {e}")
+            history = {}
+
+        profiles: Dict[Tuple[str, str], GeneratorProfile] = {}
+        for key in keys:
+            stats: Dict[str, Any] = history.get(key, {})
+            results = stats.get("results", 0)
+            successful = stats.get("successful", 0)
+            avg_time = stats.get("avg_time")
+            avg_cards = stats.get("avg_cards")
+            profiles[key] = GeneratorProfile(
+                results=results,
+                successful=successful,
+                total_time=avg_time * results if avg_time is not None else 0.0,
+                timed_results=results if avg_time is not None else 0,
+                total_cards=avg_cards * successful if avg_cards is not None else 0.0,
+                counted_results=successful if avg_cards is not None else 0,
+                cost_per_call=cost_per_call.get(key, 0.0),
+            )
+        return cls(providers, fan_out, latency_weight, cost_weight, profiles)
+
+    def get_profile(self, provider: LLMProvider) -> GeneratorProfile:
+        """Get (or create) the profile of a provider/model."""
+        return self._profiles.setdefault((provider.name, provider.model), GeneratorProfile())
+
+    def record(
+        self,
+        provider: LLMProvider,
+        success: bool,
+        latency_seconds: Optional[float] = None,
+        card_count: Optional[int] = None,
+    ) -> None:
+        """
+        Record a generation outcome observed during the run.
+
+        Args:
+            provider: Provider that was called
+            success: Whether it returned a usable result
+            latency_seconds: Call time
+            card_count: Cards in the result, if it parsed
+        """
+        self.get_profile(provider).record(success, latency_seconds, card_count)
+
+    def scores(self) -> Dict[Tuple[str, str], float]:
+        """
+        Score every generator (higher is better).
+
+        Returns:
+            Dict mapping (provider_name, model) to its routing score.
+        """
+        profiles = {(p.name, p.model): self.get_profile(p) for p in self.providers}
+        known = {key: profile for key, profile in profiles.items() if profile.results >= MIN_ROUTING_SAMPLES}
+
+        times = [profile.avg_time for profile in known.values() if profile.avg_time]
+        median_time = statistics.median(times) if times else None
+        max_cost = max((profile.cost_per_call for profile in profiles.values()), default=0.0)
+
+        scores: Dict[Tuple[str, str], float] = {}
+        for key, profile in known.items():
+            relative_time = profile.avg_time / median_time if profile.avg_time and median_time else 1.0
+            relative_cost = profile.cost_per_call / max_cost if max_cost > 0 else 0.0
+            penalty = 1 + self.latency_weight * relative_time + self.cost_weight * relative_cost
+            scores[key] = profile.expected_cards / penalty
+
+        # Optimistic default for generators without enough history, so they get explored
+        best = max(scores.values(), default=1.0) or 1.0
+        for key in profiles:
+            scores.setdefault(key, best)
+        return scores
+
+    def select(self, question: str) -> List[LLMProvider]:
+        """
+        Choose the generators for a question.
+
+        Args:
+            question: Question being processed (for logging)
+
+        Returns:
+            The selected providers, in their configured order.
+        """
+        if self.fan_out >= len(self.providers):
+            selected = list(self.providers)
+        else:
+            scores = self.scores()
+            # Failing generators keep a small share so they can recover
+            floor = max(scores.values(), default=1.0) * 0.01 or 0.01
+            candidates = list(self.providers)
+            chosen: List[LLMProvider] = []
+            while candidates and len(chosen) < self.fan_out:
+                weights = []
+                for provider in candidates:
+                    weight = max(scores[(provider.name, provider.model)], floor)
+                    same_provider = sum(1 for other in chosen if other.name == provider.name)
+                    weights.append(weight * SAME_PROVIDER_PENALTY ** same_provider)
+                pick = self._rng.choices(range(len(candidates)), weights=weights)[0]
+                chosen.append(candidates.pop(pick))
+            selected = [provider for provider in self.providers if provider in chosen]
+            logger.debug(
+                f"[ROUTING] '{question}' -> "
+                + ", ".join(f"{provider.name}/{provider.model}" for provider in selected)
+            )
+
+        self.questions_routed += 1
+        self.calls_routed += len(selected)
+        for provider in selected:
+            key = (provider.name, provider.model)
+            self.selections[key] = self.selections.get(key, 0) + 1
+        return selected
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get routing statistics.
+
+        Returns:
+            Dict with questions routed, generator calls made, calls a full
+            fan-out would have made, and selections per "provider/model".
+        """
+        return {
+            "questions": self.questions_routed,
+            "calls": self.calls_routed,
+            "full_fan_out_calls": self.questions_routed * len(self.providers),
+            "selections": {f"{name}/{model}": count for (name, model), count in self.selections.items()},
+        }
@@ -0,0 +1,247 @@
+"""Streaming helpers: incremental JSON prefix validation and stream metrics.
+
+When a provider streams its completion, JsonPrefixValidator checks each
+chunk as it arrives so a response that starts with prose, closes the
+wrong bracket, or introduces a top-level key the schema doesn't know can
+be aborted early instead of paying for the whole output. StreamMetrics
+aggregates time-to-first-token and tokens/sec per provider/model.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Characters allowed outside strings: structure, numbers and true/false/null
+_STRUCTURAL_CHARS = frozenset("{}[]:,")
+_WHITESPACE = frozenset(" \t\r\n")
+_SCALAR_CHARS = frozenset("0123456789+-.eE" "aeflnrstu")
+_FENCE = "```"
+
+
+class JsonPrefixValidator:
+    """
+    Incrementally checks that streamed text is a prefix of valid JSON.
+
+    This is a lightweight structural check (brackets, strings, allowed
+    scalar characters, top-level keys), not a full parser: it catches the
+    common failure modes early and leaves full validation to json.loads.
+    """
+
+    def __init__(self, json_schema: Optional[Dict[str, Any]] = None, allow_fence: bool = True):
+        """
+        Initialize the validator.
+
+        Args:
+            json_schema: Schema of the expected object; its root type and
+                         top-level property names are enforced when present.
+            allow_fence: Accept a leading ```json fence and trailing ``` marker.
+        """
+        schema = json_schema or {}
+        self._root_type = schema.get("type")
+        properties = schema.get("properties")
+        self._known_keys = frozenset(properties) if isinstance(properties, dict) else None
+        self._allow_fence = allow_fence
+
+        self._lead = ""  # Text before the JSON body (whitespace / fence)
+        self._started = False
+        self._stack: List[List[Any]] = []  # [bracket, expecting_key]
+        self._in_string = False
+        self._escaped = False
+        self._string_is_key = False
+        self._key_chars: List[str] = []
+
+        self.complete = False
+        self.error: Optional[str] = None
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Feed the next chunk of streamed text.
+
+        Args:
+            chunk: Newly received text
+
+        Returns:
+            False once the stream is known to be invalid (see `error`),
+            True otherwise. Check `complete` to know when the top-level
+            value has been closed.
+        """
+        if self.error is not None:
+            return False
+        for char in chunk:
+            if not self._feed_char(char):
+                return False
+        return True
+
+    def _fail(self, reason: str) -> bool:
+        self.error = reason
+        return False
+
+    def _feed_lead(self, char: str) -> bool:
+        self._lead += char
+        lead = self._lead.lstrip()
+        if not lead:
+            return True
+        if self._allow_fence and (lead.startswith(_FENCE) or _FENCE.startswith(lead)):
+            # Skip the ```json line; the body starts on the next line
+            if lead.startswith(_FENCE) and char == "\n":
+                self._lead = ""
+                self._allow_fence = False
+            return True
+        if lead != char or char not in "{[":
+            return self._fail(f"response does not start with JSON (got {lead[:20]!r})")
+        return self._open_root(char)
+
+    def _open_root(self, char: str) -> bool:
+        if self._root_type == "object" and char != "{":
+            return self._fail("expected a JSON object")
+        if self._root_type == "array" and char != "[":
+            return self._fail("expected a JSON array")
+        self._started = True
+        self._stack.append([char, char == "{"])
+        return True
+
+    def _feed_char(self, char: str) -> bool:
+        if self.complete:
+            # Only whitespace or a closing fence may follow the value
+            if char in _WHITESPACE or char == "`":
+                return True
+            return self._fail("unexpected text after the JSON value")
+
+        if not self._started:
+            return self._feed_lead(char)
+
+        if self._in_string:
+            return self._feed_string_char(char)
+
+        if char in _WHITESPACE:
+            return True
+        if char == '"':
+            top = self._stack[-1]
+            self._in_string = True
+            self._string_is_key = top[0] == "{" and top[1]
+            self._key_chars = []
+            if self._string_is_key:
+                top[1] = False
+            return True
+        if char in "{[":
+            self._stack.append([char, char == "{"])
+            return True
+        if char in "}]":
+            opener = self._stack.pop()
+            if (opener[0], char) not in (("{", "}"), ("[", "]")):
+                return self._fail(f"mismatched {char!r}")
+            if not self._stack:
+                self.complete = True
+            return True
+        if char == ",":
+            top = self._stack[-1]
+            if top[0] == "{":
+                top[1] = True
+            return True
+        if char in _STRUCTURAL_CHARS or char in _SCALAR_CHARS:
+            return True
+        return self._fail(f"unexpected character {char!r}")
+
+    def _feed_string_char(self, char: str) -> bool:
+        if self._escaped:
+            self._escaped = False
+        elif char == "\\":
+            self._escaped = True
+        elif char == '"':
+            self._in_string = False
+            if self._string_is_key and len(self._stack) == 1 and self._known_keys is not None:
+                key = "".join(self._key_chars)
+                if key not in self._known_keys:
+                    return self._fail(f"unknown top-level key {key!r}")
+            return True
+        if self._string_is_key:
+            self._key_chars.append(char)
+        return True
+
+
+@dataclass
+class StreamStats:
+    """Aggregated streaming statistics for a provider/model."""
+
+    streams: int = 0
+    aborted: int = 0
+    ttft_samples: int = 0
+    total_ttft_seconds: float = 0.0
+    total_tokens: int = 0
+    total_generation_seconds: float = 0.0
+
+    @property
+    def avg_ttft_seconds(self) -> float:
+        return self.total_ttft_seconds / self.ttft_samples if self.ttft_samples else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        if self.total_generation_seconds <= 0:
+            return 0.0
+        return self.total_tokens / self.total_generation_seconds
+
+
+class StreamMetrics:
+    """
+    Collects time-to-first-token and throughput per provider/model.
+
+    Supports both singleton access (via get_default()) and dependency injection.
+    """
+
+    _instance: Optional["StreamMetrics"] = None
+
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str], StreamStats] = {}
+
+    def record(
+        self,
+        provider_name: str,
+        model: str,
+        ttft_seconds: Optional[float],
+        output_tokens: int,
+        generation_seconds: float,
+        aborted: bool = False,
+    ) -> None:
+        """
+        Record one streamed completion.
+
+        Args:
+            provider_name: Provider name
+            model: Model name
+            ttft_seconds: Seconds until the first content token (None if none arrived)
+            output_tokens: Output tokens received
+            generation_seconds: Seconds from first token to end of stream
+            aborted: Whether the stream was aborted early as invalid
+        """
+        stats = self._stats.setdefault((provider_name, model), StreamStats())
+        stats.streams += 1
+        if aborted:
+            stats.aborted += 1
+        if ttft_seconds is not None:
+            stats.ttft_samples += 1
+            stats.total_ttft_seconds += ttft_seconds
+        stats.total_tokens += output_tokens
+        stats.total_generation_seconds += generation_seconds
+
+    def get_stats(self) -> Dict[str, StreamStats]:
+        """
+        Get streaming statistics.
+
+        Returns:
+            Dict mapping "provider/model" to its StreamStats.
+        """
+        return {f"{name}/{model}": stats for (name, model), stats in self._stats.items()}
+
+    @classmethod
+    def get_default(cls) -> "StreamMetrics":
+        """Get or create the default singleton instance."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def reset_default(cls) -> None:
+        """Reset the default singleton (useful for testing cleanup)."""
+        cls._instance = None
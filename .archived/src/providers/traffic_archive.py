@@ -0,0 +1,379 @@
+"""Record-and-replay of provider HTTP traffic.
+
+The SQLite response cache answers a repeated question instantly, which
+hides how a run actually behaves under load. This module works one level
+lower, at the httpx transport used by the pooled SDK clients:
+
+- TrafficRecorder wraps the real transport and appends every exchange
+  (status, headers, body chunks and their timing, or the transport error)
+  to a JSON-lines archive.
+- TrafficReplayer serves those exchanges back without touching the
+  network, sleeping for the recorded latencies divided by a speed factor,
+  so a production run's traffic shape (slow models, 429s, timeouts,
+  streamed chunk pacing) can be reproduced offline against scheduler,
+  retry or concurrency changes.
+
+Exchanges are matched on method, URL and request body; request headers
+(and so API keys) are never written to the archive.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_VERSION = 1
+
+
+class ReplayMissError(httpx.TransportError):
+    """Raised when a replayed request has no recorded exchange."""
+    pass
+
+
+def request_key(method: str, url: httpx.URL, body: bytes) -> str:
+    """
+    Build the archive lookup key for a request.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        body: Request body bytes
+
+    Returns:
+        Hex digest identifying the request.
+    """
+    digest = hashlib.sha256(f"{method} {url}\n".encode("utf-8"))
+    digest.update(body)
+    return digest.hexdigest()
+
+
+@dataclass
+class RecordedExchange:
+    """One request/response pair with its timing."""
+
+    key: str
+    method: str
+    url: str  # Without query string
+    started_at: float  # Seconds since recording started
+    status_code: int = 0
+    headers: List[Tuple[str, str]] = field(default_factory=list)
+    headers_at: float = 0.0  # Seconds from request start to response headers
+    chunks: List[Tuple[float, bytes]] = field(default_factory=list)  # (seconds from request start, bytes)
+    error: Optional[str] = None  # httpx exception class name for failed exchanges
+    error_message: str = ""
+
+    @property
+    def duration(self) -> float:
+        """Seconds from request start to the last body chunk (or the error)."""
+        return self.chunks[-1][0] if self.chunks else self.headers_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "method": self.method,
+            "url": self.url,
+            "started_at": round(self.started_at, 6),
+            "status_code": self.status_code,
+            "headers": self.headers,
+            "headers_at": round(self.headers_at, 6),
+            "chunks": [
+                [round(offset, 6), base64.b64encode(data).decode("ascii")] for offset, data in self.chunks
+            ],
+            "error": self.error,
+            "error_message": self.error_message,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RecordedExchange":
+        return cls(
+            key=data["key"],
+            method=data["method"],
+            url=data["url"],
+            started_at=data["started_at"],
+            status_code=data.get("status_code", 0),
+            headers=[(name, value) for name, value in data.get("headers", [])],
+            headers_at=data.get("headers_at", 0.0),
+            chunks=[(offset, base64.b64decode(encoded)) for offset, encoded in data.get("chunks", [])],
+            error=data.get("error"),
+            error_message=data.get("error_message", ""),
+        )
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    """Response body stream that timestamps chunks as the client reads them."""
+
+    def __init__(
+        self,
+        stream: httpx.AsyncByteStream,
+        exchange: RecordedExchange,
+        request_start: float,
+        on_complete: Callable[[RecordedExchange], None],
+    ):
+        self._stream = stream
+        self._exchange = exchange
+        self._request_start = request_start
+        self._on_complete = on_complete
+        self._completed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._exchange.chunks.append((time.monotonic() - self._request_start, chunk))
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._completed:
+                self._completed = True
+                self._on_complete(self._exchange)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Transport that forwards requests and records each exchange."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, recorder: "TrafficRecorder"):
+        self._inner = inner
+        self._recorder = recorder
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        exchange = RecordedExchange(
+            key=request_key(request.method, request.url, body),
+            method=request.method,
+            url=str(request.url.copy_with(query=None)),
+            started_at=self._recorder.elapsed(),
+        )
+        request_start = time.monotonic()
+        try:
+            response = await self._inner.handle_async_request(request)
+        except httpx.TransportError as e:
+            exchange.headers_at = time.monotonic() - request_start
+            exchange.error = type(e).__name__
+            exchange.error_message = str(e)
+            self._recorder.write(exchange)
+            raise
+
+        exchange.status_code = response.status_code
+        exchange.headers = list(response.headers.multi_items())
+        exchange.headers_at = time.monotonic() - request_start
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, exchange, request_start, self._recorder.write),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class TrafficRecorder:
+    """
+    Appends provider HTTP exchanges to a JSON-lines archive.
+
+    Use create_transport as a ClientPool transport_factory.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Initialize the recorder and start a new archive.
+
+        Args:
+            path: Archive file to write (overwritten)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("w", encoding="utf-8")
+        self._file.write(json.dumps({"version": ARCHIVE_VERSION, "recorded_at": time.time()}) + "\n")
+        self._start = time.monotonic()
+        self.recorded = 0
+
+    def elapsed(self) -> float:
+        """Seconds since recording started."""
+        return time.monotonic() - self._start
+
+    def write(self, exchange: RecordedExchange) -> None:
+        """Append a completed exchange to the archive."""
+        if self._file.closed:
+            return
+        self._file.write(json.dumps(exchange.to_dict()) + "\n")
+        self._file.flush()
+        self.recorded += 1
+
+    def create_transport(self, limits: httpx.Limits) -> httpx.AsyncBaseTransport:
+        """Create a recording transport around a real HTTP transport."""
+        return RecordingTransport(httpx.AsyncHTTPTransport(limits=limits), self)
+
+    def close(self) -> None:
+        """Close the archive file."""
+        if not self._file.closed:
+            self._file.close()
+            logger.info(f"[TRAFFIC] Recorded {self.recorded} exchanges to {self.path}")
+
+
+class _ReplayStream(httpx.AsyncByteStream):
+    """Response body stream that re-emits recorded chunks at their recorded pace."""
+
+    def __init__(self, exchange: RecordedExchange, speed: float):
+        self._exchange = exchange
+        self._speed = speed
+
+    async def __aiter__(self):
+        elapsed = self._exchange.headers_at
+        for offset, chunk in self._exchange.chunks:
+            if offset > elapsed:
+                await asyncio.sleep((offset - elapsed) / self._speed)
+                elapsed = offset
+            yield chunk
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Transport that answers requests from a TrafficReplayer."""
+
+    def __init__(self, replayer: "TrafficReplayer"):
+        self._replayer = replayer
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        exchange = self._replayer.next_exchange(request_key(request.method, request.url, body))
+        if exchange is None:
+            raise ReplayMissError(
+                f"No recorded exchange for {request.method} {request.url.copy_with(query=None)}",
+                request=request,
+            )
+
+        speed = self._replayer.speed
+        if exchange.headers_at > 0:
+            await asyncio.sleep(exchange.headers_at / speed)
+        if exchange.error:
+            error_class = getattr(httpx, exchange.error, None)
+            if not (isinstance(error_class, type) and issubclass(error_class, httpx.TransportError)):
+                error_class = httpx.TransportError
+            raise error_class(exchange.error_message or exchange.error, request=request)
+
+        return httpx.Response(
+            status_code=exchange.status_code,
+            headers=exchange.headers,
+            stream=_ReplayStream(exchange, speed),
+            request=request,
+        )
+
+
+class TrafficReplayer:
+    """
+    Serves exchanges from a recorded archive with scaled latencies.
+
+    Identical requests are answered in recorded order (so a recorded
+    429-then-success sequence replays the same way); once a request's
+    recordings are exhausted the last one is repeated. Use
+    create_transport as a ClientPool transport_factory.
+    """
+
+    def __init__(self, path: Union[str, Path], speed: float = 1.0):
+        """
+        Load an archive for replay.
+
+        Args:
+            path: Archive written by TrafficRecorder
+            speed: Latency divisor (10.0 replays ten times faster)
+
+        Raises:
+            ValueError: If speed is not positive or the archive version is unsupported.
+        """
+        if speed <= 0:
+            raise ValueError(f"Replay speed must be positive, got {speed}")
+        self.path = Path(path)
+        self.speed = speed
+        self._exchanges: Dict[str, Deque[RecordedExchange]] = {}
+        self.loaded = 0
+        self.replayed = 0
+        self.misses = 0
+
+        with self.path.open("r", encoding="utf-8") as archive:
+            header = json.loads(archive.readline() or "{}")
+            if header.get("version") != ARCHIVE_VERSION:
+                raise ValueError(f"Unsupported traffic archive version: {header.get('version')}")
+            for line in archive:
+                if line.strip():
+                    exchange = RecordedExchange.from_dict(json.loads(line))
+                    self._exchanges.setdefault(exchange.key, deque()).append(exchange)
+                    self.loaded += 1
+        # Recorded order is completion order; replay in request start order
+        for queue in self._exchanges.values():
+            queue_sorted = sorted(queue, key=lambda exchange: exchange.started_at)
+            queue.clear()
+            queue.extend(queue_sorted)
+
+    def next_exchange(self, key: str) -> Optional[RecordedExchange]:
+        """
+        Take the next recorded exchange for a request key.
+
+        Args:
+            key: Key from request_key()
+
+        Returns:
+            The exchange to replay, or None if the request was never recorded.
+        """
+        queue = self._exchanges.get(key)
+        if not queue:
+            self.misses += 1
+            logger.warning(f"[TRAFFIC] Replay miss for request {key[:12]}")
+            return None
+        self.replayed += 1
+        return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def create_transport(self, limits: httpx.Limits) -> httpx.AsyncBaseTransport:
+        """Create a replaying transport (limits are unused; nothing is dialled)."""
+        return ReplayTransport(self)
+
+    def close(self) -> None:
+        """Log replay statistics."""
+        logger.info(
+            f"[TRAFFIC] Replayed {self.replayed} of {self.loaded} recorded exchanges "
+            f"at {self.speed:g}x ({self.misses} misses)"
+        )
+
+
+def install_traffic_archive(
+    record_path: Optional[Union[str, Path]] = None,
+    replay_path: Optional[Union[str, Path]] = None,
+    speed: float = 1.0,
+) -> Optional[Union[TrafficRecorder, TrafficReplayer]]:
+    """
+    Route the default client pool through a recording or replaying transport.
+
+    Must be called before any provider client is created.
+
+    Args:
+        record_path: Archive to record to
+        replay_path: Archive to replay from (takes precedence over record_path)
+        speed: Replay latency divisor
+
+    Returns:
+        The installed recorder or replayer (call close() at shutdown), or
+        None if neither path was given.
+    """
+    from src.providers.client_pool import ClientPool
+
+    archive: Optional[Union[TrafficRecorder, TrafficReplayer]] = None
+    if replay_path:
+        archive = TrafficReplayer(replay_path, speed=speed)
+        logger.info(f"[TRAFFIC] Replaying {archive.loaded} exchanges from {archive.path} at {speed:g}x")
+    elif record_path:
+        archive = TrafficRecorder(record_path)
+        logger.info(f"[TRAFFIC] Recording provider traffic to {archive.path}")
+    if archive is not None:
+        ClientPool.set_default(ClientPool(transport_factory=archive.create_transport))
+    return archive
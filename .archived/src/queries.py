@@ -602,6 +602,56 @@ def get_provider_statistics(run_id: Optional[str] = None) -> Dict[str, Any]:
     return stats
 
 
+def get_recent_provider_performance(
+    provider_keys: List[Tuple[str, str]],
+    window: int = 200,
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    Get recent generation performance per provider/model.
+
+    Args:
+        provider_keys: (provider_name, model) pairs to look up
+        window: Most recent provider results considered per pair
+
+    Returns:
+        Dict mapping (provider_name, model) to its number of results,
+        successful results, average processing time and average card count
+        of successful results (None where no data was recorded). Pairs
+        without any results are omitted.
+    """
+    session = _get_session()
+    performance: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    try:
+        for provider_name, model in provider_keys:
+            rows = (
+                session.query(
+                    ProviderResult.success,
+                    ProviderResult.processing_time_seconds,
+                    ProviderResult.card_count,
+                )
+                .filter(
+                    ProviderResult.provider_name == provider_name,
+                    ProviderResult.provider_model == model,
+                )
+                .order_by(desc(ProviderResult.created_at))
+                .limit(window)
+                .all()
+            )
+            if not rows:
+                continue
+            times = [row.processing_time_seconds for row in rows if row.processing_time_seconds is not None]
+            cards = [row.card_count for row in rows if row.success and row.card_count is not None]
+            performance[(provider_name, model)] = {
+                "results": len(rows),
+                "successful": sum(1 for row in rows if row.success),
+                "avg_time": sum(times) / len(times) if times else None,
+                "avg_cards": sum(cards) / len(cards) if cards else None,
+            }
+    finally:
+        session.close()
+    return performance
+
+
 # Need to import Integer for the cast
 from sqlalchemy import Integer as Integer
 
@@ -0,0 +1,77 @@
+"""Run summary metrics shared by the generation orchestrators."""
+
+import logging
+from typing import Optional
+
+from src.cache import RequestCoalescer
+from src.generator import CardGenerator
+from src.providers.backoff import BackoffGate
+from src.providers.circuit_breaker import CircuitBreakers
+from src.providers.parse_metrics import JsonParseMetrics
+from src.providers.rate_limiter import RateLimiter
+from src.providers.streaming import StreamMetrics
+
+logger = logging.getLogger(__name__)
+
+
+def log_run_metrics(card_generator: Optional[CardGenerator]) -> None:
+    """
+    Log the run's request-level metrics below the cost summary.
+
+    Covers request coalescing, rate limit waits and backoff pauses,
+    formatter calls saved by local JSON repair, hedging, routing, circuit
+    breakers, JSON parse failures and streaming. Lines are only logged for
+    features that did something during the run.
+
+    Args:
+        card_generator: The run's card generator (None if it never started).
+    """
+    coalesced = RequestCoalescer.get_default().get_stats()["coalesced_requests"]
+    if coalesced:
+        logger.info(f"Coalesced duplicate requests: {coalesced}")
+    for provider_name, stats in RateLimiter.get_default().get_stats().items():
+        logger.info(
+            f"Rate limit wait ({provider_name}): {stats['wait_seconds']:.1f}s "
+            f"across {stats['waits']} requests"
+        )
+    for provider_name, stats in BackoffGate.get_default().get_stats().items():
+        logger.info(
+            f"Rate limit backoff ({provider_name}): paused {stats['pauses']} times, "
+            f"{stats['wait_seconds']:.1f}s waited"
+        )
+    if card_generator and card_generator.formatter_calls_saved:
+        logger.info(
+            f"Local JSON repair saved {card_generator.formatter_calls_saved} formatter calls "
+            f"(~{card_generator.formatter_tokens_saved:,} tokens)"
+        )
+    hedger = card_generator.hedger if card_generator else None
+    if hedger is not None and hedger.hedged_calls:
+        hedge_stats = hedger.get_stats()
+        logger.info(
+            f"Hedged requests: {hedge_stats['hedged_calls']}/{hedge_stats['primary_calls']} "
+            f"({hedge_stats['hedge_wins']} won by the hedge)"
+        )
+    router = card_generator.router if card_generator else None
+    if router is not None and router.questions_routed:
+        routing_stats = router.get_stats()
+        logger.info(
+            f"Routing: {routing_stats['calls']}/{routing_stats['full_fan_out_calls']} generator calls "
+            f"({', '.join(f'{key}: {count}' for key, count in routing_stats['selections'].items())})"
+        )
+    for provider_key, circuit_stats in CircuitBreakers.get_default().get_stats().items():
+        if circuit_stats["rejected"]:
+            logger.info(
+                f"Circuit breaker ({provider_key}): skipped {circuit_stats['rejected']} attempts, "
+                f"now {circuit_stats['state']}"
+            )
+    for provider_key, parse_stats in JsonParseMetrics.get_default().get_stats().items():
+        logger.info(
+            f"JSON parse failures ({provider_key}): {parse_stats.parse_failures}/{parse_stats.responses} "
+            f"({parse_stats.failure_rate:.0%})"
+        )
+    for provider_key, stream_stats in StreamMetrics.get_default().get_stats().items():
+        logger.info(
+            f"Streaming ({provider_key}): TTFT {stream_stats.avg_ttft_seconds:.2f}s, "
+            f"{stream_stats.tokens_per_second:.1f} tok/s, "
+            f"{stream_stats.aborted}/{stream_stats.streams} aborted early"
+        )
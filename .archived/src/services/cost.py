@@ -7,7 +7,9 @@ Provides functionality for:
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.services.tokens import count_tokens, get_model_family
 
 
 # Token pricing per 1M tokens (input, output) in USD
@@ -113,7 +115,10 @@ class CostEstimator:
         Returns:
             Tuple of (input_price_per_million, output_price_per_million)
         """
-        return self.pricing.get(provider_name, (0.0, 0.0))
+        if provider_name in self.pricing:
+            return self.pricing[provider_name]
+        # Provider instances are named "llm2deck_<provider>"
+        return self.pricing.get(provider_name.removeprefix("llm2deck_"), (0.0, 0.0))
 
     def calculate_cost(
         self,
@@ -141,6 +146,7 @@ class CostEstimator:
         provider_name: str,
         model: str,
         question_count: int,
+        input_tokens: Optional[int] = None,
     ) -> ProviderCostEstimate:
         """Estimate cost for a single provider.
 
@@ -148,11 +154,14 @@ class CostEstimator:
             provider_name: Name of the provider
             model: Model name
             question_count: Number of questions to process
+            input_tokens: Counted input tokens for the run (default: the
+                          flat per-question estimate)
 
         Returns:
             ProviderCostEstimate with cost breakdown
         """
-        input_tokens = self.input_tokens_per_question * question_count
+        if input_tokens is None:
+            input_tokens = self.input_tokens_per_question * question_count
         output_tokens = self.output_tokens_per_question * question_count
         input_price, output_price = self.get_provider_pricing(provider_name)
 
@@ -168,24 +177,75 @@ class CostEstimator:
             estimated_cost_usd=estimated_cost,
         )
 
+    def estimate_cost_per_call(self, provider_name: str) -> float:
+        """Estimate the cost of one generation call with the per-question token estimates.
+
+        Args:
+            provider_name: Name of the provider
+
+        Returns:
+            Cost in USD
+        """
+        return self.calculate_cost(
+            provider_name, self.input_tokens_per_question, self.output_tokens_per_question
+        )
+
     def estimate_run_cost(
         self,
         providers: List[Tuple[str, str]],  # List of (provider_name, model)
         question_count: int,
+        prompts: Optional[Sequence[str]] = None,
+        combiners: Optional[List[Tuple[str, str]]] = None,
+        fan_out: Optional[int] = None,
     ) -> CostEstimate:
         """Estimate total cost for a generation run.
 
         Args:
-            providers: List of (provider_name, model) tuples for all providers
+            providers: List of (provider_name, model) tuples for the generators
+                       (or for all providers, if combiners is not given)
             question_count: Number of questions to process
+            prompts: Rendered initial prompts (all, or a sample). If given,
+                     generator input tokens are counted per model family
+                     instead of using the flat per-question estimate.
+            combiners: (provider_name, model) tuples for the combiner and
+                       formatter, whose input also carries the generators'
+                       outputs (fan_out x the per-question output estimate)
+            fan_out: Generator results combined per question (default: all
+                     generators)
 
         Returns:
             CostEstimate with total cost breakdown
         """
+        prompt_tokens_by_family: Dict[str, int] = {}
+
+        def prompt_tokens_per_question(model: str) -> Optional[float]:
+            if not prompts:
+                return None
+            family = get_model_family(model).name
+            if family not in prompt_tokens_by_family:
+                prompt_tokens_by_family[family] = sum(count_tokens(prompt, model) for prompt in prompts)
+            return prompt_tokens_by_family[family] / len(prompts)
+
+        def counted_input_tokens(model: str) -> Optional[int]:
+            per_question = prompt_tokens_per_question(model)
+            return round(per_question * question_count) if per_question is not None else None
+
+        def combiner_input_tokens(model: str) -> int:
+            per_question = prompt_tokens_per_question(model)
+            if per_question is None:
+                per_question = self.input_tokens_per_question
+            generator_count = min(fan_out, len(providers)) if fan_out else len(providers)
+            generator_outputs = generator_count * self.output_tokens_per_question
+            return round((per_question + generator_outputs) * question_count)
+
         provider_estimates = [
-            self.estimate_provider_cost(name, model, question_count)
+            self.estimate_provider_cost(name, model, question_count, counted_input_tokens(model))
             for name, model in providers
         ]
+        provider_estimates.extend(
+            self.estimate_provider_cost(name, model, question_count, combiner_input_tokens(model))
+            for name, model in combiners or []
+        )
 
         return CostEstimate(
             total_questions=question_count,
@@ -0,0 +1,188 @@
+"""Offline prompt token counting per model family.
+
+Approximates BPE tokenizers without downloading vocabularies: text is
+split the way byte-level BPE pre-tokenizers split it (words, digit
+groups, punctuation runs, whitespace), each piece is costed by length,
+and the total is scaled by a per-family factor. The estimate is close
+enough to size cost estimates and to catch prompts that would overflow
+a model's context window before a request is spent on them.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Word pieces, 1-3 digit groups, punctuation runs, whitespace runs
+_PIECE_RE = re.compile(r"[^\W\d_]+|\d{1,3}|[^\w\s]+|_+|\s+")
+# Tokens added per chat message for role markers / separators
+MESSAGE_OVERHEAD_TOKENS = 4
+# Tokens kept free for the response when checking a prompt against the context window
+DEFAULT_OUTPUT_RESERVE_TOKENS = 8192
+
+
+@dataclass(frozen=True)
+class ModelFamily:
+    """Tokenizer approximation and context window for a family of models."""
+
+    name: str
+    patterns: Tuple[str, ...]  # Lower-case substrings of the model name
+    token_scale: float  # Multiplier relative to a ~100k-vocabulary BPE tokenizer
+    context_window: int
+
+
+MODEL_FAMILIES: Tuple[ModelFamily, ...] = (
+    ModelFamily("gpt-oss", ("gpt-oss",), 1.0, 131_072),
+    ModelFamily("openai", ("gpt-", "o1", "o3", "o4"), 0.95, 128_000),
+    ModelFamily("claude", ("claude",), 1.15, 200_000),
+    ModelFamily("gemini", ("gemini", "gemma"), 0.95, 1_048_576),
+    ModelFamily("glm", ("glm",), 1.05, 131_072),
+    ModelFamily("kimi", ("kimi", "moonshot"), 1.0, 262_144),
+    ModelFamily("qwen", ("qwen", "coder-model"), 1.05, 131_072),
+    ModelFamily("deepseek", ("deepseek",), 1.05, 128_000),
+    ModelFamily("llama", ("llama",), 1.0, 128_000),
+    ModelFamily("mistral", ("mistral", "mixtral", "codestral"), 1.1, 128_000),
+    ModelFamily("mimo", ("mimo",), 1.0, 262_144),
+)
+DEFAULT_FAMILY = ModelFamily("default", (), 1.1, 128_000)
+
+
+@lru_cache(maxsize=256)
+def get_model_family(model: str) -> ModelFamily:
+    """
+    Get the tokenizer family for a model name.
+
+    Args:
+        model: Model name (e.g. "zai-glm-4.7", "moonshotai/kimi-k2-thinking")
+
+    Returns:
+        The matching ModelFamily, or DEFAULT_FAMILY for unknown models.
+    """
+    name = model.lower()
+    for family in MODEL_FAMILIES:
+        if any(pattern in name for pattern in family.patterns):
+            return family
+    return DEFAULT_FAMILY
+
+
+def get_context_window(model: str) -> int:
+    """Get the context window (in tokens) for a model."""
+    return get_model_family(model).context_window
+
+
+def _count_raw_tokens(text: str) -> int:
+    """Count tokens for a ~100k-vocabulary byte-level BPE tokenizer."""
+    tokens = 0
+    for match in _PIECE_RE.finditer(text):
+        piece = match.group()
+        first = piece[0]
+        if first.isspace():
+            # A single space merges into the following word
+            if piece != " ":
+                tokens += 1
+        elif first.isalpha():
+            if not piece.isascii():
+                # CJK and other non-Latin scripts: roughly 1.5 characters per token
+                tokens += math.ceil(len(piece) / 1.5)
+            elif len(piece) <= 8:
+                tokens += 1
+            else:
+                tokens += math.ceil(len(piece) / 4)
+        elif first.isdigit():
+            tokens += 1
+        else:
+            # Common punctuation pairs ('",', '":', '{"') are single tokens
+            tokens += math.ceil(len(piece) / 2)
+    return tokens
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """
+    Estimate the number of tokens in a text for a model.
+
+    Args:
+        text: Text to count
+        model: Model name used to select the tokenizer family
+
+    Returns:
+        Approximate token count.
+    """
+    if not text:
+        return 0
+    return math.ceil(_count_raw_tokens(text) * get_model_family(model).token_scale)
+
+
+def count_message_tokens(messages: Sequence[Dict[str, Any]], model: str = "") -> int:
+    """
+    Estimate the prompt tokens of a list of chat messages.
+
+    Args:
+        messages: Chat messages with "content"
+        model: Model name used to select the tokenizer family
+
+    Returns:
+        Approximate prompt token count including per-message overhead.
+    """
+    return sum(
+        count_tokens(str(message.get("content") or ""), model) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+def fits_context(
+    prompt_tokens: int, model: str, output_reserve: int = DEFAULT_OUTPUT_RESERVE_TOKENS
+) -> bool:
+    """Check whether a prompt leaves room for the response in the model's context window."""
+    return prompt_tokens + output_reserve <= get_context_window(model)
+
+
+def split_text(text: str, max_tokens: int, model: str = "") -> List[str]:
+    """
+    Split text into chunks of at most max_tokens (approximately).
+
+    Splits on paragraph boundaries where possible, then on lines, and
+    hard-splits single lines that are still too long.
+
+    Args:
+        text: Text to split
+        max_tokens: Token budget per chunk
+        model: Model name used to select the tokenizer family
+
+    Returns:
+        List of chunks (a single chunk if the text already fits).
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return [text]
+
+    # (separator before the unit, unit text), so chunks keep the original layout
+    units: List[Tuple[str, str]] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        if count_tokens(paragraph, model) <= max_tokens:
+            units.append(("\n\n", paragraph))
+            continue
+        separator = "\n\n"
+        for line in paragraph.split("\n"):
+            line_tokens = count_tokens(line, model)
+            if line_tokens <= max_tokens:
+                units.append((separator, line))
+            else:
+                # Hard split, sized by this line's own characters-per-token ratio
+                step = max(1, int(len(line) * max_tokens / line_tokens))
+                units.append((separator, line[:step]))
+                units.extend(("", line[start:start + step]) for start in range(step, len(line), step))
+            separator = "\n"
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for separator, unit in units:
+        unit_tokens = count_tokens(unit, model) + 1
+        if current and current_tokens + unit_tokens > max_tokens:
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(separator + unit if current else unit)
+        current_tokens += unit_tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
@@ -1,6 +1,8 @@
 """Provider initialization and configuration."""
 
+import asyncio
 import logging
+import time
 from typing import List, Optional, Tuple
 
 from src.config import ENABLE_GEMINI
@@ -12,17 +14,75 @@ from src.config.loader import (
     ProviderConfig,
 )
 from src.providers.base import LLMProvider
-from src.providers.registry import PROVIDER_REGISTRY, create_provider_instances
+from src.providers.registry import PROVIDER_REGISTRY, ProviderSpec, create_provider_instances
 
 logger = logging.getLogger(__name__)
 
 
+async def _create_instances_with_timeout(
+    name: str,
+    spec: ProviderSpec,
+    cfg: ProviderConfig,
+    defaults: DefaultsConfig,
+) -> List[LLMProvider]:
+    """
+    Create a provider's instances, giving up after its init timeout.
+
+    Args:
+        name: Provider name from config
+        spec: Provider specification from registry
+        cfg: Provider configuration from config.yaml
+        defaults: Default configuration for fallback values
+
+    Returns:
+        The provider instances, or an empty list if initialization failed or timed out.
+    """
+    timeout = cfg.init_timeout if cfg.init_timeout is not None else defaults.init_timeout
+    start = time.monotonic()
+    try:
+        instances = await asyncio.wait_for(
+            create_provider_instances(name, spec, cfg, defaults=defaults),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"Timed out initializing {name} provider after {timeout:.0f}s; skipping it")
+        return []
+    except Exception as error:
+        logger.warning(f"Error loading {name} provider: {error}")
+        return []
+    logger.debug(f"[INIT] {name}: {len(instances)} instance(s) in {time.monotonic() - start:.2f}s")
+    return instances
+
+
+async def prewarm_providers(providers: List[LLMProvider], timeout: float) -> None:
+    """
+    Open a keep-alive connection per pooled client before the first request.
+
+    Args:
+        providers: Providers to warm (clients shared between them are warmed once)
+        timeout: Seconds to wait for all warm-up requests
+    """
+    start = time.monotonic()
+    results = await asyncio.gather(
+        *(asyncio.wait_for(provider.prewarm(), timeout=timeout) for provider in providers),
+        return_exceptions=True,
+    )
+    for provider, result in zip(providers, results):
+        if isinstance(result, BaseException):
+            logger.debug(f"[INIT] Pre-warming {provider.name}/{provider.model} failed: {result!r}")
+    logger.info(f"[INIT] Pre-warmed provider connections in {time.monotonic() - start:.2f}s")
+
+
 async def initialize_providers() -> Tuple[List[LLMProvider], Optional[LLMProvider], Optional[LLMProvider]]:
     """
     Initialize and return configured LLM providers with combiner and formatter separated.
 
     Reads configuration from config.yaml to determine which providers
-    are enabled and their settings. If a combiner is configured in
+    are enabled and their settings. Enabled providers are initialized
+    concurrently (key files, Gemini cookie refresh, ...), each bounded by
+    its init_timeout, so startup latency stays flat as providers are added.
+    With defaults.prewarm_connections, one connection per endpoint/key is
+    opened before returning. If a combiner is configured in
     generation.combiner, it will be created separately. If a formatter
     is configured in generation.formatter, it will also be created separately.
 
@@ -48,13 +108,16 @@ async def initialize_providers() -> Tuple[List[LLMProvider], Optional[LLMProvide
         retry_delay=config.defaults.retry_delay,
         retry_min_wait=config.defaults.retry_min_wait,
         retry_max_wait=config.defaults.retry_max_wait,
+        init_timeout=config.defaults.init_timeout,
+        prewarm_connections=config.defaults.prewarm_connections,
     )
 
     active_providers: List[LLMProvider] = []
     combiner_provider: Optional[LLMProvider] = None
     formatter_provider: Optional[LLMProvider] = None
 
-    # Initialize providers from registry
+    # Collect enabled providers from registry
+    enabled: List[Tuple[str, ProviderSpec, ProviderConfig]] = []
     for name, spec in PROVIDER_REGISTRY.items():
         cfg = config.providers.get(name)
 
@@ -67,47 +130,53 @@ async def initialize_providers() -> Tuple[List[LLMProvider], Optional[LLMProvide
 
         if not cfg or not cfg.enabled:
             continue
+        enabled.append((name, spec, cfg))
 
-        try:
-            instances = await create_provider_instances(
-                name, spec, cfg,
-                defaults=effective_defaults,
-            )
-
-            for instance in instances:
-                is_combiner = False
-                is_formatter = False
-
-                # Check if this instance is the combiner
-                if combiner_cfg and name == combiner_cfg.provider:
-                    if instance.model == combiner_cfg.model or (
-                        len(instances) == 1 and not cfg.models
-                    ):
-                        combiner_provider = instance
-                        is_combiner = True
-
-                # Check if this instance is the formatter
-                if formatter_cfg and name == formatter_cfg.provider:
-                    if instance.model == formatter_cfg.model or (
-                        len(instances) == 1 and not cfg.models
-                    ):
-                        formatter_provider = instance
-                        is_formatter = True
-
-                # Determine if instance should be added to active generators
-                should_add = True
-                if is_combiner and combiner_cfg and not combiner_cfg.also_generate:
-                    should_add = False
-                if is_formatter and formatter_cfg and not formatter_cfg.also_generate:
-                    should_add = False
-
-                if should_add:
-                    active_providers.append(instance)
-
-        except Exception as error:
-            logger.warning(f"Error loading {name} provider: {error}")
+    # Initialize them concurrently; results keep registry order
+    start = time.monotonic()
+    created = await asyncio.gather(
+        *(_create_instances_with_timeout(name, spec, cfg, effective_defaults) for name, spec, cfg in enabled)
+    )
+    logger.debug(f"[INIT] Initialized {len(enabled)} providers in {time.monotonic() - start:.2f}s")
+
+    for (name, spec, cfg), instances in zip(enabled, created):
+        for instance in instances:
+            is_combiner = False
+            is_formatter = False
+
+            # Check if this instance is the combiner
+            if combiner_cfg and name == combiner_cfg.provider:
+                if instance.model == combiner_cfg.model or (
+                    len(instances) == 1 and not cfg.models
+                ):
+                    combiner_provider = instance
+                    is_combiner = True
+
+            # Check if this instance is the formatter
+            if formatter_cfg and name == formatter_cfg.provider:
+                if instance.model == formatter_cfg.model or (
+                    len(instances) == 1 and not cfg.models
+                ):
+                    formatter_provider = instance
+                    is_formatter = True
+
+            # Determine if instance should be added to active generators
+            should_add = True
+            if is_combiner and combiner_cfg and not combiner_cfg.also_generate:
+                should_add = False
+            if is_formatter and formatter_cfg and not formatter_cfg.also_generate:
+                should_add = False
+
+            if should_add:
+                active_providers.append(instance)
 
     if not active_providers and not combiner_provider:
         logger.error("No providers could be initialized.")
+    elif effective_defaults.prewarm_connections:
+        warm_targets = list(active_providers)
+        for extra in (combiner_provider, formatter_provider):
+            if extra is not None and extra not in warm_targets:
+                warm_targets.append(extra)
+        await prewarm_providers(warm_targets, timeout=effective_defaults.init_timeout)
 
     return active_providers, combiner_provider, formatter_provider
@@ -2,16 +2,22 @@
 """
 Python Compilation Script for LLM2Deck.
 Renders markdown to sanitized HTML, shuffles MCQ options, generates deterministic IDs,
-and compiles the stage 3 JSON data into Anki (.apkg) files using genanki.
+and compiles the stage 3 JSON data into Anki (.apkg) files using genanki, or streams
+it as an Anki text-import (.tsv) file.
 """
 
 import sys
 import os
 import json
+import csv
 import hashlib
+import html
 import random
 import re
+import sqlite3
 import argparse
+import time
+import functools
 import markdown
 import bleach
 import genanki
@@ -309,6 +315,9 @@ tr:nth-child(even) {
 }
 """
 
+# Maximum number of rendered markdown fields kept in memory between compiles
+RENDER_CACHE_SIZE = 65536
+
 # Global ID collision tracking registry
 generated_ids = {}
 used_ids = set()
@@ -362,21 +371,92 @@ def normalize_tag(value: str) -> str:
     return re.sub(r"\s+", "", value)
 
 
+# Field kinds used to pick the cheapest rendering path that yields identical HTML
+FIELD_PLAIN = "plain"
+FIELD_INLINE_CODE = "inline_code"
+FIELD_MARKDOWN = "markdown"
+
+# Characters that can start Markdown or raw HTML syntax anywhere in a line
+_MARKDOWN_SYNTAX_RE = re.compile(r"[\\`*_\[\]<>&#|~!\t\r\n]")
+# Line-leading list, quote, heading-underline and ordered-list markers
+_BLOCK_MARKER_RE = re.compile(r"[-+=>]|\d+\.")
+# A field consisting of a single inline code span, e.g. `dict.get(k)`
+_INLINE_CODE_RE = re.compile(r"`([^`\\&\t\r\n]+)`")
+
+# Shared converter and sanitizer, reset between fields instead of rebuilt per call
+_markdown_converter = markdown.Markdown(extensions=["fenced_code", "tables"])
+_html_cleaner = bleach.sanitizer.Cleaner(
+    tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True
+)
+
+
+def classify_field(text: str) -> str:
+    """
+    Classifies a field with a cheap scan as plain text (no Markdown syntax at all),
+    a single inline code span, or full Markdown that needs the converter.
+    """
+    stripped = text.strip()
+    if not stripped or text[0].isspace():
+        # Leading whitespace may form an indented code block
+        return FIELD_MARKDOWN if stripped else FIELD_PLAIN
+    match = _INLINE_CODE_RE.fullmatch(text)
+    if match and match.group(1).strip():
+        return FIELD_INLINE_CODE
+    if _MARKDOWN_SYNTAX_RE.search(text) or _BLOCK_MARKER_RE.match(text):
+        return FIELD_MARKDOWN
+    return FIELD_PLAIN
+
+
 def render_markdown(text: str, inline: bool = False) -> str:
     """
     Converts markdown text to HTML, then sanitizes it against the allowed whitelist.
     If inline is True, strips wrapping <p> tags from the output.
+    Plain text and single inline code spans are rendered by HTML escaping alone;
+    everything else goes through the (memoized) Markdown converter.
     """
     if not isinstance(text, str):
         return ""
 
+    kind = classify_field(text)
+    if kind == FIELD_PLAIN:
+        if not text.strip():
+            return ""
+        # Markdown keeps trailing spaces inside a paragraph; inline peeling strips them
+        body = html.escape(text, quote=False)
+    elif kind == FIELD_INLINE_CODE:
+        body = f"<code>{html.escape(text[1:-1].strip(), quote=False)}</code>"
+    else:
+        return _render_markdown_cached(text, inline)
+
+    if inline:
+        return body.rstrip()
+    return f"<p>{body}</p>"
+
+
+def render_note_fields(fields: list[tuple[str, bool]]) -> list[str]:
+    """
+    Renders all markdown fields of a note given as (text, inline) pairs, rendering each
+    distinct pair once (e.g. padded empty MCQ options or repeated option texts).
+    """
+    rendered = {}
+    results = []
+    for text, inline in fields:
+        key = (text, inline) if isinstance(text, str) else ("", inline)
+        html_value = rendered.get(key)
+        if html_value is None:
+            html_value = rendered[key] = render_markdown(key[0], inline)
+        results.append(html_value)
+    return results
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render_markdown_cached(text: str, inline: bool) -> str:
+    """Renders and sanitizes a markdown string. Backing cache for render_markdown()."""
     # Convert markdown to HTML using fenced_code and tables extensions
-    html = markdown.markdown(text, extensions=["fenced_code", "tables"])
+    html_value = _markdown_converter.reset().convert(text)
 
     # Sanitize HTML using bleach
-    sanitized = bleach.clean(
-        html, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True
-    )
+    sanitized = _html_cleaner.clean(html_value)
 
     if inline:
         # Strip wrapping <p> and </p> tags only if it is a single paragraph,
@@ -390,11 +470,12 @@ def render_markdown(text: str, inline: bool = False) -> str:
 
 
 def shuffle_mcq_options(
-    options: list[str], correct_answer: str
+    options: list[str], correct_answer: str, rng: random.Random = None
 ) -> tuple[list[str], str]:
     """
     Shuffles MCQ options while preserving the correct answer index mapping.
     Pads options list with fewer than 4 choices with empty strings.
+    An explicit rng makes the order reproducible (e.g. seeded by the note GUID).
     Returns: (shuffled_options, new_correct_answer_letter)
     """
     # Enforce safe type handling for choices list
@@ -418,7 +499,7 @@ def shuffle_mcq_options(
     # Bundle each option with its original index to prevent loss of correct answer mapping
     # when options contain duplicate values (standard list.index() would only find the first one).
     indexed_options = list(enumerate(options))
-    random.shuffle(indexed_options)
+    (rng or random).shuffle(indexed_options)
 
     shuffled_texts = []
     new_correct_idx = 0
@@ -437,8 +518,54 @@ def shuffle_mcq_options(
     return shuffled_texts, new_correct_answer_letter
 
 
+@functools.lru_cache(maxsize=16384)
+def _intern_tag(value: str) -> str:
+    """
+    Normalizes a tag value through a shared cache and interns the result, so that
+    tags repeated across thousands of cards share one string object and one regex pass.
+    """
+    return sys.intern(normalize_tag(value))
+
+
+def build_topic_tag_prefix(
+    topic_data: dict, source: str = None, subject: str = None
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """
+    Precomputes the taxonomy tags that are constant for every card of a topic.
+    Returns: (head_tags, tail_tags) where head_tags (topic, difficulty) precede the
+    card's type tag and tail_tags (source, subject) follow it.
+    """
+    if not isinstance(topic_data, dict):
+        topic_data = {}
+
+    # 1. Topic Tag, 2. Difficulty Tag
+    topic = topic_data.get("topic", "DefaultTopic")
+    difficulty = topic_data.get("difficulty", "Unknown")
+    head = (
+        f"topic::{normalize_tag(topic)}",
+        f"difficulty::{normalize_tag(difficulty)}",
+    )
+
+    # 4. Source Tag (falls back to the topic title when no source name is provided)
+    if source:
+        tail = [f"source::{normalize_tag(source)}"]
+    else:
+        title = topic_data.get("title", "DefaultTitle")
+        tail = [f"source::{normalize_tag(title)}"]
+
+    # 5. Subject Tag
+    if subject:
+        tail.append(f"subject::{normalize_tag(subject)}")
+
+    return head, tuple(tail)
+
+
 def build_tags(
-    card: dict, topic_data: dict, source: str = None, subject: str = None
+    card: dict,
+    topic_data: dict,
+    source: str = None,
+    subject: str = None,
+    prefix: tuple[tuple[str, ...], tuple[str, ...]] = None,
 ) -> list[str]:
     """
     Builds the set of tags for the note including card-level tags and hierarchical taxonomy tags:
@@ -447,54 +574,36 @@ def build_tags(
     - type::<normalized_card_type>
     - source::<normalized_source_file_name>
     - subject::<normalized_folder_path>
+
+    A prefix from build_topic_tag_prefix() may be passed to skip recomputing the
+    topic-level taxonomy tags for every card of the same topic.
     """
-    # Safe handling if card or topic_data are not dicts
+    # Safe handling if card is not a dict
     if not isinstance(card, dict):
         card = {}
-    if not isinstance(topic_data, dict):
-        topic_data = {}
 
-    tags_list = []
+    if prefix is None:
+        prefix = build_topic_tag_prefix(topic_data, source=source, subject=subject)
+    head, tail = prefix
 
-    # 1. Topic Tag
-    topic = topic_data.get("topic", "DefaultTopic")
-    tags_list.append(f"topic::{normalize_tag(topic)}")
-
-    # 2. Difficulty Tag
-    difficulty = topic_data.get("difficulty", "Unknown")
-    tags_list.append(f"difficulty::{normalize_tag(difficulty)}")
+    tags_list = list(head)
 
     # 3. Type Tag
     card_type = card.get("card_type", "Concept")
-    tags_list.append(f"type::{normalize_tag(card_type)}")
-
-    # 4. Source Tag
-    if source:
-        # Use provided source name
-        tags_list.append(f"source::{normalize_tag(source)}")
-    else:
-        # Fallback to title
-        title = topic_data.get("title", "DefaultTitle")
-        tags_list.append(f"source::{normalize_tag(title)}")
+    type_value = _intern_tag(card_type) if isinstance(card_type, str) else ""
+    tags_list.append(f"type::{type_value}")
 
-    # 5. Subject Tag
-    if subject:
-        tags_list.append(f"subject::{normalize_tag(subject)}")
+    tags_list.extend(tail)
 
     # 6. Card-level tags
     card_tags = card.get("tags", [])
     if isinstance(card_tags, list):
         for tag in card_tags:
             if tag:
-                tags_list.append(normalize_tag(str(tag)))
-
-    # Dedup tags list while preserving relative order
-    unique_tags = []
-    for tag in tags_list:
-        if tag and tag not in unique_tags:
-            unique_tags.append(tag)
+                tags_list.append(_intern_tag(str(tag)))
 
-    return unique_tags
+    # Dedup tags list in linear time while preserving first-seen order
+    return [tag for tag in dict.fromkeys(tags_list) if tag]
 
 
 def _load_json_data(json_data, source: str = None) -> tuple[list, str]:
@@ -697,10 +806,13 @@ def _create_note_for_card(
     deck_name: str,
     source: str = None,
     subject: str = None,
+    tag_prefix: tuple[tuple[str, ...], tuple[str, ...]] = None,
 ) -> genanki.Note | None:
     """
     Creates a genanki Note for a single card dictionary, selecting the appropriate
     model based on card_format. Returns None for unsupported formats (with a warning).
+    MCQ options are shuffled with a GUID-seeded RNG, so every output format (and every
+    recompile) of an unchanged card yields identical fields.
     """
     basic_model, cloze_model, mcq_model = models
 
@@ -713,19 +825,26 @@ def _create_note_for_card(
     difficulty = topic_data.get("difficulty", "Unknown")
 
     # Build card and taxonomy tags
-    unique_tags = build_tags(card, topic_data, source=source, subject=subject)
+    unique_tags = build_tags(
+        card, topic_data, source=source, subject=subject, prefix=tag_prefix
+    )
     tags_str = " ".join(unique_tags)
 
     # Generate deterministic GUID based on card front and deck name to allow native update-in-place updates in Anki
     guid = genanki.guid_for(card.get("front", ""), deck_name)
 
     if card_format == "Basic":
+        front_html, back_html, explanation_html = render_note_fields([
+            (card.get("front", ""), False),
+            (card.get("back", ""), False),
+            (card.get("explanation", ""), False),
+        ])
         return genanki.Note(
             model=basic_model,
             fields=[
-                render_markdown(card.get("front", "")),
-                render_markdown(card.get("back", "")),
-                render_markdown(card.get("explanation", "")),
+                front_html,
+                back_html,
+                explanation_html,
                 card_type,
                 topic,
                 title,
@@ -737,11 +856,15 @@ def _create_note_for_card(
         )
 
     if card_format == "Cloze":
+        front_html, explanation_html = render_note_fields([
+            (card.get("front", ""), False),
+            (card.get("explanation", ""), False),
+        ])
         return genanki.Note(
             model=cloze_model,
             fields=[
-                render_markdown(card.get("front", "")),
-                render_markdown(card.get("explanation", "")),
+                front_html,
+                explanation_html,
                 card_type,
                 topic,
                 title,
@@ -754,18 +877,24 @@ def _create_note_for_card(
 
     if card_format == "MCQ":
         shuffled_options, new_correct_letter = shuffle_mcq_options(
-            card.get("options", []), card.get("correct_answer", "A")
+            card.get("options", []),
+            card.get("correct_answer", "A"),
+            rng=random.Random(guid),
+        )
+        # Options are mostly short plain strings and padded blanks, rendered once each;
+        # the note type only has OptionA-OptionD, so extra options are dropped
+        rendered = render_note_fields(
+            [(card.get("front", ""), False)]
+            + [(option, True) for option in shuffled_options[:4]]
+            + [(card.get("explanation", ""), False)]
         )
         return genanki.Note(
             model=mcq_model,
             fields=[
-                render_markdown(card.get("front", "")),
-                render_markdown(shuffled_options[0], inline=True),
-                render_markdown(shuffled_options[1], inline=True),
-                render_markdown(shuffled_options[2], inline=True),
-                render_markdown(shuffled_options[3], inline=True),
+                rendered[0],
+                *rendered[1:5],
                 new_correct_letter,
-                render_markdown(card.get("explanation", "")),
+                rendered[5],
                 card_type,
                 topic,
                 title,
@@ -783,6 +912,44 @@ def _create_note_for_card(
     return None
 
 
+def _iter_notes(
+    topics: list,
+    models: tuple[genanki.Model, genanki.Model, genanki.Model],
+    deck_name: str,
+    source: str = None,
+    subject: str = None,
+):
+    """
+    Yields a genanki Note for every valid card across all topics, skipping
+    non-dict topics and cards as well as unsupported card formats.
+    """
+    for topic_data in topics:
+        if not isinstance(topic_data, dict):
+            continue
+
+        cards = topic_data.get("cards")
+        if not isinstance(cards, list):
+            cards = []
+
+        # Taxonomy tags are constant per topic, so compute them once for all its cards
+        tag_prefix = build_topic_tag_prefix(topic_data, source=source, subject=subject)
+
+        for card in cards:
+            if not isinstance(card, dict):
+                continue
+            note = _create_note_for_card(
+                card,
+                topic_data,
+                models,
+                deck_name,
+                source,
+                subject,
+                tag_prefix,
+            )
+            if note is not None:
+                yield note
+
+
 def compile_deck(
     json_data,
     output_path: str,
@@ -800,20 +967,8 @@ def compile_deck(
     deck_id = generate_id(deck_name)
     deck = genanki.Deck(deck_id, deck_name)
 
-    for topic_data in topics:
-        if not isinstance(topic_data, dict):
-            continue
-
-        cards = topic_data.get("cards")
-        if not isinstance(cards, list):
-            cards = []
-
-        for card in cards:
-            if not isinstance(card, dict):
-                continue
-            note = _create_note_for_card(card, topic_data, models, deck_name, source, subject)
-            if note is not None:
-                deck.add_note(note)
+    for note in _iter_notes(topics, models, deck_name, source, subject):
+        deck.add_note(note)
 
     # Save to file
     pkg = genanki.Package(deck)
@@ -821,15 +976,495 @@ def compile_deck(
     print(f"Successfully compiled {len(deck.notes)} cards into '{output_path}'")
 
 
+# Anki text-import file headers. Fixed leading columns are: note type, deck, GUID, tags;
+# the note's fields follow in model order, so rows of different note types may differ in length.
+TSV_HEADER = (
+    "#separator:tab\n"
+    "#html:true\n"
+    "#notetype column:1\n"
+    "#deck column:2\n"
+    "#guid column:3\n"
+    "#tags column:4\n"
+)
+
+# Write buffer size for streamed text exports
+TSV_BUFFER_SIZE = 1024 * 1024
+
+
+def export_tsv(
+    json_data,
+    output_path: str,
+    deck_name: str = None,
+    subject: str = None,
+    source: str = None,
+):
+    """
+    Streams the notes of the input JSON into an Anki-compatible tab-separated text file
+    (File > Import in Anki). Rows are written as they are built through a large write
+    buffer, so output memory stays constant regardless of deck size.
+    The LLM2Deck note types must already exist in the target collection
+    (e.g. from a previously imported .apkg).
+    """
+    topics, source = _load_json_data(json_data, source)
+    deck_name = _resolve_deck_name(topics, deck_name)
+    models = _create_models()
+
+    count = 0
+    with open(
+        output_path, "w", encoding="utf-8", newline="", buffering=TSV_BUFFER_SIZE
+    ) as f:
+        f.write(TSV_HEADER)
+        writer = csv.writer(f, delimiter="\t", lineterminator="\n")
+        for note in _iter_notes(topics, models, deck_name, source, subject):
+            writer.writerow(
+                [note.model.name, deck_name, note.guid, " ".join(note.tags)]
+                + [str(field) for field in note.fields]
+            )
+            count += 1
+
+    print(f"Successfully exported {count} cards into '{output_path}'")
+
+
+# Output formats supported by the CLI, mapped to their compile function
+OUTPUT_FORMATS = {
+    "apkg": compile_deck,
+    "tsv": export_tsv,
+}
+
+
+_HTML_TAG_RE = re.compile(r"<[^>]*>")
+
+
+def _strip_html(text: str) -> str:
+    """Strips HTML tags and decodes entities, as Anki does for the sort field."""
+    return html.unescape(_HTML_TAG_RE.sub("", text)).strip()
+
+
+def _field_checksum(text: str) -> int:
+    """Computes Anki's note checksum: first 8 hex digits of the SHA1 of the stripped sort field."""
+    return int(hashlib.sha1(_strip_html(text).encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _unicase_collation(a: str, b: str) -> int:
+    """Case-insensitive collation registered under Anki's custom 'unicase' name."""
+    a, b = a.casefold(), b.casefold()
+    return (a > b) - (a < b)
+
+
+def _collection_tables(cursor: sqlite3.Cursor) -> set[str]:
+    """Returns the table names of an Anki collection (to tell the legacy and modern schemas apart)."""
+    return {
+        row[0]
+        for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+
+
+def _load_collection_names(cursor: sqlite3.Cursor) -> tuple[dict, dict]:
+    """
+    Returns (note_type_name -> id, deck_name -> id) for an Anki collection, supporting both
+    the legacy schema (JSON blobs in the col table) and the modern one (notetypes/decks tables).
+    """
+    tables = _collection_tables(cursor)
+    if "notetypes" in tables:
+        model_ids = {
+            name: mid for mid, name in cursor.execute("SELECT id, name FROM notetypes")
+        }
+        # Modern collections store nested deck names with \x1f instead of '::'
+        deck_ids = {
+            name.replace("\x1f", "::"): did
+            for did, name in cursor.execute("SELECT id, name FROM decks")
+        }
+    else:
+        models_json, decks_json = cursor.execute(
+            "SELECT models, decks FROM col"
+        ).fetchone()
+        model_ids = {m["name"]: int(m["id"]) for m in json.loads(models_json).values()}
+        deck_ids = {d["name"]: int(d["id"]) for d in json.loads(decks_json).values()}
+    return model_ids, deck_ids
+
+
+def _register_tags(cursor: sqlite3.Cursor, tags: set[str], usn: int = -1) -> int:
+    """
+    Registers note tags missing from the collection's tag list so they show up in Anki's
+    browser sidebar without a Check Database. Supports the modern schema (tags table, where
+    the missing parents of hierarchical '::' tags are registered too, as Anki does) and the
+    legacy one (JSON tag -> usn map in the col table). Tags are matched case-insensitively.
+    Returns: number of tags registered.
+    """
+    if not tags:
+        return 0
+    tables = _collection_tables(cursor)
+    if "tags" in tables:
+        wanted = set()
+        for tag in tags:
+            parts = tag.split("::")
+            wanted.update("::".join(parts[: i + 1]) for i in range(len(parts)))
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(tags)")]
+        # Later schema versions add a NOT NULL 'collapsed' flag and a nullable 'config' blob
+        defaults = {"tag": None, "usn": usn, "collapsed": 0, "config": None}
+        columns = [column for column in columns if column in defaults]
+        before = cursor.execute("SELECT COUNT(*) FROM tags").fetchone()[0]
+        cursor.executemany(
+            f"INSERT OR IGNORE INTO tags ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [
+                tuple(
+                    tag if column == "tag" else defaults[column] for column in columns
+                )
+                for tag in sorted(wanted)
+            ],
+        )
+        return cursor.execute("SELECT COUNT(*) FROM tags").fetchone()[0] - before
+
+    tags_json = cursor.execute("SELECT tags FROM col").fetchone()[0]
+    registered = json.loads(tags_json or "{}")
+    known = {tag.casefold() for tag in registered}
+    missing = sorted(tag for tag in tags if tag.casefold() not in known)
+    if not missing:
+        return 0
+    for tag in missing:
+        registered[tag] = usn
+        known.add(tag.casefold())
+    cursor.execute("UPDATE col SET tags = ?", (json.dumps(registered),))
+    return len(missing)
+
+
+def _load_next_position(cursor: sqlite3.Cursor) -> int:
+    """
+    Returns the collection's nextPos (the new-card queue position Anki hands out next),
+    read from the config table (modern schema) or the col.conf JSON (legacy schema).
+    """
+    tables = _collection_tables(cursor)
+    if "config" in tables:
+        row = cursor.execute("SELECT val FROM config WHERE KEY = 'nextPos'").fetchone()
+        return int(json.loads(row[0])) if row else 1
+    conf_json = cursor.execute("SELECT conf FROM col").fetchone()[0]
+    return int(json.loads(conf_json or "{}").get("nextPos", 1))
+
+
+def _store_next_position(cursor: sqlite3.Cursor, position: int, mod: int) -> None:
+    """
+    Advances the collection's nextPos past the positions used by upserted cards, so that
+    cards Anki adds afterwards do not reuse them. Never moves nextPos backwards.
+    """
+    if position <= _load_next_position(cursor):
+        return
+    tables = _collection_tables(cursor)
+    if "config" in tables:
+        cursor.execute(
+            "INSERT OR REPLACE INTO config (KEY, usn, mtime_secs, val) VALUES ('nextPos', -1, ?, ?)",
+            (mod, json.dumps(position).encode("utf-8")),
+        )
+        return
+    conf = json.loads(cursor.execute("SELECT conf FROM col").fetchone()[0] or "{}")
+    conf["nextPos"] = position
+    cursor.execute("UPDATE col SET conf = ?", (json.dumps(conf),))
+
+
+def upsert_collection(
+    json_data,
+    collection_path: str,
+    deck_name: str = None,
+    subject: str = None,
+    source: str = None,
+) -> dict[str, int]:
+    """
+    Upserts the notes of the input JSON directly into an existing Anki collection
+    (collection.anki2) by GUID, inside a single transaction.
+    New notes are added with fresh new cards; changed notes have their fields and tags
+    updated in place while their cards (and thus scheduling data) are left untouched;
+    notes whose fields and tags are unchanged are skipped. Tags of added and updated notes
+    are registered in the collection's tag list, and its nextPos is advanced past the new
+    cards' queue positions, in the same transaction. The target deck and the LLM2Deck
+    note types must already exist in the collection (e.g. from a previously imported .apkg);
+    notes of a missing note type are skipped with a warning.
+    Close Anki before running, as it holds the collection open.
+    Returns: counts of added, updated, unchanged and skipped notes.
+    """
+    if not os.path.exists(collection_path):
+        raise FileNotFoundError(f"Anki collection '{collection_path}' does not exist.")
+
+    topics, source = _load_json_data(json_data, source)
+    deck_name = _resolve_deck_name(topics, deck_name)
+    models = _create_models()
+    stats = {"added": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+
+    conn = sqlite3.connect(collection_path, isolation_level=None)
+    conn.create_collation("unicase", _unicase_collation)
+    try:
+        cursor = conn.cursor()
+        # Take the write lock up front so a collection held open by Anki fails fast
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            model_ids, deck_ids = _load_collection_names(cursor)
+            if deck_name not in deck_ids:
+                raise ValueError(
+                    f"Deck '{deck_name}' not found in collection. Import a compiled .apkg once first."
+                )
+            deck_id = deck_ids[deck_name]
+
+            existing = {
+                guid: (nid, mid, flds, tags)
+                for guid, nid, mid, flds, tags in cursor.execute(
+                    "SELECT guid, id, mid, flds, tags FROM notes"
+                )
+            }
+
+            now = time.time()
+            mod = int(now)
+            max_id = cursor.execute(
+                "SELECT MAX(m) FROM (SELECT MAX(id) AS m FROM notes UNION ALL SELECT MAX(id) FROM cards)"
+            ).fetchone()[0]
+            next_id = max(int(now * 1000), (max_id or 0) + 1)
+            # New cards are shown in order of their `due` position in the new queue;
+            # skip positions Anki has already handed out (nextPos)
+            next_due = max(
+                cursor.execute(
+                    "SELECT COALESCE(MAX(due), 0) + 1 FROM cards WHERE type = 0"
+                ).fetchone()[0],
+                _load_next_position(cursor),
+            )
+            written_tags = set()
+
+            for note in _iter_notes(topics, models, deck_name, source, subject):
+                mid = model_ids.get(note.model.name)
+                if mid is None:
+                    print(
+                        f"Warning: Skipped note '{note.guid}': note type '{note.model.name}' not found in collection. "
+                        "Import a compiled .apkg containing it once first.",
+                        file=sys.stderr,
+                    )
+                    stats["skipped"] += 1
+                    continue
+                fields = [str(field) for field in note.fields]
+                flds = "\x1f".join(fields)
+                tags = " " + " ".join(note.tags) + " "
+                sfld = _strip_html(fields[0])
+                csum = _field_checksum(fields[0])
+                card_ords = sorted(card.ord for card in note.cards)
+
+                row = existing.get(note.guid)
+                if row is None:
+                    nid = next_id
+                    next_id += 1
+                    cursor.execute(
+                        "INSERT INTO notes VALUES(?,?,?,?,?,?,?,?,?,?,?)",
+                        (nid, note.guid, mid, mod, -1, tags, flds, sfld, csum, 0, ""),
+                    )
+                    new_ords = card_ords
+                    stats["added"] += 1
+                else:
+                    nid, old_mid, old_flds, old_tags = row
+                    if old_mid != mid:
+                        print(
+                            f"Warning: Skipped note '{note.guid}' whose note type changed; re-import it manually.",
+                            file=sys.stderr,
+                        )
+                        stats["skipped"] += 1
+                        continue
+                    if old_flds == flds and old_tags.strip() == tags.strip():
+                        stats["unchanged"] += 1
+                        continue
+                    cursor.execute(
+                        "UPDATE notes SET flds = ?, sfld = ?, csum = ?, tags = ?, mod = ?, usn = -1 WHERE id = ?",
+                        (flds, sfld, csum, tags, mod, nid),
+                    )
+                    # Only add cards for new cloze numbers; existing cards keep their scheduling
+                    have = {
+                        o
+                        for (o,) in cursor.execute(
+                            "SELECT ord FROM cards WHERE nid = ?", (nid,)
+                        )
+                    }
+                    new_ords = [o for o in card_ords if o not in have]
+                    stats["updated"] += 1
+
+                for card_ord in new_ords:
+                    cursor.execute(
+                        "INSERT INTO cards VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                        (
+                            next_id,
+                            nid,
+                            deck_id,
+                            card_ord,
+                            mod,
+                            -1,
+                            0,
+                            0,
+                            next_due,
+                            0,
+                            0,
+                            0,
+                            0,
+                            0,
+                            0,
+                            0,
+                            0,
+                            "",
+                        ),
+                    )
+                    next_id += 1
+                if new_ords:
+                    next_due += 1
+
+                existing[note.guid] = (nid, mid, flds, tags)
+                written_tags.update(note.tags)
+
+            _register_tags(cursor, written_tags)
+            _store_next_position(cursor, next_due, mod)
+            if stats["added"] or stats["updated"]:
+                cursor.execute("UPDATE col SET mod = ?", (int(now * 1000),))
+            cursor.execute("COMMIT")
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+    print(
+        f"Upserted into '{collection_path}': {stats['added']} added, {stats['updated']} updated, "
+        f"{stats['unchanged']} unchanged, {stats['skipped']} skipped"
+    )
+    return stats
+
+
+class JsonDirectoryWatcher:
+    """
+    Polls a directory for stage 3 JSON files and reports the ones that changed.
+    A file is only reported once its (mtime, size) signature has been stable for
+    the debounce window, so bursts of writes collapse into a single recompile.
+    """
+
+    def __init__(self, watch_dir: str, debounce: float = 0.3):
+        self.watch_dir = watch_dir
+        self.debounce = debounce
+        # Signatures of files as of their last successful report
+        self.seen: dict[str, tuple[int, int]] = {}
+        # Files with unreported changes: path -> (signature, monotonic time of last change)
+        self.pending: dict[str, tuple[tuple[int, int], float]] = {}
+
+    def _snapshot(self) -> dict[str, tuple[int, int]]:
+        """Returns the (mtime_ns, size) signature of every JSON file in the directory."""
+        snapshot = {}
+        try:
+            entries = list(os.scandir(self.watch_dir))
+        except FileNotFoundError:
+            return snapshot
+        for entry in entries:
+            if not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def prime(self):
+        """Marks all JSON files currently present as already compiled."""
+        self.seen = self._snapshot()
+        self.pending.clear()
+
+    def poll(self, now: float = None) -> list[str]:
+        """
+        Scans the directory once and returns the paths whose changes have settled
+        for at least the debounce window, in sorted order.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        snapshot = self._snapshot()
+
+        # Forget files that were deleted
+        for path in list(self.seen):
+            if path not in snapshot:
+                del self.seen[path]
+        for path in list(self.pending):
+            if path not in snapshot:
+                del self.pending[path]
+
+        for path, signature in snapshot.items():
+            if self.seen.get(path) == signature:
+                self.pending.pop(path, None)
+                continue
+            pending = self.pending.get(path)
+            if pending is None or pending[0] != signature:
+                # New write (or another write in the same burst): restart the debounce timer
+                self.pending[path] = (signature, now)
+
+        ready = []
+        for path, (signature, changed_at) in list(self.pending.items()):
+            if now - changed_at >= self.debounce:
+                ready.append(path)
+                self.seen[path] = signature
+                del self.pending[path]
+
+        return sorted(ready)
+
+
+def watch_directory(
+    watch_dir: str,
+    deck_name: str = None,
+    subject: str = None,
+    source: str = None,
+    poll_interval: float = 0.5,
+    debounce: float = 0.3,
+    output_format: str = "apkg",
+):
+    """
+    Watches a directory and recompiles each stage 3 JSON file into
+    <json_file_basename>.<output_format> whenever it changes. Runs until interrupted. Rendered fields are served from the
+    markdown render cache, so small edits only pay for the cards that actually changed.
+    """
+    if not os.path.isdir(watch_dir):
+        raise NotADirectoryError(f"Watch directory '{watch_dir}' does not exist.")
+
+    compile_fn = OUTPUT_FORMATS[output_format]
+    watcher = JsonDirectoryWatcher(watch_dir, debounce=debounce)
+    watcher.prime()
+    print(f"Watching '{watch_dir}' for JSON changes (Ctrl+C to stop)...")
+
+    try:
+        while True:
+            for json_path in watcher.poll():
+                output_path = f"{os.path.splitext(json_path)[0]}.{output_format}"
+                started = time.perf_counter()
+                try:
+                    compile_fn(
+                        json_data=json_path,
+                        output_path=output_path,
+                        deck_name=deck_name,
+                        subject=subject,
+                        source=source,
+                    )
+                except Exception as e:
+                    # Keep watching: the file may be mid-edit or temporarily invalid
+                    print(
+                        f"Compilation of '{json_path}' failed: {e}",
+                        file=sys.stderr,
+                    )
+                    continue
+                elapsed = time.perf_counter() - started
+                print(f"Recompiled '{json_path}' in {elapsed:.2f}s")
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+
 def main():
     parser = argparse.ArgumentParser(
-        description="Compile Stage 3 JSON cards into Anki .apkg deck."
+        description="Compile Stage 3 JSON cards into an Anki .apkg deck or .tsv text-import file."
     )
-    parser.add_argument("json_file", help="Path to input Stage 3 JSON file.")
+    parser.add_argument("json_file", nargs="?", help="Path to input Stage 3 JSON file.")
     parser.add_argument(
         "-o",
         "--output",
-        help="Path to output .apkg file. Defaults to <json_file_basename>.apkg.",
+        help="Path to output file. Defaults to <json_file_basename>.<format>.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(OUTPUT_FORMATS),
+        default="apkg",
+        help="Output format: a genanki .apkg package, or an Anki text-import .tsv file (default: apkg).",
     )
     parser.add_argument(
         "--deck-name",
@@ -842,9 +1477,54 @@ def main():
     parser.add_argument(
         "--source", help="Source filename override for taxonomy tagging."
     )
+    parser.add_argument(
+        "--collection",
+        metavar="COLLECTION_ANKI2",
+        help="Upsert notes by GUID directly into an existing Anki collection.anki2 instead of writing a file.",
+    )
+    parser.add_argument(
+        "--watch",
+        metavar="DIR",
+        help="Watch a directory and recompile each changed JSON file to <json_file_basename>.<format>.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.5,
+        help="Seconds between directory scans in watch mode (default: 0.5).",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.3,
+        help="Seconds a changed file must stay unchanged before recompiling in watch mode (default: 0.3).",
+    )
 
     args = parser.parse_args()
 
+    if args.watch:
+        if args.json_file or args.output or args.collection:
+            parser.error(
+                "--watch cannot be combined with json_file, --output or --collection."
+            )
+        try:
+            watch_directory(
+                args.watch,
+                deck_name=args.deck_name,
+                subject=args.subject,
+                source=args.source,
+                poll_interval=args.poll_interval,
+                debounce=args.debounce,
+                output_format=args.format,
+            )
+        except NotADirectoryError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if not args.json_file:
+        parser.error("the following arguments are required: json_file")
+
     if not os.path.exists(args.json_file):
         print(
             f"Error: Input JSON file '{args.json_file}' does not exist.",
@@ -852,13 +1532,27 @@ def main():
         )
         sys.exit(1)
 
+    if args.collection:
+        try:
+            upsert_collection(
+                json_data=args.json_file,
+                collection_path=args.collection,
+                deck_name=args.deck_name,
+                subject=args.subject,
+                source=args.source,
+            )
+        except Exception as e:
+            print(f"Upsert failed: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
     # Determine default output path if not specified
     if not args.output:
         base = os.path.splitext(args.json_file)[0]
-        args.output = f"{base}.apkg"
+        args.output = f"{base}.{args.format}"
 
     try:
-        compile_deck(
+        OUTPUT_FORMATS[args.format](
             json_data=args.json_file,
             output_path=args.output,
             deck_name=args.deck_name,
@@ -16,7 +16,15 @@ from src.compile import (
     render_markdown,
     shuffle_mcq_options,
     build_tags,
+    build_topic_tag_prefix,
     compile_deck,
+    export_tsv,
+    upsert_collection,
+    classify_field,
+    render_note_fields,
+    JsonDirectoryWatcher,
+    _create_models,
+    _create_note_for_card,
 )
 
 
@@ -136,6 +144,26 @@ def test_tag_injection():
     assert "tagb" in tags
 
 
+def test_build_tags_order_and_dedup_with_prefix():
+    """10b. Verify tag order and dedup are unchanged when a precomputed topic prefix is reused."""
+    card = {"card_type": "Concept", "tags": ["b tag", "a", "btag", "", "a", "topic::T"]}
+    topic_data = {"topic": "T", "difficulty": "Hard", "title": "Title"}
+
+    expected = [
+        "topic::T",
+        "difficulty::Hard",
+        "type::Concept",
+        "source::Src",
+        "subject::Sub",
+        "btag",
+        "a",
+    ]
+    prefix = build_topic_tag_prefix(topic_data, source="Src", subject="Sub")
+
+    assert build_tags(card, topic_data, source="Src", subject="Sub") == expected
+    assert build_tags(card, topic_data, prefix=prefix) == expected
+
+
 def test_compile_basic_card_apkg():
     """11. Test end-to-end compilation of a Basic card type JSON to a valid .apkg file."""
     reset_id_registry()
@@ -245,6 +273,27 @@ def test_compile_mcq_card_apkg():
             assert "collection.anki2" in namelist
 
 
+def test_mcq_card_with_more_than_four_options_keeps_explanation():
+    """41. Verify an MCQ card with 5+ options keeps its explanation and fills only OptionA-OptionD."""
+    card = {
+        "card_format": "MCQ",
+        "card_type": "QA",
+        "front": "Pick a letter",
+        "options": ["a", "b", "c", "d", "e"],
+        "correct_answer": "A",
+        "explanation": "Because a comes first.",
+    }
+    topic_data = {"title": "Letters", "topic": "Alphabet", "difficulty": "Easy"}
+
+    note = _create_note_for_card(card, topic_data, _create_models(), "Deck")
+
+    assert len(note.fields) == 12
+    assert note.fields[6] == render_markdown("Because a comes first.")
+    options = note.fields[1:5]
+    assert len(set(options)) == 4
+    assert set(options) <= {render_markdown(letter, inline=True) for letter in "abcde"}
+
+
 def test_compile_mixed_cards():
     """14. Test deck compilation containing multiple card types (Basic, Cloze, MCQ) in one run."""
     reset_id_registry()
@@ -651,3 +700,276 @@ def test_compile_topic_list_custom_deck_name():
 
         assert os.path.exists(apkg_path)
         assert os.path.getsize(apkg_path) > 0
+
+
+def test_json_directory_watcher_debounces_and_reports_changed_files():
+    """33. Verify the watcher ignores pre-existing files, debounces writes, and reports only changed JSON files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        old_path = os.path.join(tmpdir, "old.json")
+        new_path = os.path.join(tmpdir, "new.json")
+        with open(old_path, "w", encoding="utf-8") as f:
+            json.dump({"cards": []}, f)
+        with open(os.path.join(tmpdir, "deck.apkg"), "w") as f:
+            f.write("not json")
+
+        watcher = JsonDirectoryWatcher(tmpdir, debounce=1.0)
+        watcher.prime()
+        assert watcher.poll(now=0.0) == []
+
+        with open(new_path, "w", encoding="utf-8") as f:
+            json.dump({"cards": []}, f)
+
+        # Change detected but still inside the debounce window
+        assert watcher.poll(now=10.0) == []
+        # Another write in the same burst restarts the window
+        with open(new_path, "a", encoding="utf-8") as f:
+            f.write("\n")
+        assert watcher.poll(now=10.5) == []
+        assert watcher.poll(now=11.0) == []
+        assert watcher.poll(now=11.6) == [new_path]
+        # Reported once; unchanged afterwards
+        assert watcher.poll(now=20.0) == []
+
+
+def test_render_markdown_is_cached():
+    """34. Verify repeated renders of the same field are served from the render cache."""
+    import src.compile
+
+    src.compile._render_markdown_cached.cache_clear()
+    first = render_markdown("**cached** field")
+    second = render_markdown("**cached** field")
+    assert first == second
+    assert src.compile._render_markdown_cached.cache_info().hits == 1
+
+
+def test_export_tsv_writes_anki_text_import_rows():
+    """35. Verify the TSV exporter writes Anki import headers and one row per note with type, deck, GUID and tags."""
+    reset_id_registry()
+    data = {
+        "title": "TSV Title",
+        "topic": "TSV Topic",
+        "difficulty": "Easy",
+        "cards": [
+            {
+                "card_format": "Basic",
+                "card_type": "Concept",
+                "tags": ["tsv"],
+                "front": "Front\twith tab",
+                "back": "Back",
+                "explanation": "Line one\n\nLine two",
+            },
+            {
+                "card_format": "MCQ",
+                "card_type": "QA",
+                "front": "Pick one",
+                "options": ["O(n)", "O(1)"],
+                "correct_answer": "A",
+                "explanation": "",
+            },
+            {"card_format": "UnknownFormat", "front": "skipped"},
+        ],
+    }
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tsv_path = os.path.join(tmpdir, "deck.tsv")
+        export_tsv(data, tsv_path, deck_name="TSV Deck")
+
+        with open(tsv_path, "r", encoding="utf-8", newline="") as f:
+            content = f.read()
+
+    header_lines = [line for line in content.splitlines() if line.startswith("#")]
+    assert header_lines == [
+        "#separator:tab",
+        "#html:true",
+        "#notetype column:1",
+        "#deck column:2",
+        "#guid column:3",
+        "#tags column:4",
+    ]
+
+    import csv
+    import io
+
+    body = content.split("#tags column:4\n", 1)[1]
+    rows = list(csv.reader(io.StringIO(body), delimiter="\t"))
+    assert len(rows) == 2
+
+    basic_row, mcq_row = rows
+    assert basic_row[0] == "LLM2Deck Basic Model"
+    assert basic_row[1] == "TSV Deck"
+    assert "tsv" in basic_row[3].split(" ")
+    assert "type::Concept" in basic_row[3].split(" ")
+    assert basic_row[4] == render_markdown("Front\twith tab")
+    assert len(basic_row) == 4 + 8
+
+    assert mcq_row[0] == "LLM2Deck MCQ Model"
+    assert len(mcq_row) == 4 + 12
+
+
+def test_upsert_collection_updates_in_place_and_preserves_scheduling():
+    """36. Verify upserting by GUID skips unchanged notes, updates changed ones without touching cards, and adds new ones."""
+    import sqlite3
+
+    reset_id_registry()
+    data = {
+        "title": "Upsert Title",
+        "topic": "Upsert Topic",
+        "difficulty": "Easy",
+        "cards": [
+            {
+                "card_format": "Basic",
+                "card_type": "Concept",
+                "front": "Stable front",
+                "back": "Old back",
+            },
+            {
+                "card_format": "MCQ",
+                "card_type": "QA",
+                "front": "Pick one",
+                "options": ["O(n)", "O(1)", "O(log n)"],
+                "correct_answer": "B",
+            },
+            {
+                "card_format": "Cloze",
+                "card_type": "Syntax",
+                "front": "Old {{c1::cloze}}",
+            },
+        ],
+    }
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        apkg_path = os.path.join(tmpdir, "deck.apkg")
+        compile_deck(data, apkg_path)
+        with zipfile.ZipFile(apkg_path, "r") as zf:
+            zf.extract("collection.anki2", tmpdir)
+        col_path = os.path.join(tmpdir, "collection.anki2")
+
+        # The .apkg and the upsert shuffle MCQ options identically, so nothing changed
+        assert upsert_collection(data, col_path) == {
+            "added": 0,
+            "updated": 0,
+            "unchanged": 3,
+            "skipped": 0,
+        }
+
+        # Simulate review history on the existing cards
+        conn = sqlite3.connect(col_path)
+        conn.execute("UPDATE cards SET ivl = 12, reps = 3, type = 2, queue = 2")
+        conn.commit()
+        conn.close()
+
+        data["cards"][0]["back"] = "New back"
+        data["cards"].append({
+            "card_format": "Cloze",
+            "card_type": "Syntax",
+            "front": "New {{c1::cloze}} and {{c2::second}}",
+            "tags": ["fresh_tag"],
+        })
+        stats = upsert_collection(data, col_path)
+        assert stats == {"added": 1, "updated": 1, "unchanged": 2, "skipped": 0}
+
+        conn = sqlite3.connect(col_path)
+        flds = [row[0] for row in conn.execute("SELECT flds FROM notes")]
+        assert any("New back" in f for f in flds)
+        assert conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 4
+        # Scheduling data of pre-existing cards is untouched
+        assert (
+            conn.execute("SELECT COUNT(*) FROM cards WHERE ivl = 12").fetchone()[0] == 3
+        )
+        # The new cloze note gets one new card per cloze number
+        assert (
+            conn.execute("SELECT COUNT(*) FROM cards WHERE type = 0").fetchone()[0] == 2
+        )
+        # New card positions are reserved in the collection's nextPos
+        conf = json.loads(conn.execute("SELECT conf FROM col").fetchone()[0])
+        max_new_due = conn.execute(
+            "SELECT MAX(due) FROM cards WHERE type = 0"
+        ).fetchone()[0]
+        assert conf["nextPos"] == max_new_due + 1
+        # Tags written by the upsert are registered in the collection's tag list
+        registered = json.loads(conn.execute("SELECT tags FROM col").fetchone()[0])
+        assert "fresh_tag" in registered
+        assert "type::Syntax" in registered
+        conn.close()
+
+
+def test_classify_field_kinds():
+    """37. Verify fields are classified as plain text, a single inline code span, or full Markdown."""
+    assert classify_field("O(n log n)") == "plain"
+    assert classify_field("Use a hash map.") == "plain"
+    assert classify_field("`dict.get(k)`") == "inline_code"
+    assert classify_field("**bold**") == "markdown"
+    assert classify_field("a < b") == "markdown"
+    assert classify_field("1. first item") == "markdown"
+    assert classify_field("    indented code") == "markdown"
+    assert classify_field("`a` and `b`") == "markdown"
+
+
+def test_render_fast_paths_match_markdown_output():
+    """38. Verify plain and inline code fields render to the same HTML as a full Markdown pass."""
+    import bleach
+    import markdown
+
+    import src.compile
+
+    def full_render(text):
+        html_value = markdown.markdown(text, extensions=["fenced_code", "tables"])
+        return bleach.clean(
+            html_value,
+            tags=src.compile.ALLOWED_TAGS,
+            attributes=src.compile.ALLOWED_ATTRIBUTES,
+            strip=True,
+        )
+
+    for text in ["O(n)", 'It\'s "quoted" ', "x = y + 1", "`a < b`", "` spaced `", ""]:
+        assert render_markdown(text) == full_render(text)
+
+
+def test_render_note_fields_renders_duplicates_once():
+    """39. Verify repeated (text, inline) pairs within a note are rendered once and reused."""
+    import src.compile
+
+    src.compile._render_markdown_cached.cache_clear()
+    rendered = render_note_fields([
+        ("**Front**", False),
+        ("**dup**", True),
+        ("**dup**", True),
+        ("", True),
+        ("", True),
+        (None, False),
+    ])
+    assert rendered == [
+        "<p><strong>Front</strong></p>",
+        "<strong>dup</strong>",
+        "<strong>dup</strong>",
+        "",
+        "",
+        "",
+    ]
+    assert src.compile._render_markdown_cached.cache_info().misses == 2
+    assert src.compile._render_markdown_cached.cache_info().hits == 0
+
+
+def test_register_tags_modern_schema_adds_missing_parents():
+    """40. Verify tags are registered in a modern collection's tags table with their missing parent tags."""
+    import sqlite3
+
+    from src.compile import _register_tags, _unicase_collation
+
+    conn = sqlite3.connect(":memory:")
+    conn.create_collation("unicase", _unicase_collation)
+    conn.execute(
+        "CREATE TABLE tags (tag text NOT NULL PRIMARY KEY COLLATE unicase, usn integer NOT NULL, "
+        "collapsed boolean NOT NULL, config blob NULL) without rowid"
+    )
+    conn.execute("INSERT INTO tags VALUES ('Topic', 0, 0, NULL)")
+    cursor = conn.cursor()
+
+    assert _register_tags(cursor, {"topic::Arrays", "plain"}) == 2
+    assert sorted(row[0] for row in cursor.execute("SELECT tag FROM tags")) == [
+        "Topic",
+        "plain",
+        "topic::Arrays",
+    ]
+    assert _register_tags(cursor, {"PLAIN"}) == 0
+    conn.close()